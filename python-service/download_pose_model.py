@@ -1,39 +1,59 @@
 """
-Download MediaPipe Pose Landmarker model.
-This script downloads the pose_landmarker_heavy.task model from Google's servers.
+Download MediaPipe Pose Landmarker models.
+This script downloads the pose_landmarker_{lite,full,heavy}.task models from Google's servers.
+
+Usage:
+    python download_pose_model.py              # all variants
+    python download_pose_model.py lite full    # selected variants
 """
 
 import urllib.request
 import os
+import sys
+
+# Ordered from most to least accurate (matches config.POSE_MODEL_VARIANTS)
+POSE_MODEL_VARIANTS = ['heavy', 'full', 'lite']
+
+MODEL_URL_TEMPLATE = ("https://storage.googleapis.com/mediapipe-models/pose_landmarker/"
+                      "pose_landmarker_{variant}/float16/1/pose_landmarker_{variant}.task")
 
-def download_pose_model():
-    """Download the MediaPipe Pose Landmarker model."""
+def download_pose_model(variant='heavy'):
+    """Download one MediaPipe Pose Landmarker model variant."""
     # Model URL
-    model_url = "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_heavy/float16/1/pose_landmarker_heavy.task"
-    
+    model_url = MODEL_URL_TEMPLATE.format(variant=variant)
+
     # Destination path
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    model_path = os.path.join(script_dir, 'src', 'pose_landmarker.task')
-    
-    print(f"Downloading MediaPipe Pose Landmarker model...")
+    model_path = os.path.join(script_dir, 'src', f'pose_landmarker_{variant}.task')
+
+    print(f"Downloading MediaPipe Pose Landmarker model ({variant})...")
     print(f"URL: {model_url}")
     print(f"Destination: {model_path}")
-    
+
     try:
         # Download the file
         urllib.request.urlretrieve(model_url, model_path)
-        
+
         # Check file size
         file_size = os.path.getsize(model_path) / (1024 * 1024)  # Size in MB
         print(f"\n✅ Download successful!")
         print(f"File size: {file_size:.2f} MB")
         print(f"Model saved to: {model_path}")
-        
+        return True
+
     except Exception as e:
         print(f"\n❌ Download failed: {e}")
         print("\nYou can manually download the model from:")
         print("https://developers.google.com/mediapipe/solutions/vision/pose_landmarker")
         print(f"Save it as: {model_path}")
+        return False
 
 if __name__ == "__main__":
-    download_pose_model()
+    variants = sys.argv[1:] or POSE_MODEL_VARIANTS
+    unknown = [v for v in variants if v not in POSE_MODEL_VARIANTS]
+    if unknown:
+        print(f"Unknown variant(s): {', '.join(unknown)} (choose from {', '.join(POSE_MODEL_VARIANTS)})")
+        sys.exit(1)
+
+    results = [download_pose_model(variant) for variant in variants]
+    sys.exit(0 if all(results) else 1)
@@ -1,11 +1,14 @@
 # -*- mode: python ; coding: utf-8 -*-
+import glob
 
+# Bundle every installed pose model variant (lite/full/heavy, or legacy pose_landmarker.task)
+pose_models = [(path, '.') for path in glob.glob('src/pose_landmarker*.task')]
 
 a = Analysis(
     ['src\\main.py'],
     pathex=[],
     binaries=[],
-    datas=[('src/face_landmarker.task', '.'), ('src/pose_landmarker.task', '.')],
+    datas=[('src/face_landmarker.task', '.')] + pose_models,
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
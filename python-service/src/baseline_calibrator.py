@@ -0,0 +1,71 @@
+import numpy as np
+from config import CALIBRATION_FRAMES, CALIBRATION_MAX_FRAMES
+
+class BaselineCalibrator:
+    """
+    Builds a good posture baseline from several frames of the live pipeline.
+    Consumes check_posture() results that were already computed by the
+    monitoring loop, so calibration needs no extra camera reads or inference.
+    """
+    METRICS = ('pitch', 'roll', 'shoulder_tilt', 'body_lean_offset', 'distance')
+    
+    def __init__(self, num_frames=CALIBRATION_FRAMES, max_frames=CALIBRATION_MAX_FRAMES):
+        """
+        Args:
+            num_frames: Frames with a detected face needed for the baseline
+            max_frames: Frames to wait in total before calibration fails
+        """
+        self.num_frames = num_frames
+        self.max_frames = max(max_frames, num_frames)
+        self.frames_seen = 0
+        self.samples = {metric: [] for metric in self.METRICS}
+    
+    @property
+    def collected(self):
+        """Number of usable frames collected so far."""
+        return len(self.samples['pitch'])
+    
+    def add(self, posture_status):
+        """
+        Add one frame result from PostureDetector.check_posture(). Results
+        reused by the motion gate or computed from tracked landmarks are
+        ignored (not counted as frames): they repeat or approximate an
+        earlier inference.
+        
+        Returns:
+            bool: True if the frame was usable (face detected)
+        """
+        if posture_status and (posture_status.get('reused') or posture_status.get('tracked')):
+            return False
+        self.frames_seen += 1
+        raw = posture_status.get('raw_metrics') if posture_status else None
+        if not raw or raw.get('pitch') is None or raw.get('distance') is None:
+            return False
+        
+        for metric in self.METRICS:
+            if raw.get(metric) is not None:
+                self.samples[metric].append(raw[metric])
+        return True
+    
+    def is_complete(self):
+        """Check if enough frames have been collected."""
+        return self.collected >= self.num_frames
+    
+    def has_failed(self):
+        """Check if calibration ran out of frames before completing."""
+        return not self.is_complete() and self.frames_seen >= self.max_frames
+    
+    def compute_baseline(self):
+        """
+        Aggregate collected samples into a baseline using the median of each
+        metric (robust against blinks, glitches and single-frame outliers).
+        
+        Returns:
+            dict: {metric: float or None} with keys matching PostureDetector.set_baseline()
+        """
+        def median(values):
+            if len(values) == 0:
+                return None
+            return float(np.median(values))
+        
+        return {metric: median(values) for metric, values in self.samples.items()}
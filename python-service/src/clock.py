@@ -0,0 +1,40 @@
+import time
+
+class MonotonicClock:
+    """
+    Real-time clock used for live monitoring.
+    Monotonic, so durations are immune to wall-clock adjustments.
+    """
+    def now(self):
+        """Current time in seconds."""
+        return time.monotonic()
+    
+    def on_frame(self, timestamp_ms):
+        """Frame capture timestamps are ignored in real time."""
+        pass
+
+
+class ReplayClock:
+    """
+    Clock driven by frame capture timestamps instead of real time.
+    Used for replay and batch runs, so recorded sessions can be processed
+    faster than real time with identical durations, warnings and streaks.
+    """
+    def __init__(self, start_seconds=0.0):
+        self._now = start_seconds
+    
+    def now(self):
+        """Current (simulated) time in seconds."""
+        return self._now
+    
+    def on_frame(self, timestamp_ms):
+        """Advance to a frame's capture timestamp (never moves backwards)."""
+        self.set(timestamp_ms / 1000.0)
+    
+    def set(self, seconds):
+        """Jump to an absolute time in seconds (never moves backwards)."""
+        self._now = max(self._now, seconds)
+    
+    def advance(self, seconds):
+        """Move the clock forward by a number of seconds."""
+        self._now += max(0.0, seconds)
@@ -4,8 +4,20 @@
 SMOOTHING_WINDOW_SIZE = 5  # Number of frames to average (5 = ~0.17s at 30 FPS)
 
 # State Debouncer Settings
-GOOD_TO_BAD_FRAMES = 2     # Frames needed to detect bad posture
-BAD_TO_GOOD_FRAMES = 3     # Frames needed to return to good posture
+# Durations are measured on the frame clock, so behaviour is the same at any frame rate
+# (each spans several frames even at low rates, so single-frame glitches never flip the state)
+GOOD_TO_BAD_SECONDS = 0.5          # Bad posture must persist this long to be reported
+BAD_TO_GOOD_SECONDS = 1.0          # Good posture must persist this long to end bad posture
+DEBOUNCE_RESET_GAP_SECONDS = 1.0   # A longer gap between frames restarts a pending transition
+
+# Per-issue sustain windows: an issue only counts once its threshold has been
+# exceeded continuously for this long (missing issues default to 0 = immediately)
+SUSTAIN_SECONDS = {
+    'head_pitch': 0.0,
+    'distance': 0.0,
+    'head_roll': 0.0,
+    'shoulder_tilt': 0.5,    # Avoid false positives from temporary movements
+}
 
 # Sensitivity Scale Functions (1.0-5.0 continuous scale: 1=Low/Lenient, 5=High/Strict)
 def _interpolate_threshold(scale: float, mapping: dict) -> tuple[float, float]:
@@ -134,3 +146,202 @@ REPEAT_WARNING_INTERVAL = 20    # Then warn every 20s
 
 # Processing
 TARGET_FPS = 30                  # Target frame processing rate
+PACER_STATS_WINDOW = 60          # Frames used for achieved FPS and jitter statistics
+
+# Pose Model Variants
+# Ordered from most to least accurate. Files are expected next to the face model
+# as pose_landmarker_<variant>.task (a plain pose_landmarker.task counts as 'heavy').
+POSE_MODEL_VARIANTS = ['heavy', 'full', 'lite']
+POSE_MODEL_VARIANT = 'auto'       # 'auto' = benchmark installed variants, or force 'heavy'/'full'/'lite'
+POSE_MODEL_FRAME_BUDGET_MS = 35   # Max median pose inference latency per frame for 'auto' selection
+POSE_MODEL_BENCHMARK_FRAMES = 15  # Frames timed per variant during benchmarking
+POSE_MODEL_BENCHMARK_SAMPLES = 3  # Live frames with a detected face that 'auto' benchmarks on
+
+# Baseline Calibration
+CALIBRATION_FRAMES = 30           # Live frames aggregated into the good posture baseline (~1s at 30 FPS)
+CALIBRATION_MAX_FRAMES = 150      # Give up if this many frames pass without enough face detections
+
+# Headless Mode (JSON Lines output, see headless.py)
+HEADLESS_FIELDS = ['timestamp', 'is_bad', 'adjusted_pitch', 'adjusted_roll', 'adjusted_shoulder_tilt',
+                   'distance', 'distance_deviation', 'posture_issues', 'bad_duration', 'should_warn', 'error']
+HEADLESS_FLUSH_SECONDS = 1.0           # Batch output lines and write them at this interval
+HEADLESS_MAX_BYTES = 10 * 1024 * 1024  # Rotate output file at this size
+HEADLESS_BACKUP_COUNT = 5              # Rotated files to keep (file.1 ... file.N)
+
+# Motion-Gated Inference
+# Skip both landmarkers when the frame barely changed since the last inference.
+# Opt-in: reused results miss changes below the threshold (a slow slouch) until
+# the next forced refresh, up to MOTION_GATE_MAX_REUSE_SECONDS late
+MOTION_GATE_ENABLED = False
+MOTION_GATE_THRESHOLD = 3.0            # Mean absolute grayscale difference (0-255) that counts as motion
+MOTION_GATE_MAX_REUSE_SECONDS = 1.0    # Force a full inference at least this often
+MOTION_GATE_THUMBNAIL_SIZE = (64, 36)  # (width, height) of the comparison thumbnail
+MOTION_GATE_USE_ROI = True             # Compare only the last face/shoulder region
+
+# Optical-Flow Landmark Tracking
+# Between full inferences, key landmarks are propagated with Lucas-Kanade optical flow.
+# Opt-in: flow follows image texture, not anatomy, so tracked metrics can drift
+# from what the landmarkers would report until the next full inference
+LANDMARK_TRACKING_ENABLED = False
+LANDMARK_TRACKING_SCALE = 0.5              # Downscale factor of the grayscale tracking image
+LANDMARK_TRACKING_MAX_AGE_SECONDS = 0.25   # Force full inference at least this often (~4/s)
+LANDMARK_TRACKING_MAX_FB_ERROR = 1.0       # Max forward-backward flow error (tracking image pixels)
+LANDMARK_TRACKING_MAX_DRIFT = 40           # Max point movement since last inference (frame pixels)
+
+# Capture
+CAPTURE_WIDTH = 1280
+CAPTURE_HEIGHT = 720
+PREVIEW_SIZE = (640, 360)          # (width, height) of preview frames sent to clients
+PREVIEW_JPEG_QUALITY = 70
+
+# Frame buffer pool
+# Capture frames, RGB conversions and preview resizes are written into reused,
+# preallocated arrays instead of fresh ones (see frame_buffer_pool.py)
+FRAME_BUFFER_POOL_DEPTH = 3        # Buffers rotated per kind (frames that may be in use at once)
+FRAME_BUFFER_RATE_WINDOW = 10.0    # Seconds over which the allocation rate is reported
+
+# Frame source used by start_monitoring (a client can override it per start_monitoring message)
+# {'type': 'camera', 'index': 0}
+# {'type': 'video', 'path': 'clip.mp4', 'paced': True, 'loop': False}
+# {'type': 'images', 'path': 'frames/', 'fps': 30}
+# {'type': 'synthetic', 'fps': 30, 'paced': True}
+FRAME_SOURCE = {'type': 'camera', 'index': 0}
+
+# Pipeline Mode
+# 'single'       - capture, inference and encoding run in the service's event loop
+# 'multiprocess' - capture, face inference, pose inference and preview encoding run as
+#                  separate processes exchanging frames through a shared-memory ring
+PIPELINE_MODE = 'single'
+FRAME_RING_SLOTS = 8               # Preallocated frame slots in the shared-memory ring
+
+# Concurrent landmarkers (single-process mode)
+# Face and pose landmarkers are independent and release the GIL while running,
+# so submitting both to a thread pool makes per-frame latency max(face, pose)
+# instead of their sum. The pose landmarker then also runs on frames without a face.
+# Opt-in: that costs pose inferences whose result is discarded, and the two threads
+# compete with capture and encoding on machines with few cores
+CONCURRENT_LANDMARKERS = False
+
+# Remote frame ingestion
+# Clients stream their own camera frames as binary WebSocket messages:
+# 8-byte little-endian capture timestamp (ms) followed by JPEG bytes.
+# Each client gets isolated detector/analyzer state; inference runs on a shared pool.
+REMOTE_INGEST_ENABLED = False
+DETECTOR_POOL_SIZE = 2                    # Concurrent inference workers (capacity scales with this)
+REMOTE_MAX_FRAME_BYTES = 2 * 1024 * 1024  # Larger binary messages are rejected
+
+# Pipeline watchdog
+# Detects a stalled capture/inference loop and event-loop lag, alerts clients
+# ('pipeline_alert') and recovers with exponential backoff.
+WATCHDOG_ENABLED = True
+WATCHDOG_CHECK_INTERVAL = 0.5            # Seconds between health checks
+WATCHDOG_LOOP_LAG_MS = 100               # Event-loop lag that raises an alert
+WATCHDOG_FRAME_TIMEOUT_SECONDS = 3.0     # No captured frame for this long = capture stall
+WATCHDOG_RESULT_TIMEOUT_SECONDS = 5.0    # No posture result for this long = inference stall
+WATCHDOG_BACKOFF_INITIAL_SECONDS = 1.0   # Wait before repeating a recovery attempt...
+WATCHDOG_BACKOFF_MAX_SECONDS = 30.0      # ...doubling up to this limit while unhealthy
+
+# Per-frame telemetry
+# Each analyzer keeps the most recent frames in a fixed-size columnar ring
+# (raw and adjusted metrics, issues, debounced state, stage latencies),
+# queryable by time window with the 'get_telemetry' message.
+TELEMETRY_CAPACITY = 10 * 60 * TARGET_FPS  # Rows kept (10 minutes at TARGET_FPS, ~1 MB)
+
+# Posture statistics
+# Distributions of the adjusted metrics are summarised with mergeable t-digest
+# sketches (constant memory for all-day sessions, see quantile_sketch.py).
+SKETCH_COMPRESSION = 100                 # ~centroids per sketch (higher = more accurate)
+STATISTICS_QUANTILES = (0.5, 0.9, 0.99)  # Reported as p50 / p90 / p99
+
+# Threshold tuner (offline replay of recorded sessions, see threshold_tuner.py)
+TUNER_SAMPLE_SECONDS = 0.5          # Recordings are resampled to this step before evaluation
+TUNER_ENTER_STEPS = 100             # Candidate enter thresholds per metric; exit thresholds are
+                                    # enter moved by whole steps, up to the metric's max gap
+
+# Overlay rendering
+# 'server' - the face box is drawn into the preview frame (default)
+# 'client' - nothing is drawn; results carry int16-quantised landmarks
+#            (see landmark_codec.py) and the client draws its own overlay
+# 'none'   - no overlay
+OVERLAY_MODE = 'server'
+OVERLAY_LANDMARKS = 'key'     # 'key' (metric landmarks) or 'mesh' (all face and pose landmarks)
+PREVIEW_INTERVAL = 1          # Send a preview frame with every Nth result (0 = no preview)
+# Key landmarks are the ones the metrics (and the landmark tracker) use
+OVERLAY_KEY_FACE_INDICES = (33, 263, 1, 133, 362, 168, 468, 473)  # Eye corners, nose, nose bridge, pupils
+OVERLAY_KEY_POSE_INDICES = (11, 12)                                # Shoulders
+
+# Load testing (see load_test.py)
+LOAD_TEST_PORT = 8766                 # Port of the server started by the load test
+LOAD_TEST_DURATION_SECONDS = 30
+LOAD_TEST_SLOW_READER_DELAY = 0.2     # Seconds a 'slow' client sleeps after each message
+LOAD_TEST_RECONNECT_SECONDS = 2.0     # Connection lifetime of 'reconnecting' clients
+LOAD_TEST_COMMAND_RATE = 10           # Messages per second sent by each 'chatty' client
+LOAD_TEST_SLOS = {
+    'p50_latency_ms': 50,             # Broadcast latency (publish -> fast client receive)
+    'p99_latency_ms': 250,
+    'min_fast_client_fps': 10,        # Results per second received by the slowest fast client
+    'p99_command_ms': 250,            # Reply latency of chatty clients' commands
+    'max_loop_lag_ms': WATCHDOG_LOOP_LAG_MS,
+    'max_rss_mb': 1500,
+    'max_cpu_percent': 200            # Server CPU time / wall time (100 = one core)
+}
+
+# Local IPC transport
+# Same-host clients can also connect over a Unix domain socket: the same WebSocket
+# protocol and messages as ws://localhost:8765, without TCP loopback or compression
+# overhead. Runs alongside TCP; not available on Windows (TCP only).
+# Opt-in: the default path is in the shared temp directory, where another local user
+# can create it first - clients connecting by path would then reach their socket
+IPC_SOCKET_ENABLED = False
+IPC_SOCKET_PATH = None        # None = slouti-posture.sock in the system temp directory
+
+# Posture rules (see metric_registry.py)
+# Only the metrics needed by enabled rules and active consumers (calibration,
+# server-drawn overlay, metrics requested by clients) are computed per frame;
+# the pose landmarker is skipped when nothing needs shoulder landmarks.
+# Clients toggle rules at runtime with 'set_metric_rules'.
+METRIC_RULES = {
+    'head_pitch': True,
+    'distance': True,
+    'head_roll': True,
+    'shoulder_tilt': True,
+    'body_lean': False    # Unreliable (head compensation, camera angle) - shoulder tilt covers it
+}
+
+# Frame tracing (see frame_tracer.py)
+# Every frame of the monitoring loop gets a trace ID; its stages (capture, RGB
+# conversion, landmarkers, metrics, analyzer, encode, serialise, per-client
+# send) are recorded into a span ring. 'dump_trace' returns the last N seconds
+# as Chrome trace-event JSON (open in chrome://tracing or ui.perfetto.dev).
+# Opt-in (a debugging aid): every stage takes a lock and writes a ring row, and
+# the dump exposes per-client send timings to any connected client
+TRACE_ENABLED = False
+TRACE_CAPACITY = 16384              # Spans kept (~30 s at 30 FPS and a few clients, ~430 KB)
+TRACE_SLOW_FRAME_MS = 100           # Frames slower than this end to end are sampled...
+TRACE_SLOW_FRAME_SAMPLES = 20       # ...keeping the spans of the most recent ones
+TRACE_MAX_LANES = 64                # Threads and per-client send lanes (others share one lane)
+
+# Soak testing (see soak_test.py)
+# Runs the full service on a looping file or synthetic source, with a ReplayClock
+# so hours of frames are processed faster than real time, and fails on drift.
+SOAK_PORT = 8767
+SOAK_HOURS = 8.0                     # Simulated hours of frames per run
+SOAK_SPEED = 4.0                     # Processing rate / source frame rate (if the machine keeps up)
+SOAK_SAMPLE_INTERVAL_SECONDS = 30    # Wall-clock seconds between samples
+SOAK_WARMUP_MINUTES = 15             # Simulated minutes left out of the slopes, while the
+                                     # telemetry ring (10 min), trace ring and buffers fill
+SOAK_TOP_ALLOCATORS = 10             # tracemalloc lines reported by growth since warm-up
+SOAK_LIMITS = {                      # Maximum slopes per simulated hour after warm-up
+    'rss_mb_per_hour': 10,
+    'traced_mb_per_hour': 5,         # Python allocations (tracemalloc)
+    'handles_per_hour': 1,
+    'threads_per_hour': 1,
+    'p99_latency_ms_per_hour': 2     # Largest slope of the capture / inference / publish p99
+}
+
+# Result subscriptions
+# Clients choose what they receive with 'subscribe': 'full' (default) gets every
+# posture_result; 'events' gets only posture_event messages (good->bad and
+# bad->good transitions of the debounced state, warnings) and a compact
+# heartbeat, so notification-only clients cost almost nothing to serve.
+EVENT_HEARTBEAT_SECONDS = 30
@@ -0,0 +1,123 @@
+import time
+from collections import deque
+import cv2
+import numpy as np
+from config import FRAME_BUFFER_POOL_DEPTH, FRAME_BUFFER_RATE_WINDOW
+
+
+class FrameBufferPool:
+    """
+    Reusable destination arrays for per-frame image work.
+    
+    Buffers are keyed by name, shape and dtype; each key owns `depth` arrays
+    that are handed out in rotation, so a buffer is only overwritten after
+    `depth` newer frames - enough for a frame still being encoded or held as
+    the latest frame while the next one is captured. Every array the pool
+    (or a stage that could not use it) had to allocate is counted, so the
+    allocation rate shows whether steady-state monitoring still churns
+    large arrays. Not thread-safe: give each thread or process its own pool.
+    """
+    def __init__(self, depth=FRAME_BUFFER_POOL_DEPTH, rate_window=FRAME_BUFFER_RATE_WINDOW):
+        """
+        Args:
+            depth: Buffers rotated per key
+            rate_window: Seconds over which allocation_rate_kb_s is measured
+        """
+        self.depth = depth
+        self.rate_window = rate_window
+        self._buffers = {}      # (name, shape, dtype) -> list of arrays
+        self._next = {}         # (name, shape, dtype) -> index of the next buffer
+        
+        # Statistics
+        self.preallocated_bytes = 0
+        self.allocations = 0     # Arrays allocated after preallocation
+        self.allocated_bytes = 0
+        self.reuses = 0
+        self._recent = deque()   # (monotonic time, bytes) of allocations within rate_window
+    
+    def preallocate(self, name, shape, dtype=np.uint8):
+        """Allocate all buffers of a key up front (not counted as runtime allocations)."""
+        key = (name, tuple(shape), np.dtype(dtype).str)
+        buffers = self._buffers.setdefault(key, [])
+        while len(buffers) < self.depth:
+            buffer = np.empty(shape, dtype=dtype)
+            buffers.append(buffer)
+            self.preallocated_bytes += buffer.nbytes
+    
+    def get(self, name, shape, dtype=np.uint8):
+        """Next buffer of the given name, shape and dtype (allocated on first use)."""
+        key = (name, tuple(shape), np.dtype(dtype).str)
+        buffers = self._buffers.setdefault(key, [])
+        if len(buffers) < self.depth:
+            buffer = np.empty(shape, dtype=dtype)
+            buffers.append(buffer)
+            self.record_allocation(buffer.nbytes)
+            return buffer
+        
+        index = self._next.get(key, 0)
+        self._next[key] = (index + 1) % self.depth
+        self.reuses += 1
+        return buffers[index]
+    
+    def record_allocation(self, nbytes):
+        """Count an array allocated outside the pool (e.g. a source returning its own frame)."""
+        self.allocations += 1
+        self.allocated_bytes += nbytes
+        now = time.monotonic()
+        self._recent.append((now, nbytes))
+        while self._recent and self._recent[0][0] < now - self.rate_window:
+            self._recent.popleft()
+    
+    def capture_buffer(self, source):
+        """Pooled buffer for the next frame of a FrameSource (None if its size is not fixed)."""
+        if source.width and source.height:
+            return self.get('capture', (source.height, source.width, 3))
+        return None
+    
+    def check_capture(self, frame, buffer):
+        """Count the frame as an allocation if the source did not decode into `buffer`."""
+        if frame is not None and (buffer is None or not np.shares_memory(frame, buffer)):
+            self.record_allocation(frame.nbytes)
+    
+    def read(self, source):
+        """
+        source.read() into a pooled capture buffer.
+        
+        Returns:
+            tuple: (ok, frame, timestamp_ms) as FrameSource.read()
+        """
+        buffer = self.capture_buffer(source)
+        ret, frame, timestamp_ms = source.read(buffer)
+        if ret:
+            self.check_capture(frame, buffer)
+        return ret, frame, timestamp_ms
+    
+    def cvt_color(self, name, src, code):
+        """cv2.cvtColor into a pooled buffer (channel-order conversions that keep the shape)."""
+        return cv2.cvtColor(src, code, dst=self.get(name, src.shape, src.dtype))
+    
+    def resize(self, name, src, size, interpolation=cv2.INTER_LINEAR):
+        """cv2.resize to size (width, height) into a pooled buffer."""
+        width, height = size
+        dst = self.get(name, (height, width) + src.shape[2:], src.dtype)
+        return cv2.resize(src, size, dst=dst, interpolation=interpolation)
+    
+    def clear(self):
+        """Drop all buffers (e.g. after a resolution change)."""
+        self._buffers.clear()
+        self._next.clear()
+    
+    def get_stats(self):
+        """Pool size, reuse count and the allocation rate over rate_window."""
+        now = time.monotonic()
+        while self._recent and self._recent[0][0] < now - self.rate_window:
+            self._recent.popleft()
+        pooled_bytes = sum(buffer.nbytes for buffers in self._buffers.values() for buffer in buffers)
+        return {
+            'pooled_mb': round(pooled_bytes / (1024 * 1024), 1),
+            'buffers': sum(len(buffers) for buffers in self._buffers.values()),
+            'reuses': self.reuses,
+            'allocations': self.allocations,
+            'allocated_mb': round(self.allocated_bytes / (1024 * 1024), 1),
+            'allocation_rate_kb_s': round(sum(nbytes for _, nbytes in self._recent) / 1024 / self.rate_window, 1)
+        }
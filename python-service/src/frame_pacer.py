@@ -0,0 +1,94 @@
+import asyncio
+import time
+from collections import deque
+import numpy as np
+from config import TARGET_FPS, PACER_STATS_WINDOW
+
+class FramePacer:
+    """
+    Schedules frames against absolute deadlines (start + n / target_fps)
+    instead of sleeping a fixed time after each frame, so processing time
+    doesn't lower the frame rate. A frame that finishes late starts the next
+    one immediately; when a whole frame interval has been lost the missed
+    slots are skipped and the schedule re-anchored, rather than running a
+    burst of queued frames to catch up.
+    """
+    def __init__(self, target_fps=TARGET_FPS, window=PACER_STATS_WINDOW):
+        """
+        Args:
+            target_fps: Frames per second to schedule
+            window: Number of recent frames used for FPS and jitter statistics
+        """
+        self.target_fps = target_fps
+        self.interval = 1.0 / target_fps
+        self.deadline = None
+        self.frame_times = deque(maxlen=window)
+        
+        # Statistics
+        self.frames = 0
+        self.deadline_misses = 0   # Frames started after their deadline
+        self.skipped_slots = 0     # Frame slots dropped while behind
+    
+    def start(self):
+        """Anchor the schedule at the current time."""
+        self.deadline = time.monotonic()
+        self.frame_times.clear()
+    
+    def set_target_fps(self, target_fps):
+        """Change the target rate (takes effect from the next frame)."""
+        self.target_fps = target_fps
+        self.interval = 1.0 / target_fps
+        if self.deadline is not None:
+            self.deadline = time.monotonic()
+        self.frame_times.clear()
+    
+    def _next_delay(self):
+        """Advance the schedule by one frame and return seconds to wait for it."""
+        now = time.monotonic()
+        if self.deadline is None:
+            self.deadline = now
+        
+        self.deadline += self.interval
+        behind = now - self.deadline
+        if behind >= self.interval:
+            # Lost at least one whole slot - skip it instead of catching up
+            self.skipped_slots += int(behind / self.interval)
+            self.deadline = now
+        if behind > 0:
+            self.deadline_misses += 1
+        return max(0.0, self.deadline - now)
+    
+    def _record_frame(self):
+        self.frames += 1
+        self.frame_times.append(time.monotonic())
+    
+    async def wait(self):
+        """Wait (asyncio) until the next frame is due."""
+        delay = self._next_delay()
+        await asyncio.sleep(delay)
+        self._record_frame()
+    
+    def sleep(self):
+        """Block until the next frame is due."""
+        delay = self._next_delay()
+        if delay > 0:
+            time.sleep(delay)
+        self._record_frame()
+    
+    def get_stats(self):
+        """Achieved rate, deadline misses and jitter over the recent window."""
+        achieved_fps = None
+        jitter_ms = None
+        if len(self.frame_times) >= 2:
+            times = np.array(self.frame_times)
+            intervals = np.diff(times)
+            achieved_fps = round(float(len(intervals) / (times[-1] - times[0])), 1)
+            jitter_ms = round(float(np.std(intervals) * 1000), 2)
+        return {
+            'target_fps': self.target_fps,
+            'achieved_fps': achieved_fps,
+            'jitter_ms': jitter_ms,
+            'frames': self.frames,
+            'deadline_misses': self.deadline_misses,
+            'skipped_slots': self.skipped_slots
+        }
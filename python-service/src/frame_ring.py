@@ -0,0 +1,92 @@
+import numpy as np
+from multiprocessing import shared_memory
+from config import FRAME_RING_SLOTS, CAPTURE_WIDTH, CAPTURE_HEIGHT
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of preallocated frame slots in shared memory.
+    
+    The capture process writes frames directly into a slot; other processes map
+    the same memory and read frames by sequence number, so frames are never
+    pickled or copied between processes. Each slot's header holds the sequence
+    number of the frame it contains (-1 while being written), which lets
+    readers detect a slot that was overwritten while they were using it.
+    
+    Layout: [header: slots x (seq, timestamp_ms) int64][slot 0][slot 1]...
+    """
+    HEADER_ALIGN = 64
+    
+    def __init__(self, name=None, slots=FRAME_RING_SLOTS,
+                 shape=(CAPTURE_HEIGHT, CAPTURE_WIDTH, 3), create=True):
+        """
+        Args:
+            name: Shared memory block name (required when attaching)
+            slots: Number of frame slots
+            shape: Frame shape (height, width, channels), uint8
+            create: True to allocate the block, False to attach to an existing one
+        """
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.frame_bytes = int(np.prod(self.shape))
+        header_bytes = slots * 2 * 8
+        self.header_bytes = (header_bytes + self.HEADER_ALIGN - 1) // self.HEADER_ALIGN * self.HEADER_ALIGN
+        size = self.header_bytes + slots * self.frame_bytes
+        
+        self.owner = create
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+        
+        self.header = np.ndarray((slots, 2), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=self.header_bytes)
+        if create:
+            self.header[:, 0] = -1
+            self.header[:, 1] = 0
+    
+    @classmethod
+    def attach(cls, name, slots, shape):
+        """Map an existing ring created by another process."""
+        return cls(name=name, slots=slots, shape=shape, create=False)
+    
+    def begin_write(self, seq):
+        """
+        Claim the slot for a sequence number and return it as a writable array.
+        The slot is marked invalid until commit() is called.
+        """
+        slot = seq % self.slots
+        self.header[slot, 0] = -1
+        return self.frames[slot]
+    
+    def commit(self, seq, timestamp_ms):
+        """Publish a frame written with begin_write()."""
+        slot = seq % self.slots
+        self.header[slot, 1] = timestamp_ms
+        self.header[slot, 0] = seq
+    
+    def get(self, seq):
+        """
+        Get a read-only view of a frame.
+        
+        Returns:
+            tuple: (frame_view, timestamp_ms), or (None, None) if the slot no
+                   longer holds this sequence number
+        """
+        slot = seq % self.slots
+        if self.header[slot, 0] != seq:
+            return None, None
+        view = self.frames[slot]
+        view.flags.writeable = False
+        return view, int(self.header[slot, 1])
+    
+    def is_valid(self, seq):
+        """Check that a frame was not overwritten (call after using a view)."""
+        return self.header[seq % self.slots, 0] == seq
+    
+    def close(self):
+        """Unmap the ring (and free it if this process created it)."""
+        # Drop array views before closing the buffer they point into
+        self.header = None
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,304 @@
+import os
+import time
+import cv2
+import numpy as np
+from config import FRAME_SOURCE, CAPTURE_WIDTH, CAPTURE_HEIGHT, TARGET_FPS
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameSource:
+    """
+    Base class for frame sources.
+    
+    Sources yield BGR frames with capture timestamps in milliseconds. Frames
+    are resized to (width, height) when both are set and the source delivers
+    another size. Paced sources sleep in read() so frames arrive at `fps`.
+    """
+    def __init__(self, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT, fps=TARGET_FPS, paced=False):
+        """
+        Args:
+            width: Output frame width (None keeps the source size)
+            height: Output frame height (None keeps the source size)
+            fps: Frame rate for pacing and generated timestamps
+            paced: Deliver frames no faster than `fps`
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.paced = paced
+        self.frame_index = 0
+        self.finished = False  # Finite sources (files, directories) set this at the end
+        self._start_time = None
+        self._start_ms = None
+    
+    def open(self):
+        """Open the source. Returns True on success."""
+        self.frame_index = 0
+        self.finished = False
+        self._start_time = time.monotonic()
+        self._start_ms = int(time.time() * 1000)
+        return True
+    
+    def is_opened(self):
+        """True while frames can be read."""
+        return self._start_time is not None
+    
+    def read(self, out=None):
+        """
+        Read the next frame.
+        
+        Args:
+            out: Optional preallocated buffer; sources that can decode in place
+                 write into it (check np.shares_memory() on the result)
+        
+        Returns:
+            tuple: (ok, frame, timestamp_ms)
+        """
+        raise NotImplementedError
+    
+    def release(self):
+        """Close the source."""
+        self._start_time = None
+    
+    def describe(self):
+        """Short description for logs and metrics."""
+        return type(self).__name__
+    
+    def _media_timestamp(self):
+        """Timestamp of the current frame index at the source frame rate."""
+        return self._start_ms + int(self.frame_index * 1000 / self.fps)
+    
+    def _pace(self):
+        """Sleep until the current frame is due (paced sources only)."""
+        if not self.paced or not self.fps:
+            return
+        due = self._start_time + self.frame_index / self.fps
+        remaining = due - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+    
+    def _fit(self, frame):
+        """Resize a frame to the configured resolution."""
+        if self.width and self.height and (frame.shape[1], frame.shape[0]) != (self.width, self.height):
+            return cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_LINEAR)
+        return frame
+
+
+class CameraSource(FrameSource):
+    """Live camera through cv2.VideoCapture (timestamps are wall-clock capture times)."""
+    def __init__(self, index=0, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT, fps=TARGET_FPS):
+        super().__init__(width, height, fps, paced=False)
+        self.index = index
+        self.camera = None
+    
+    def open(self):
+        super().open()
+        self.camera = cv2.VideoCapture(self.index)
+        
+        # Set camera properties for better performance
+        if self.width and self.height:
+            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.camera.set(cv2.CAP_PROP_FPS, self.fps)
+        self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer to get latest frames
+        return self.camera.isOpened()
+    
+    def is_opened(self):
+        return self.camera is not None and self.camera.isOpened()
+    
+    def read(self, out=None):
+        ret, frame = self.camera.read(out) if out is not None else self.camera.read()
+        if not ret:
+            return False, None, None
+        self.frame_index += 1
+        return True, self._fit(frame), int(time.time() * 1000)
+    
+    def release(self):
+        super().release()
+        if self.camera is not None:
+            self.camera.release()
+            self.camera = None
+    
+    def describe(self):
+        return f'camera:{self.index}'
+
+
+class VideoFileSource(FrameSource):
+    """
+    Video file. Timestamps follow the file's frame rate; with `paced` frames
+    are delivered in real time, otherwise as fast as they can be decoded.
+    """
+    def __init__(self, path, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT, fps=None, paced=True, loop=False):
+        """
+        Args:
+            path: Video file path
+            fps: Override the file's frame rate (None = native FPS)
+            loop: Restart from the beginning at the end of the file
+        """
+        super().__init__(width, height, fps, paced)
+        self.path = path
+        self.loop = loop
+        self.capture = None
+    
+    def open(self):
+        super().open()
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            return False
+        if not self.fps:
+            self.fps = self.capture.get(cv2.CAP_PROP_FPS) or TARGET_FPS
+        return True
+    
+    def is_opened(self):
+        return self.capture is not None and self.capture.isOpened()
+    
+    def read(self, out=None):
+        self._pace()
+        ret, frame = self.capture.read(out) if out is not None else self.capture.read()
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read(out) if out is not None else self.capture.read()
+        if not ret:
+            self.finished = True
+            return False, None, None
+        timestamp_ms = self._media_timestamp()
+        self.frame_index += 1
+        return True, self._fit(frame), timestamp_ms
+    
+    def release(self):
+        super().release()
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+    
+    def describe(self):
+        return f'video:{self.path}'
+
+
+class ImageDirectorySource(FrameSource):
+    """Image files of a directory in name order, played back at `fps`."""
+    def __init__(self, path, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT, fps=TARGET_FPS, paced=False, loop=True):
+        super().__init__(width, height, fps, paced)
+        self.path = path
+        self.loop = loop
+        self.files = []
+    
+    def open(self):
+        super().open()
+        if not os.path.isdir(self.path):
+            return False
+        self.files = sorted(
+            os.path.join(self.path, name) for name in os.listdir(self.path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        return bool(self.files)
+    
+    def is_opened(self):
+        return super().is_opened() and bool(self.files)
+    
+    def read(self, out=None):
+        if not self.files or (not self.loop and self.frame_index >= len(self.files)):
+            self.finished = True
+            return False, None, None
+        self._pace()
+        frame = cv2.imread(self.files[self.frame_index % len(self.files)])
+        timestamp_ms = self._media_timestamp()
+        self.frame_index += 1
+        if frame is None:
+            return False, None, None
+        return True, self._fit(frame), timestamp_ms
+    
+    def describe(self):
+        return f'images:{self.path}'
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames for machines without a camera (benchmarks, soak tests).
+    A noisy background with a moving block, so motion-dependent stages
+    (motion gate, tracker) see changing content.
+    """
+    def __init__(self, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT, fps=TARGET_FPS, paced=False,
+                 num_frames=None, seed=0):
+        """
+        Args:
+            num_frames: Stop after this many frames (None = endless)
+            seed: Random seed of the background noise
+        """
+        super().__init__(width or CAPTURE_WIDTH, height or CAPTURE_HEIGHT, fps, paced)
+        self.num_frames = num_frames
+        self.seed = seed
+        self._background = None
+    
+    def open(self):
+        super().open()
+        rng = np.random.default_rng(self.seed)
+        self._background = rng.integers(0, 64, (self.height, self.width, 3), dtype=np.uint8)
+        return True
+    
+    def read(self, out=None):
+        if self.num_frames is not None and self.frame_index >= self.num_frames:
+            self.finished = True
+            return False, None, None
+        self._pace()
+        
+        frame = out if out is not None and out.shape == self._background.shape else np.empty_like(self._background)
+        np.copyto(frame, self._background)
+        
+        # Block moving left to right, one frame width every 4 seconds
+        size = self.height // 4
+        x = int((self.frame_index * self.width / (4 * self.fps)) % max(self.width - size, 1))
+        y = (self.height - size) // 2
+        frame[y:y + size, x:x + size] = 200
+        
+        timestamp_ms = self._media_timestamp()
+        self.frame_index += 1
+        return True, frame, timestamp_ms
+    
+    def describe(self):
+        return 'synthetic'
+
+
+SOURCE_TYPES = {
+    'camera': CameraSource,
+    'video': VideoFileSource,
+    'images': ImageDirectorySource,
+    'synthetic': SyntheticSource
+}
+
+
+def create_frame_source(spec=None):
+    """
+    Create a frame source from a spec.
+    
+    Args:
+        spec: dict like {'type': 'video', 'path': 'clip.mp4', 'paced': True} (remaining
+              keys are constructor arguments), a camera index, 'synthetic', or a
+              path to a video file / image directory. None uses FRAME_SOURCE from config.
+    
+    Returns:
+        FrameSource (not opened yet)
+    
+    Raises:
+        ValueError: for unknown source types
+    """
+    if spec is None:
+        spec = FRAME_SOURCE
+    
+    if isinstance(spec, int):
+        return CameraSource(index=spec)
+    if isinstance(spec, str):
+        if spec.isdigit():
+            return CameraSource(index=int(spec))
+        if spec == 'synthetic':
+            return SyntheticSource()
+        if os.path.isdir(spec):
+            return ImageDirectorySource(spec)
+        return VideoFileSource(spec)
+    
+    options = dict(spec)
+    source_type = options.pop('type', 'camera')
+    if source_type not in SOURCE_TYPES:
+        raise ValueError(f'Unknown frame source type: {source_type}')
+    return SOURCE_TYPES[source_type](**options)
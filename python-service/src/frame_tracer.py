@@ -0,0 +1,275 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from config import TRACE_ENABLED, TRACE_CAPACITY, TRACE_SLOW_FRAME_MS, TRACE_SLOW_FRAME_SAMPLES, TRACE_MAX_LANES
+
+# One row per finished span. Times are perf_counter_ns() values.
+SPAN_DTYPE = np.dtype([
+    ('trace_id', 'i8'),     # Frame the span belongs to (0 = outside any frame)
+    ('stage', 'u2'),        # Index into FrameTracer.stages
+    ('lane', 'u2'),         # Index into FrameTracer.lanes (thread or client)
+    ('start', 'i8'),
+    ('end', 'i8')
+])
+
+
+class _Span:
+    """Context manager recording one span when it exits."""
+    __slots__ = ('tracer', 'stage', 'lane', 'trace_id', 'start')
+    
+    def __init__(self, tracer, stage, lane, trace_id):
+        self.tracer = tracer
+        self.stage = stage
+        self.lane = lane
+        self.trace_id = trace_id
+        self.start = 0
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.stage, self.start, time.perf_counter_ns(), self.lane, self.trace_id)
+        return False
+
+
+class _NullSpan:
+    """Span of a disabled tracer (records nothing)."""
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class FrameTracer:
+    """
+    Per-frame stage spans with Chrome trace-event export.
+    
+    Each captured frame gets a trace ID from begin_frame(); stages executed
+    for it (on the event loop, the capture/inference threads or per client
+    send) record (trace ID, stage, lane, start, end) rows into a fixed-size
+    ring with perf_counter_ns() timestamps, so tracing retains nothing per
+    frame. Spans use the current frame's ID unless given one - the monitoring
+    loop handles one frame at a time. Frames whose end-to-end time exceeds
+    `slow_frame_ms` have their spans copied out of the ring when they end
+    (only the rows written since the frame began), so they can be inspected
+    after the ring has wrapped.
+    """
+    def __init__(self, capacity=TRACE_CAPACITY, slow_frame_ms=TRACE_SLOW_FRAME_MS,
+                 slow_frame_samples=TRACE_SLOW_FRAME_SAMPLES, enabled=TRACE_ENABLED):
+        """
+        Args:
+            capacity: Number of spans kept
+            slow_frame_ms: End-to-end time above which a frame is sampled
+            slow_frame_samples: Number of slow frames kept
+            enabled: False records nothing (and allocates no ring)
+        """
+        self.enabled = enabled
+        self.capacity = capacity if enabled else 0
+        self.slow_frame_ms = slow_frame_ms
+        self._spans = np.zeros(self.capacity, dtype=SPAN_DTYPE)
+        self._next = 0       # Row written by the next span
+        self.count = 0       # Spans currently held
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        
+        self.stages = []     # Stage names, indexed by the 'stage' column
+        self._stage_ids = {}
+        self.lanes = []      # Lane names, indexed by the 'lane' column
+        self._lane_ids = {}
+        self._thread_lanes = {}  # Thread ident -> lane
+        
+        # Current frame
+        self.frame_id = 0
+        self._frame_start = 0
+        self._frame_first_span = 0  # Value of `spans` when the frame began
+        
+        # Statistics
+        self.frames = 0
+        self.spans = 0
+        self.slow_frames = deque(maxlen=slow_frame_samples)  # (trace_id, total_ms, spans array)
+        self.slow_frame_count = 0
+    
+    def _stage_id(self, stage):
+        stage_id = self._stage_ids.get(stage)
+        if stage_id is None:
+            with self._lock:
+                stage_id = self._stage_ids.setdefault(stage, len(self.stages))
+                if stage_id == len(self.stages):
+                    self.stages.append(stage)
+        return stage_id
+    
+    def lane(self, name):
+        """
+        Lane ID for a name (a thread or client). Past TRACE_MAX_LANES lanes,
+        new names share an 'other' lane.
+        """
+        lane_id = self._lane_ids.get(name)
+        if lane_id is None:
+            with self._lock:
+                if name not in self._lane_ids and len(self.lanes) >= TRACE_MAX_LANES - 1:
+                    name = 'other'
+                lane_id = self._lane_ids.setdefault(name, len(self.lanes))
+                if lane_id == len(self.lanes):
+                    self.lanes.append(name)
+        return lane_id
+    
+    def _thread_lane(self):
+        ident = threading.get_ident()
+        lane_id = self._thread_lanes.get(ident)
+        if lane_id is None:
+            lane_id = self._thread_lanes[ident] = self.lane(threading.current_thread().name)
+        return lane_id
+    
+    def begin_frame(self):
+        """Start a frame and return its trace ID (0 if disabled)."""
+        if not self.enabled:
+            return 0
+        self.frames += 1
+        self.frame_id = self.frames
+        self._frame_start = time.perf_counter_ns()
+        self._frame_first_span = self.spans
+        return self.frame_id
+    
+    def end_frame(self, trace_id=None):
+        """
+        Finish a frame: record its 'frame' span and sample it if it was slow.
+        
+        Returns:
+            float: End-to-end time in ms (None if disabled)
+        """
+        if not self.enabled:
+            return None
+        trace_id = self.frame_id if trace_id is None else trace_id
+        end = time.perf_counter_ns()
+        self.record('frame', self._frame_start, end, trace_id=trace_id)
+        total_ms = (end - self._frame_start) / 1e6
+        if total_ms > self.slow_frame_ms:
+            self.slow_frame_count += 1
+            self.slow_frames.append((trace_id, total_ms, self._frame_spans(trace_id, self._frame_first_span)))
+        return total_ms
+    
+    def span(self, stage, lane=None, trace_id=None):
+        """
+        Context manager timing a stage of the current (or given) frame.
+        
+        Args:
+            stage: Stage name
+            lane: Lane name (default: the calling thread's name)
+            trace_id: Frame trace ID (default: the current frame)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage, lane, trace_id)
+    
+    def record(self, stage, start, end, lane=None, trace_id=None):
+        """Record a finished span (perf_counter_ns() start and end)."""
+        if not self.enabled:
+            return
+        stage_id = self._stage_id(stage)
+        lane_id = self._thread_lane() if lane is None else self.lane(lane)
+        trace_id = self.frame_id if trace_id is None else trace_id
+        with self._lock:
+            self._spans[self._next] = (trace_id, stage_id, lane_id, start, end)
+            self._next = (self._next + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.spans += 1
+    
+    def _ordered(self):
+        """Spans held in the ring, oldest first (a copy)."""
+        with self._lock:
+            if self.count < self.capacity:
+                return self._spans[:self.count].copy()
+            return np.concatenate([self._spans[self._next:], self._spans[:self._next]])
+    
+    def _frame_spans(self, trace_id, first_span):
+        """A frame's spans among those recorded since span number `first_span` (a copy)."""
+        with self._lock:
+            count = min(self.spans - first_span, self.count)
+            start = (self._next - count) % self.capacity
+            if start + count <= self.capacity:
+                spans = self._spans[start:start + count]
+            else:
+                spans = np.concatenate([self._spans[start:], self._spans[:self._next]])
+            return spans[spans['trace_id'] == trace_id]
+    
+    def _events(self, spans, pid):
+        """Chrome 'complete' events for spans."""
+        starts = (spans['start'] - self._origin_ns) / 1000.0
+        durations = (spans['end'] - spans['start']) / 1000.0
+        return [{
+            'name': self.stages[stage],
+            'cat': 'frame',
+            'ph': 'X',
+            'ts': round(float(ts), 3),
+            'dur': round(float(dur), 3),
+            'pid': pid,
+            'tid': int(lane),
+            'args': {'trace_id': int(trace_id)}
+        } for trace_id, stage, lane, ts, dur in zip(spans['trace_id'], spans['stage'], spans['lane'],
+                                                    starts, durations)]
+    
+    def dump(self, seconds=None, slow_frames=True):
+        """
+        Spans as Chrome trace-event JSON (chrome://tracing, Perfetto).
+        
+        Args:
+            seconds: Only spans ending in the last `seconds` (None = whole ring)
+            slow_frames: Include the sampled slow frames as a second process
+        
+        Returns:
+            dict: {'traceEvents': [...], 'displayTimeUnit': 'ms', 'otherData': {...}}
+        """
+        spans = self._ordered()
+        if seconds is not None:
+            spans = spans[spans['end'] >= time.perf_counter_ns() - int(seconds * 1e9)]
+        
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': 'posture pipeline'}}]
+        events += [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': lane_id, 'args': {'name': name}}
+                   for lane_id, name in enumerate(self.lanes)]
+        events += self._events(spans, pid=1)
+        
+        if slow_frames and self.slow_frames:
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': 2, 'args': {'name': 'slow frames'}})
+            events += [{'name': 'thread_name', 'ph': 'M', 'pid': 2, 'tid': lane_id, 'args': {'name': name}}
+                       for lane_id, name in enumerate(self.lanes)]
+            for _, _, frame_spans in self.slow_frames:
+                events += self._events(frame_spans, pid=2)
+        
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'spans': len(spans),
+                'slow_frame_ms': self.slow_frame_ms,
+                'slow_frames': [{'trace_id': trace_id, 'total_ms': round(total_ms, 3)}
+                                for trace_id, total_ms, _ in self.slow_frames]
+            }
+        }
+    
+    def clear(self):
+        """Drop all spans and slow-frame samples."""
+        with self._lock:
+            self._next = 0
+            self.count = 0
+        self.slow_frames.clear()
+    
+    def get_stats(self):
+        """Ring size and slow-frame counts for metrics reporting."""
+        return {
+            'enabled': self.enabled,
+            'frames': self.frames,
+            'spans': self.spans,
+            'held': self.count,
+            'capacity': self.capacity,
+            'bytes': self._spans.nbytes,
+            'slow_frames': self.slow_frame_count,
+            'slow_frame_ms': self.slow_frame_ms
+        }
@@ -0,0 +1,255 @@
+"""
+Headless posture monitoring.
+
+Runs capture, PostureDetector and PostureAnalyzer with no WebSocket server and
+no preview encoding, writing one JSON object per processed frame (JSON Lines)
+to stdout or a rotating file.
+
+Usage:
+    python headless.py                                  # JSON Lines to stdout
+    python headless.py --output posture.jsonl --calibrate-frames 30
+    python headless.py --fields timestamp,is_bad,posture_issues --flush-interval 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from baseline_calibrator import BaselineCalibrator
+from clock import MonotonicClock, ReplayClock
+from frame_source import CameraSource, create_frame_source
+from frame_pacer import FramePacer
+from frame_buffer_pool import FrameBufferPool
+from pose_detector import PostureDetector
+from posture_analyzer import PostureAnalyzer
+from config import (TARGET_FPS, HEADLESS_FIELDS, HEADLESS_FLUSH_SECONDS,
+                    HEADLESS_MAX_BYTES, HEADLESS_BACKUP_COUNT)
+
+
+class JsonLinesWriter:
+    """
+    Buffered JSON Lines writer.
+    Lines are batched in memory and written every `flush_interval` seconds.
+    File output rotates like logging's RotatingFileHandler (file.1 ... file.N).
+    """
+    def __init__(self, path=None, flush_interval=HEADLESS_FLUSH_SECONDS,
+                 max_bytes=HEADLESS_MAX_BYTES, backup_count=HEADLESS_BACKUP_COUNT):
+        """
+        Args:
+            path: Output file path, or None for stdout
+            flush_interval: Seconds between writes of the buffered lines
+            max_bytes: Rotate the file when it would grow beyond this size (0 = never)
+            backup_count: Number of rotated files to keep
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.stream = open(path, 'a', encoding='utf-8') if path else sys.stdout
+
+    def write(self, record):
+        """Queue one record; flushes when the batching interval has elapsed."""
+        self.buffer.append(json.dumps(record, separators=(',', ':')))
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered lines."""
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+
+        data = '\n'.join(self.buffer) + '\n'
+        self.buffer.clear()
+
+        if self.path and self.max_bytes > 0 and self.stream.tell() + len(data) > self.max_bytes:
+            self._rotate()
+
+        self.stream.write(data)
+        self.stream.flush()
+
+    def _rotate(self):
+        """Shift file.N-1 -> file.N ... file -> file.1 and reopen."""
+        self.stream.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{i}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.stream = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        """Flush remaining lines and close the file."""
+        self.flush()
+        if self.path:
+            self.stream.close()
+
+
+class HeadlessMonitor:
+    """Capture -> detect -> analyze loop writing results as JSON Lines."""
+    def __init__(self, writer, fields=HEADLESS_FIELDS, source=None,
+                 target_fps=TARGET_FPS, calibrate_frames=0):
+        """
+        Args:
+            writer: JsonLinesWriter receiving one record per frame
+            fields: Record fields to emit (posture_status/analysis keys, plus 'timestamp')
+            source: Frame source spec for create_frame_source() (None = FRAME_SOURCE)
+            target_fps: Maximum frame processing rate
+            calibrate_frames: Frames used to calibrate the baseline at startup (0 = none)
+        """
+        self.writer = writer
+        self.fields = list(fields)
+        self.source = create_frame_source(source)
+        self.pacer = FramePacer(target_fps)
+        self.buffers = FrameBufferPool()  # Reused capture frames
+
+        # Cameras run in real time; files and synthetic frames follow their frame
+        # timestamps, so durations match the recording at any processing speed
+        self.clock = MonotonicClock() if isinstance(self.source, CameraSource) else ReplayClock()
+        self.detector = PostureDetector(clock=self.clock)
+        self.analyzer = PostureAnalyzer(clock=self.clock)
+        self.calibrator = BaselineCalibrator(num_frames=calibrate_frames) if calibrate_frames > 0 else None
+        if self.calibrator is not None:
+            self.detector.set_calibrating(True)
+
+        self.frames_processed = 0
+        self.running = False
+
+    def _build_record(self, timestamp_ms, posture_status, analysis):
+        """Select configured fields from detector and analyzer output."""
+        values = dict(posture_status)
+        values.update(analysis)
+        values['timestamp'] = timestamp_ms
+        return {field: values.get(field) for field in self.fields}
+
+    def _update_calibration(self, posture_status):
+        """Feed startup calibration; applies the baseline when complete."""
+        self.calibrator.add(posture_status)
+        if self.calibrator.is_complete():
+            success = self.detector.set_baseline(**self.calibrator.compute_baseline())
+            print(f"Baseline calibrated from {self.calibrator.collected} frames: {success}",
+                  file=sys.stderr, flush=True)
+            self.calibrator = None
+        elif self.calibrator.has_failed():
+            print("Baseline calibration failed: no face detected", file=sys.stderr, flush=True)
+            self.calibrator = None
+        if self.calibrator is None:
+            self.detector.set_calibrating(False)
+
+    def run(self, max_frames=None):
+        """Process frames until interrupted (or `max_frames` processed)."""
+        if not self.source.open():
+            self.source.release()
+            raise RuntimeError(f"Failed to open frame source ({self.source.describe()})")
+
+        wall_start = time.monotonic()
+        cpu_start = time.process_time()
+        self.running = True
+        self.pacer.start()
+
+        try:
+            while self.running and (max_frames is None or self.frames_processed < max_frames):
+                ret, frame, timestamp_ms = self.buffers.read(self.source)
+                if not ret:
+                    if self.source.finished:
+                        break
+                    time.sleep(self.pacer.interval)
+                    continue
+
+                posture_status = self.detector.check_posture(frame, timestamp_ms)
+                analysis = self.analyzer.update(posture_status)
+
+                # 'auto' pose model: benchmark once frames with a face were seen
+                benchmark_frames = self.detector.take_pose_benchmark_frames()
+                if benchmark_frames is not None:
+                    info = self.detector.set_pose_model('auto', benchmark_frames)
+                    print(f"Pose model benchmarked on live frames: {info['variant']}", file=sys.stderr, flush=True)
+
+                if self.calibrator is not None:
+                    self._update_calibration(posture_status)
+
+                self.writer.write(self._build_record(timestamp_ms, posture_status, analysis))
+                self.frames_processed += 1
+
+                # Next frame at its deadline (TARGET_FPS or --fps)
+                self.pacer.sleep()
+        finally:
+            self.source.release()
+            self.writer.flush()
+
+            elapsed = time.monotonic() - wall_start
+            cpu = time.process_time() - cpu_start
+            if elapsed > 0:
+                pacing = self.pacer.get_stats()
+                print(f"Processed {self.frames_processed} frames in {elapsed:.1f}s "
+                      f"({self.frames_processed / elapsed:.1f} FPS, CPU {100 * cpu / elapsed:.0f}%, "
+                      f"{pacing['deadline_misses']} deadline misses, jitter {pacing['jitter_ms']} ms)",
+                      file=sys.stderr, flush=True)
+
+    def close(self):
+        """Clean up resources."""
+        self.writer.close()
+        self.detector.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless posture monitoring with JSON Lines output")
+    parser.add_argument('--output', '-o', default='-',
+                        help="Output file path, or '-' for stdout (default)")
+    parser.add_argument('--fields', default=','.join(HEADLESS_FIELDS),
+                        help="Comma-separated record fields")
+    parser.add_argument('--flush-interval', type=float, default=HEADLESS_FLUSH_SECONDS,
+                        help="Seconds between batched writes")
+    parser.add_argument('--max-bytes', type=int, default=HEADLESS_MAX_BYTES,
+                        help="Rotate output file at this size (0 = never)")
+    parser.add_argument('--backup-count', type=int, default=HEADLESS_BACKUP_COUNT,
+                        help="Rotated output files to keep")
+    parser.add_argument('--source', default=None,
+                        help="Camera index, video file, image directory or 'synthetic' (default: FRAME_SOURCE)")
+    parser.add_argument('--fps', type=float, default=TARGET_FPS, help="Maximum frames per second")
+    parser.add_argument('--calibrate-frames', type=int, default=0,
+                        help="Calibrate the good posture baseline from the first N frames")
+    parser.add_argument('--max-frames', type=int, default=None, help="Stop after N frames")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    writer = JsonLinesWriter(
+        path=None if args.output == '-' else args.output,
+        flush_interval=args.flush_interval,
+        max_bytes=args.max_bytes,
+        backup_count=args.backup_count
+    )
+
+    # Keep stdout clean for JSON Lines - diagnostic prints go to stderr
+    sys.stdout = sys.stderr
+
+    monitor = None
+    try:
+        monitor = HeadlessMonitor(
+            writer,
+            fields=[field.strip() for field in args.fields.split(',') if field.strip()],
+            source=args.source,
+            target_fps=args.fps,
+            calibrate_frames=args.calibrate_frames
+        )
+        monitor.run(max_frames=args.max_frames)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"FATAL ERROR: {e}", file=sys.stderr, flush=True)
+        print(f"Traceback: {traceback.format_exc()}", file=sys.stderr, flush=True)
+        sys.exit(1)
+    finally:
+        if monitor is not None:
+            monitor.close()
+        else:
+            writer.close()
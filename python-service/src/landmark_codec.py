@@ -0,0 +1,115 @@
+import base64
+import struct
+import numpy as np
+from config import OVERLAY_KEY_FACE_INDICES, OVERLAY_KEY_POSE_INDICES
+
+# Binary layout (little-endian):
+#   header   uint8 version, uint8 landmark set, uint16 face count, uint16 pose count
+#   face     face count x (int16 x, int16 y)
+#   pose     pose count x (int16 x, int16 y, int16 visibility)
+# Coordinates are normalized image positions times COORDINATE_SCALE (range +-2,
+# ~0.1 px at 1080p); visibility is times VISIBILITY_SCALE. Landmarks that are
+# missing (e.g. not propagated by the tracker) are MISSING in every component.
+# An absent face or pose has count 0.
+HEADER = struct.Struct('<BBHH')
+VERSION = 1
+COORDINATE_SCALE = 16384
+VISIBILITY_SCALE = 32767
+MISSING = -32768
+
+FACE_MESH_SIZE = 478
+POSE_SIZE = 33
+
+LANDMARK_SETS = {
+    'key': 0,
+    'mesh': 1
+}
+
+
+def landmark_indices(landmark_set):
+    """
+    Face and pose landmark indices encoded for a landmark set, in encoding order.
+    
+    Raises:
+        ValueError: for unknown landmark sets
+    """
+    if landmark_set == 'key':
+        return list(OVERLAY_KEY_FACE_INDICES), list(OVERLAY_KEY_POSE_INDICES)
+    if landmark_set == 'mesh':
+        return list(range(FACE_MESH_SIZE)), list(range(POSE_SIZE))
+    raise ValueError(f"Unknown landmark set: {landmark_set}")
+
+
+def _quantize(landmarks, indices, with_visibility):
+    """Selected landmarks as an int16 array (MISSING where absent)."""
+    columns = 3 if with_visibility else 2
+    values = np.full((len(indices), columns), np.nan, dtype=np.float64)
+    for row, index in enumerate(indices):
+        landmark = landmarks[index] if index < len(landmarks) else None
+        if landmark is None:
+            continue
+        values[row, 0] = landmark.x
+        values[row, 1] = landmark.y
+        if with_visibility:
+            values[row, 2] = landmark.visibility
+    
+    scales = np.array([COORDINATE_SCALE, COORDINATE_SCALE, VISIBILITY_SCALE][:columns], dtype=np.float64)
+    quantized = np.clip(np.rint(values * scales), MISSING + 1, 32767)
+    quantized[np.isnan(values)] = MISSING
+    return quantized.astype('<i2')
+
+
+def encode_landmarks(face_landmarks, pose_landmarks, landmark_set='key'):
+    """
+    Pack face and pose landmarks into the binary layout above.
+    
+    Args:
+        face_landmarks: Face landmarks (MediaPipe or sparse tracked list), or None
+        pose_landmarks: Pose landmarks, or None
+        landmark_set: 'key' or 'mesh' (see landmark_indices)
+    
+    Returns:
+        bytes
+    """
+    face_indices, pose_indices = landmark_indices(landmark_set)
+    face = _quantize(face_landmarks, face_indices, False) if face_landmarks else np.empty((0, 2), '<i2')
+    pose = _quantize(pose_landmarks, pose_indices, True) if pose_landmarks else np.empty((0, 3), '<i2')
+    header = HEADER.pack(VERSION, LANDMARK_SETS[landmark_set], len(face), len(pose))
+    return header + face.tobytes() + pose.tobytes()
+
+
+def encode_landmarks_base64(face_landmarks, pose_landmarks, landmark_set='key'):
+    """encode_landmarks() as a base64 string for JSON messages."""
+    return base64.b64encode(encode_landmarks(face_landmarks, pose_landmarks, landmark_set)).decode('ascii')
+
+
+def decode_landmarks(data):
+    """
+    Unpack encode_landmarks() output.
+    
+    Returns:
+        tuple: (face, pose) float32 arrays of shape (N, 2) and (M, 3) with
+               NaN for missing landmarks
+    
+    Raises:
+        ValueError: if the data is truncated or has an unknown version
+    """
+    if len(data) < HEADER.size:
+        raise ValueError('Landmark data too short')
+    version, _, face_count, pose_count = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f'Unsupported landmark data version: {version}')
+    if len(data) != HEADER.size + 2 * (2 * face_count + 3 * pose_count):
+        raise ValueError('Landmark data size does not match its header')
+    
+    values = np.frombuffer(data, dtype='<i2', offset=HEADER.size)
+    face = values[:2 * face_count].reshape(face_count, 2)
+    pose = values[2 * face_count:].reshape(pose_count, 3)
+    
+    def dequantize(quantized, scales):
+        result = quantized.astype(np.float32) / np.array(scales, dtype=np.float32)
+        result[quantized == MISSING] = np.nan
+        return result
+    
+    return (dequantize(face, [COORDINATE_SCALE] * 2),
+            dequantize(pose, [COORDINATE_SCALE, COORDINATE_SCALE, VISIBILITY_SCALE]))
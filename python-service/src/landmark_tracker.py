@@ -0,0 +1,169 @@
+import cv2
+import numpy as np
+from config import (LANDMARK_TRACKING_SCALE, LANDMARK_TRACKING_MAX_AGE_SECONDS,
+                    LANDMARK_TRACKING_MAX_FB_ERROR, LANDMARK_TRACKING_MAX_DRIFT)
+
+class TrackedLandmark:
+    """Normalized landmark position, compatible with MediaPipe landmark attributes."""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+    
+    def __init__(self, x, y, visibility=1.0):
+        self.x = x
+        self.y = y
+        self.z = 0.0
+        self.visibility = visibility
+
+
+class LandmarkTracker:
+    """
+    Propagates a few key landmarks from the last inferred frame to the current
+    one with pyramidal Lucas-Kanade optical flow on a downscaled grayscale image.
+    Lets metrics be computed every frame while the landmarkers run at a
+    reduced rate; signals when a full inference is needed instead.
+    """
+    def __init__(self, scale=LANDMARK_TRACKING_SCALE,
+                 max_age_seconds=LANDMARK_TRACKING_MAX_AGE_SECONDS,
+                 max_fb_error=LANDMARK_TRACKING_MAX_FB_ERROR,
+                 max_drift=LANDMARK_TRACKING_MAX_DRIFT):
+        """
+        Args:
+            scale: Downscale factor of the tracking image
+            max_age_seconds: Maximum time since the last full inference
+            max_fb_error: Maximum forward-backward error (tracking image pixels)
+            max_drift: Maximum movement of any point since last inference (frame pixels)
+        """
+        self.scale = scale
+        self.max_age_ms = max_age_seconds * 1000
+        self.max_fb_error = max_fb_error
+        self.max_drift = max_drift
+        self.lk_params = dict(
+            winSize=(15, 15),
+            maxLevel=2,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        )
+        
+        self.prev_gray = None
+        self.prev_points = None       # Nx1x2 float32, tracking image pixels
+        self.keyframe_points = None   # Points at last full inference
+        self.keyframe_ms = None
+        self.face_indices = []
+        self.pose_indices = []
+        self.pose_visibility = []
+        self.face_count = 0
+        self.pose_count = 0
+        
+        # Statistics
+        self.tracked_frames = 0
+        self.rejections = {'age': 0, 'lost': 0, 'fb_error': 0, 'drift': 0}
+    
+    def _gray(self, frame):
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    
+    def start(self, frame, timestamp_ms, face_landmarks, face_indices, pose_landmarks=None, pose_indices=()):
+        """
+        Start tracking from a fully inferred frame.
+        
+        Args:
+            frame: BGR frame the landmarks were detected on
+            timestamp_ms: Frame timestamp
+            face_landmarks: MediaPipe face landmarks (None stops tracking)
+            face_indices: Face landmark indices to track
+            pose_landmarks: MediaPipe pose landmarks (optional)
+            pose_indices: Pose landmark indices to track
+        """
+        if not face_landmarks:
+            self.reset()
+            return
+        
+        height, width = frame.shape[:2]
+        self.frame_size = (width, height)
+        self.face_count = len(face_landmarks)
+        self.face_indices = list(face_indices)
+        points = [(face_landmarks[i].x * width, face_landmarks[i].y * height) for i in self.face_indices]
+        
+        self.pose_indices = []
+        self.pose_visibility = []
+        self.pose_count = 0
+        if pose_landmarks:
+            self.pose_count = len(pose_landmarks)
+            self.pose_indices = list(pose_indices)
+            self.pose_visibility = [pose_landmarks[i].visibility for i in self.pose_indices]
+            points += [(pose_landmarks[i].x * width, pose_landmarks[i].y * height) for i in self.pose_indices]
+        
+        self.prev_gray = self._gray(frame)
+        self.prev_points = (np.array(points, dtype=np.float32) * self.scale).reshape(-1, 1, 2)
+        self.keyframe_points = self.prev_points.copy()
+        self.keyframe_ms = timestamp_ms
+    
+    def track(self, frame, timestamp_ms):
+        """
+        Propagate tracked points to this frame.
+        
+        Returns:
+            tuple: (face_landmarks, pose_landmarks, (dx, dy)) with sparse landmark
+                   lists (only tracked indices set) and the mean face displacement in
+                   frame pixels since the last inference, or None if a full
+                   inference is needed
+        """
+        if self.prev_points is None:
+            return None
+        
+        if timestamp_ms - self.keyframe_ms >= self.max_age_ms:
+            self.rejections['age'] += 1
+            return None
+        
+        gray = self._gray(frame)
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, self.prev_points, None, **self.lk_params)
+        back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, next_points, None, **self.lk_params)
+        
+        if next_points is None or not status.all() or not back_status.all():
+            self.rejections['lost'] += 1
+            return None
+        
+        fb_error = np.linalg.norm((back_points - self.prev_points).reshape(-1, 2), axis=1)
+        if fb_error.max() > self.max_fb_error:
+            self.rejections['fb_error'] += 1
+            return None
+        
+        displacement = (next_points - self.keyframe_points).reshape(-1, 2) / self.scale
+        if np.linalg.norm(displacement, axis=1).max() > self.max_drift:
+            self.rejections['drift'] += 1
+            return None
+        
+        self.prev_gray = gray
+        self.prev_points = next_points
+        self.tracked_frames += 1
+        
+        # Rebuild sparse landmark lists in normalized coordinates
+        width, height = self.frame_size
+        points = next_points.reshape(-1, 2) / self.scale
+        num_face = len(self.face_indices)
+        
+        face_landmarks = [None] * self.face_count
+        for i, idx in enumerate(self.face_indices):
+            face_landmarks[idx] = TrackedLandmark(points[i][0] / width, points[i][1] / height)
+        
+        pose_landmarks = None
+        if self.pose_indices:
+            pose_landmarks = [None] * self.pose_count
+            for i, idx in enumerate(self.pose_indices):
+                point = points[num_face + i]
+                pose_landmarks[idx] = TrackedLandmark(point[0] / width, point[1] / height, self.pose_visibility[i])
+        
+        dx, dy = displacement[:num_face].mean(axis=0)
+        return face_landmarks, pose_landmarks, (float(dx), float(dy))
+    
+    def reset(self):
+        """Stop tracking (next frame needs full inference)."""
+        self.prev_gray = None
+        self.prev_points = None
+        self.keyframe_points = None
+        self.keyframe_ms = None
+    
+    def get_stats(self):
+        """Tracking statistics for metrics reporting."""
+        return {
+            'tracked_frames': self.tracked_frames,
+            'rejections': dict(self.rejections)
+        }
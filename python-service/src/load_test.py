@@ -0,0 +1,493 @@
+"""
+WebSocket load test for the posture server.
+
+Starts the real WebSocketServer in a child process (or targets a running one
+with --url), starts monitoring on a frame source and connects simulated
+clients of these kinds:
+    fast          reads every message as it arrives
+    slow          sleeps LOAD_TEST_SLOW_READER_DELAY after each message
+    stalled       connects and never reads
+    reconnecting  reads for LOAD_TEST_RECONNECT_SECONDS, disconnects, repeats
+    chatty        reads, and sends set_thresholds / get_statistics at LOAD_TEST_COMMAND_RATE
+    events        subscribes to posture events and heartbeats only (no posture_result)
+It reports broadcast latency percentiles (from the 'published_at' stamp of
+posture_result messages), per-client throughput, command reply latency, and
+server CPU, memory and event-loop lag sampled with get_metrics. The run fails
+(exit status 1) if any of LOAD_TEST_SLOS is missed.
+
+Usage:
+    python load_test.py --clients fast=20,slow=3,stalled=2 --duration 60
+    python load_test.py --clients fast=100 --workers 4 --source clip.mp4 --slo p99_latency_ms=500
+    python load_test.py --url ws://localhost:8765 --clients fast=5,chatty=2 --output load.json
+    python load_test.py --url unix:/tmp/slouti-posture.sock --clients fast=5
+    python load_test.py --unix --clients fast=20    # started server, clients on its Unix socket
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp_proc
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import deque
+import numpy as np
+import websockets
+from config import (LOAD_TEST_PORT, LOAD_TEST_DURATION_SECONDS, LOAD_TEST_SLOW_READER_DELAY,
+                    LOAD_TEST_RECONNECT_SECONDS, LOAD_TEST_COMMAND_RATE, LOAD_TEST_SLOS)
+
+CLIENT_KINDS = ('fast', 'slow', 'stalled', 'reconnecting', 'chatty', 'events')
+
+# Results carry a preview frame, so clients only pick the fields they need out
+# of the message text - parsing every frame would make the load generator,
+# not the server, the bottleneck
+TYPE_PATTERN = re.compile(r'"type": "(\w+)"')
+PUBLISHED_AT_PATTERN = re.compile(r'"published_at": ([0-9.eE+-]+)')
+
+SERVER_START_TIMEOUT_SECONDS = 60
+METRICS_INTERVAL_SECONDS = 1.0
+
+
+def serve(port, ipc_path=None):
+    """Run the posture server on localhost:`port` (child process entry point)."""
+    from clock import MonotonicClock
+    from pose_detector import PostureDetector
+    from posture_analyzer import PostureAnalyzer
+    from websocket_server import WebSocketServer
+
+    clock = MonotonicClock()
+    server = WebSocketServer(port=port, ipc_path=ipc_path)
+    server.detector = PostureDetector(clock=clock)
+    server.analyzer = PostureAnalyzer(clock=clock)
+    try:
+        asyncio.run(server.start())
+    finally:
+        server.detector.close()
+
+
+def connect(url, **kwargs):
+    """Open a client connection; 'unix:<path>' URLs use the Unix socket transport."""
+    if url.startswith('unix:'):
+        return websockets.unix_connect(url[len('unix:'):], compression=None, **kwargs)
+    return websockets.connect(url, **kwargs)
+
+
+def percentiles(values):
+    """p50/p90/p99/max of a list of milliseconds (None when empty)."""
+    if not values:
+        return None
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        'p50': round(float(p50), 2),
+        'p90': round(float(p90), 2),
+        'p99': round(float(p99), 2),
+        'max': round(float(np.max(values)), 2),
+        'samples': len(values)
+    }
+
+
+class SimulatedClient:
+    """One simulated viewer; `kind` selects its behaviour (see CLIENT_KINDS)."""
+    def __init__(self, url, kind, name, slow_delay=LOAD_TEST_SLOW_READER_DELAY,
+                 reconnect_seconds=LOAD_TEST_RECONNECT_SECONDS, command_rate=LOAD_TEST_COMMAND_RATE):
+        self.url = url
+        self.kind = kind
+        self.name = name
+        self.slow_delay = slow_delay
+        self.reconnect_seconds = reconnect_seconds
+        self.command_rate = command_rate
+
+        self.received = 0           # posture_result messages
+        self.events = 0             # posture_event and heartbeat messages
+        self.received_bytes = 0
+        self.connects = 0
+        self.errors = 0
+        self.latencies_ms = []      # publish -> receive of posture results
+        self.command_latencies_ms = []
+        self._pending = {'thresholds_updated': deque(), 'statistics': deque()}  # reply type -> send times
+
+    async def run(self, duration):
+        """Behave as `kind` for `duration` seconds."""
+        deadline = time.monotonic() + duration
+        if self.kind == 'reconnecting':
+            while time.monotonic() < deadline:
+                await self._session(min(deadline, time.monotonic() + self.reconnect_seconds))
+        else:
+            await self._session(deadline)
+
+    async def _session(self, until):
+        """One connection, kept open until `until` (monotonic seconds)."""
+        try:
+            async with connect(self.url, max_size=None, close_timeout=1) as websocket:
+                self.connects += 1
+                if self.kind == 'events':
+                    await websocket.send(json.dumps({'type': 'subscribe', 'mode': 'events'}))
+                if self.kind == 'stalled':
+                    await asyncio.sleep(max(until - time.monotonic(), 0))
+                    return
+
+                tasks = [self._read(websocket)]
+                if self.kind == 'chatty':
+                    tasks.append(self._send_commands(websocket))
+                try:
+                    await asyncio.wait_for(asyncio.gather(*tasks), max(until - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    pass
+        except (OSError, websockets.exceptions.WebSocketException):
+            self.errors += 1
+
+    async def _read(self, websocket):
+        async for message in websocket:
+            received_at = time.time() * 1000
+            self.received_bytes += len(message)
+            match = TYPE_PATTERN.search(message, 0, 64)
+            msg_type = match.group(1) if match else None
+
+            if msg_type == 'posture_result':
+                self.received += 1
+                published = PUBLISHED_AT_PATTERN.search(message)
+                if published:
+                    self.latencies_ms.append(received_at - float(published.group(1)))
+            elif msg_type in ('posture_event', 'heartbeat'):
+                self.events += 1
+            elif self._pending.get(msg_type):
+                sent_at = self._pending[msg_type].popleft()
+                self.command_latencies_ms.append((time.perf_counter() - sent_at) * 1000)
+
+            if self.kind == 'slow':
+                await asyncio.sleep(self.slow_delay)
+
+    async def _send_commands(self, websocket):
+        """Alternate set_thresholds and get_statistics at command_rate."""
+        commands = [({'type': 'set_thresholds', 'pitch_scale': 3.0, 'distance_scale': 3.0,
+                      'head_roll_scale': 3.0, 'shoulder_tilt_scale': 3.0}, 'thresholds_updated'),
+                    ({'type': 'get_statistics'}, 'statistics')]
+        count = 0
+        while True:
+            command, reply_type = commands[count % len(commands)]
+            self._pending[reply_type].append(time.perf_counter())
+            await websocket.send(json.dumps(command))
+            count += 1
+            await asyncio.sleep(1.0 / self.command_rate)
+
+    def get_stats(self, duration):
+        """Counters and raw latencies (merged across workers by summarize())."""
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'received': self.received,
+            'events': self.events,
+            'fps': round(self.received / duration, 1),
+            'mb_per_s': round(self.received_bytes / duration / (1024 * 1024), 2),
+            'connects': self.connects,
+            'errors': self.errors,
+            'latency_ms': percentiles(self.latencies_ms),
+            'latencies_ms': self.latencies_ms,
+            'command_latencies_ms': self.command_latencies_ms
+        }
+
+
+async def run_clients(url, clients, duration, options):
+    """Run (name, kind) clients concurrently; returns their stats."""
+    simulated = [SimulatedClient(url, kind, name, **options) for name, kind in clients]
+    await asyncio.gather(*[client.run(duration) for client in simulated])
+    return [client.get_stats(duration) for client in simulated]
+
+
+def client_worker(url, clients, duration, options, result_queue):
+    """Client process entry point (--workers > 1)."""
+    result_queue.put(asyncio.run(run_clients(url, clients, duration, options)))
+
+
+async def wait_for_server(url, timeout=SERVER_START_TIMEOUT_SECONDS):
+    """Wait until the server accepts connections (models take a while to load)."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with connect(url, close_timeout=1):
+                return
+        except (OSError, websockets.exceptions.WebSocketException):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'Server at {url} did not start within {timeout}s')
+            await asyncio.sleep(0.5)
+
+
+async def _request(websocket, message, reply_type):
+    """Send a message and wait for the reply of `reply_type` (skipping broadcasts)."""
+    await websocket.send(json.dumps(message))
+    async for raw in websocket:
+        match = TYPE_PATTERN.search(raw, 0, 64)
+        msg_type = match.group(1) if match else None
+        if msg_type == reply_type:
+            return json.loads(raw)
+        if msg_type == 'error':
+            raise RuntimeError(json.loads(raw)['message'])
+
+
+async def sample_server(websocket, duration, interval=METRICS_INTERVAL_SECONDS):
+    """get_metrics samples (plus their round-trip time) every `interval` seconds."""
+    samples = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        sent_at = time.perf_counter()
+        metrics = (await _request(websocket, {'type': 'get_metrics'}, 'metrics'))['data']
+        watchdog = metrics.get('watchdog') or {}
+        samples.append({
+            'time': time.monotonic(),
+            'round_trip_ms': (time.perf_counter() - sent_at) * 1000,
+            'rss_mb': metrics.get('rss_mb'),
+            'cpu_seconds': metrics.get('cpu_seconds'),
+            'loop_lag_ms': watchdog.get('loop_lag_ms'),
+            'max_loop_lag_ms': watchdog.get('max_loop_lag_ms'),
+            'achieved_fps': (metrics.get('pacer') or {}).get('achieved_fps')
+        })
+        await asyncio.sleep(max(min(interval, deadline - time.monotonic()), 0))
+    return samples
+
+
+async def run_load_test(url, mix, duration, source='synthetic', workers=1, options=None):
+    """
+    Start monitoring on the server at `url`, run the client mix and sample the server.
+
+    Args:
+        url: Server URL
+        mix: dict kind -> number of clients
+        duration: Seconds to run the clients
+        source: Frame source spec sent with start_monitoring (if not monitoring yet)
+        workers: Processes the clients are spread over
+        options: SimulatedClient keyword arguments
+
+    Returns:
+        dict: report (see summarize)
+    """
+    options = options or {}
+    clients = [(f'{kind}-{i}', kind) for kind, count in mix.items() for i in range(count)]
+
+    await wait_for_server(url)
+    async with connect(url, max_size=None, close_timeout=1) as control:
+        metrics = (await _request(control, {'type': 'get_metrics'}, 'metrics'))['data']
+        started = not metrics.get('monitoring')
+        if started:
+            await _request(control, {'type': 'start_monitoring', 'source': source}, 'monitoring_started')
+
+        loop = asyncio.get_running_loop()
+        if workers > 1:
+            ctx = mp_proc.get_context('spawn')
+            result_queue = ctx.Queue()
+            processes = [ctx.Process(target=client_worker, daemon=True,
+                                     args=(url, clients[i::workers], duration, options, result_queue))
+                         for i in range(workers)]
+            for process in processes:
+                process.start()
+            client_future = loop.run_in_executor(
+                None, lambda: [stats for _ in processes for stats in result_queue.get()])
+        else:
+            client_future = asyncio.ensure_future(run_clients(url, clients, duration, options))
+
+        samples = await sample_server(control, duration)
+        client_stats = await client_future
+
+        if started:
+            await _request(control, {'type': 'stop_monitoring'}, 'monitoring_stopped')
+
+    return summarize(client_stats, samples, duration)
+
+
+def summarize(client_stats, samples, duration):
+    """Aggregate client stats and server samples into a report."""
+    kinds = {}
+    for kind in CLIENT_KINDS:
+        stats = [s for s in client_stats if s['kind'] == kind]
+        if not stats:
+            continue
+        fps = [s['fps'] for s in stats]
+        kinds[kind] = {
+            'clients': len(stats),
+            'min_fps': min(fps),
+            'mean_fps': round(float(np.mean(fps)), 1),
+            'mb_per_s': round(sum(s['mb_per_s'] for s in stats), 2),
+            'connects': sum(s['connects'] for s in stats),
+            'errors': sum(s['errors'] for s in stats),
+            'latency_ms': percentiles([v for s in stats for v in s['latencies_ms']])
+        }
+
+    server = {'samples': len(samples)}
+    if samples:
+        cpu = [s for s in samples if s['cpu_seconds'] is not None]
+        lags = [s['max_loop_lag_ms'] for s in samples if s['max_loop_lag_ms'] is not None]
+        rss = [s['rss_mb'] for s in samples if s['rss_mb'] is not None]
+        fps = [s['achieved_fps'] for s in samples if s['achieved_fps'] is not None]
+        server.update({
+            'cpu_percent': (round((cpu[-1]['cpu_seconds'] - cpu[0]['cpu_seconds']) /
+                                  (cpu[-1]['time'] - cpu[0]['time']) * 100, 1) if len(cpu) >= 2 else None),
+            'max_rss_mb': max(rss) if rss else None,
+            'max_loop_lag_ms': max(lags) if lags else None,
+            'min_achieved_fps': min(fps) if fps else None,
+            'metrics_round_trip_ms': percentiles([s['round_trip_ms'] for s in samples])
+        })
+
+    return {
+        'duration': duration,
+        'kinds': kinds,
+        'command_ms': percentiles([v for s in client_stats for v in s['command_latencies_ms']]),
+        'server': server,
+        'clients': [{key: value for key, value in s.items() if key not in ('latencies_ms', 'command_latencies_ms')}
+                    for s in client_stats]
+    }
+
+
+def check_slos(report, slos):
+    """
+    Compare a report with SLO limits.
+
+    Returns:
+        list: (name, measured value, limit, passed) - SLOs whose value was not
+              measured (e.g. no fast clients) pass with value None
+    """
+    fast = report['kinds'].get('fast') or {}
+    latency = fast.get('latency_ms') or {}
+    server = report['server']
+    measured = {
+        'p50_latency_ms': latency.get('p50'),
+        'p99_latency_ms': latency.get('p99'),
+        'min_fast_client_fps': fast.get('min_fps'),
+        'p99_command_ms': (report['command_ms'] or {}).get('p99'),
+        'max_loop_lag_ms': server.get('max_loop_lag_ms'),
+        'max_rss_mb': server.get('max_rss_mb'),
+        'max_cpu_percent': server.get('cpu_percent')
+    }
+
+    results = []
+    for name, limit in slos.items():
+        if name not in measured:
+            raise ValueError(f'Unknown SLO: {name}')
+        value = measured[name]
+        if value is None:
+            passed = True
+        elif name.startswith('min_'):
+            passed = value >= limit
+        else:
+            passed = value <= limit
+        results.append((name, value, limit, passed))
+    return results
+
+
+def parse_client_mix(text):
+    """Parse 'fast=20,slow=3' into {'fast': 20, 'slow': 3}."""
+    mix = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        kind, _, count = part.partition('=')
+        kind = kind.strip()
+        if kind not in CLIENT_KINDS:
+            raise ValueError(f"Unknown client kind '{kind}' (expected one of {', '.join(CLIENT_KINDS)})")
+        mix[kind] = mix.get(kind, 0) + int(count or 1)
+    return mix
+
+
+def parse_slos(overrides):
+    """LOAD_TEST_SLOS updated with 'name=value' overrides."""
+    slos = dict(LOAD_TEST_SLOS)
+    for override in overrides or []:
+        name, _, value = override.partition('=')
+        if name not in LOAD_TEST_SLOS:
+            raise ValueError(f"Unknown SLO '{name}' (expected one of {', '.join(LOAD_TEST_SLOS)})")
+        slos[name] = float(value)
+    return slos
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the posture WebSocket server")
+    parser.add_argument('--url', default=None,
+                        help="Test a running server: ws://host:port or unix:<socket path> (default: start one on --port)")
+    parser.add_argument('--port', type=int, default=LOAD_TEST_PORT, help="Port of the started server")
+    parser.add_argument('--unix', action='store_true',
+                        help="Connect to the started server over its Unix socket instead of TCP")
+    parser.add_argument('--clients', default='fast=5',
+                        help=f"Client mix, e.g. fast=20,slow=3 (kinds: {', '.join(CLIENT_KINDS)})")
+    parser.add_argument('--duration', type=float, default=LOAD_TEST_DURATION_SECONDS,
+                        help="Seconds to run the clients")
+    parser.add_argument('--source', default='synthetic',
+                        help="Frame source for start_monitoring: 'synthetic', a video file or an image directory")
+    parser.add_argument('--workers', type=int, default=1, help="Processes to spread the clients over")
+    parser.add_argument('--slow-delay', type=float, default=LOAD_TEST_SLOW_READER_DELAY,
+                        help="Seconds slow clients sleep after each message")
+    parser.add_argument('--reconnect-seconds', type=float, default=LOAD_TEST_RECONNECT_SECONDS,
+                        help="Connection lifetime of reconnecting clients")
+    parser.add_argument('--command-rate', type=float, default=LOAD_TEST_COMMAND_RATE,
+                        help="Messages per second per chatty client")
+    parser.add_argument('--slo', action='append', default=[], metavar='NAME=VALUE',
+                        help="Override an SLO from LOAD_TEST_SLOS (repeatable)")
+    parser.add_argument('--output', '-o', default=None, help="Write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def print_report(report, slo_results):
+    print(f"{'kind':<13} {'clients':>7} {'min fps':>8} {'mean fps':>8} {'MB/s':>7} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'connects':>8} {'errors':>6}")
+    for kind, row in report['kinds'].items():
+        latency = row['latency_ms'] or {}
+        print(f"{kind:<13} {row['clients']:>7} {row['min_fps']:>8} {row['mean_fps']:>8} {row['mb_per_s']:>7} "
+              f"{latency.get('p50', '-'):>8} {latency.get('p90', '-'):>8} {latency.get('p99', '-'):>8} "
+              f"{row['connects']:>8} {row['errors']:>6}")
+    if report['command_ms']:
+        print(f"commands: p50 {report['command_ms']['p50']} ms, p99 {report['command_ms']['p99']} ms "
+              f"({report['command_ms']['samples']} replies)")
+    server = report['server']
+    print(f"server: cpu {server.get('cpu_percent')}%, max rss {server.get('max_rss_mb')} MB, "
+          f"max loop lag {server.get('max_loop_lag_ms')} ms, min fps {server.get('min_achieved_fps')}")
+
+    print()
+    for name, value, limit, passed in slo_results:
+        status = 'PASS' if passed else 'FAIL'
+        print(f"{status}  {name}: {'n/a' if value is None else value} (limit {limit})")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        mix = parse_client_mix(args.clients)
+        slos = parse_slos(args.slo)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    server_process = None
+    ipc_path = None
+    url = args.url
+    if url is None:
+        ipc_path = os.path.join(tempfile.gettempdir(), f'slouti-load-test-{args.port}.sock') if args.unix else None
+        url = f'unix:{ipc_path}' if args.unix else f'ws://localhost:{args.port}'
+        server_process = mp_proc.get_context('spawn').Process(target=serve, args=(args.port, ipc_path), daemon=True)
+        server_process.start()
+
+    options = {
+        'slow_delay': args.slow_delay,
+        'reconnect_seconds': args.reconnect_seconds,
+        'command_rate': args.command_rate
+    }
+    try:
+        report = asyncio.run(run_load_test(url, mix, args.duration, args.source, args.workers, options))
+    except (RuntimeError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.join(timeout=5)
+            if ipc_path and os.path.exists(ipc_path):
+                os.unlink(ipc_path)  # Terminated before it could remove its socket
+
+    slo_results = check_slos(report, slos)
+    report['slos'] = [{'name': name, 'value': value, 'limit': limit, 'passed': passed}
+                      for name, value, limit, passed in slo_results]
+    print_report(report, slo_results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+
+    sys.exit(0 if all(passed for *_, passed in slo_results) else 1)
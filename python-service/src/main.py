@@ -1,13 +1,22 @@
 import asyncio
+import multiprocessing
 import sys
 import os
 import traceback
+from clock import MonotonicClock
 from pose_detector import PostureDetector
 from posture_analyzer import PostureAnalyzer
-from websocket_server import WebSocketServer
+from websocket_server import WebSocketServer, default_ipc_path
 
 class PostureService:
-    def __init__(self):
+    def __init__(self, clock=None, port=8765, ipc=True):
+        """
+        Args:
+            clock: Shared time source (default MonotonicClock; soak tests use a
+                   ReplayClock to run faster than real time)
+            port: WebSocket port on localhost
+            ipc: Also serve same-host clients on the Unix socket
+        """
         print("Initializing Slouti Posture Service...", flush=True)
         
         # Print diagnostic info
@@ -18,16 +27,19 @@ class PostureService:
             print(f"Running as script from: {os.path.dirname(__file__)}", flush=True)
         
         try:
+            # Shared time source for sustain timers, debouncing and statistics
+            self.clock = clock or MonotonicClock()
+            
             print("Initializing PostureDetector...", flush=True)
-            self.detector = PostureDetector()
+            self.detector = PostureDetector(clock=self.clock)
             print("PostureDetector initialized successfully", flush=True)
             
             print("Initializing PostureAnalyzer...", flush=True)
-            self.analyzer = PostureAnalyzer()
+            self.analyzer = PostureAnalyzer(clock=self.clock)
             print("PostureAnalyzer initialized successfully", flush=True)
             
             print("Initializing WebSocketServer...", flush=True)
-            self.ws_server = WebSocketServer()
+            self.ws_server = WebSocketServer(port=port, ipc_path=default_ipc_path() if ipc else None)
             print("WebSocketServer initialized successfully", flush=True)
             
             # Link detector and analyzer to WebSocket server
@@ -46,7 +58,7 @@ class PostureService:
         self.running = True
         
         try:
-            print("Starting WebSocket server on ws://localhost:8765", flush=True)
+            print(f"Starting WebSocket server on ws://localhost:{self.ws_server.port}", flush=True)
             # Start WebSocket server (runs indefinitely)
             await self.ws_server.start()
         except KeyboardInterrupt:
@@ -61,6 +73,9 @@ class PostureService:
             print("Service shutdown complete", flush=True)
 
 if __name__ == "__main__":
+    # Required for worker processes in the frozen (PyInstaller) executable
+    multiprocessing.freeze_support()
+    
     try:
         service = PostureService()
         asyncio.run(service.run())
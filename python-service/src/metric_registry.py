@@ -0,0 +1,130 @@
+from collections import namedtuple
+from config import METRIC_RULES
+
+# A per-frame measurement: the landmark sets it reads, the metrics it builds on
+# and its approximate cost per evaluation (microseconds, 1280x720 frame)
+Metric = namedtuple('Metric', ['inputs', 'depends', 'cost_us'])
+
+METRICS = {
+    'head_pose': Metric(('face',), (), 330),          # solvePnP: pitch, yaw and Euler roll
+    'eye_roll': Metric(('face',), (), 2),
+    'distance': Metric(('face',), ('head_pose',), 3),  # Yaw compensates the apparent IPD
+    'shoulder_tilt': Metric(('pose',), (), 2),
+    'body_lean_offset': Metric(('face', 'pose'), (), 2),
+    'face_bbox': Metric(('face',), (), 170)            # Min/max over all 478 face landmarks
+}
+
+# Metrics each posture rule reads (distance and head roll are only checked
+# while the head faces the camera, which needs the yaw from head_pose)
+RULE_METRICS = {
+    'head_pitch': ('head_pose',),
+    'distance': ('distance', 'head_pose'),
+    'head_roll': ('eye_roll', 'head_pose'),
+    'shoulder_tilt': ('shoulder_tilt',),
+    'body_lean': ('body_lean_offset',)
+}
+
+# Everything a good posture baseline stores
+CALIBRATION_METRICS = ('head_pose', 'eye_roll', 'distance', 'shoulder_tilt', 'body_lean_offset')
+
+
+class MetricRegistry:
+    """
+    Decides which metrics a detector evaluates per frame.
+
+    Metrics are needed by enabled posture rules and by consumers - named
+    requests such as a running calibration, the server-drawn overlay or
+    metrics a client wants reported. Everything else is skipped, and the pose
+    landmarker is not run at all when no needed metric reads pose landmarks
+    (the face landmarker always runs - it tells whether anyone is in view).
+    """
+    def __init__(self, rules=None):
+        """
+        Args:
+            rules: dict rule -> enabled (default METRIC_RULES from config)
+        """
+        self.rules = dict(METRIC_RULES if rules is None else rules)
+        self.consumers = {}   # name -> metric names
+        self._required = None
+
+        # Statistics
+        self.frames = 0
+        self.evaluated = {name: 0 for name in METRICS}
+        self.skipped_inputs = {'pose': 0}
+
+    def set_rule(self, rule, enabled):
+        """
+        Enable or disable a posture rule.
+
+        Raises:
+            ValueError: for unknown rules
+        """
+        if rule not in RULE_METRICS:
+            raise ValueError(f'Unknown posture rule: {rule}')
+        self.rules[rule] = bool(enabled)
+        self._required = None
+
+    def rule_enabled(self, rule):
+        return self.rules.get(rule, False)
+
+    def set_consumer(self, name, metrics):
+        """
+        Register the metrics a consumer needs (empty or None removes it).
+
+        Raises:
+            ValueError: for unknown metric names
+        """
+        metrics = tuple(metrics or ())
+        unknown = [metric for metric in metrics if metric not in METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metric: {', '.join(unknown)}")
+
+        if not metrics:
+            if self.consumers.pop(name, None) is not None:
+                self._required = None
+        elif self.consumers.get(name) != metrics:
+            self.consumers[name] = metrics
+            self._required = None
+
+    def required_metrics(self):
+        """Metrics needed by enabled rules and consumers, with their dependencies."""
+        if self._required is None:
+            pending = [metric for rule, enabled in self.rules.items() if enabled
+                       for metric in RULE_METRICS[rule]]
+            pending += [metric for metrics in self.consumers.values() for metric in metrics]
+            required = set()
+            while pending:
+                metric = pending.pop()
+                if metric not in required:
+                    required.add(metric)
+                    pending.extend(METRICS[metric].depends)
+            self._required = frozenset(required)
+        return self._required
+
+    def needs_input(self, landmarks):
+        """True if any required metric reads `landmarks` ('face' or 'pose')."""
+        return any(landmarks in METRICS[metric].inputs for metric in self.required_metrics())
+
+    def record(self, evaluated):
+        """Count one frame and the metrics evaluated on it."""
+        self.frames += 1
+        for metric in evaluated:
+            self.evaluated[metric] += 1
+
+    def record_skipped_input(self, landmarks):
+        """Count a pose landmarker call skipped because nothing needed its landmarks."""
+        self.skipped_inputs[landmarks] += 1
+
+    def get_stats(self):
+        """Active rules and metrics, evaluation counts and the estimated time saved."""
+        skipped_us = sum((self.frames - count) * METRICS[metric].cost_us
+                         for metric, count in self.evaluated.items())
+        return {
+            'rules': dict(self.rules),
+            'consumers': {name: list(metrics) for name, metrics in self.consumers.items()},
+            'active_metrics': sorted(self.required_metrics()),
+            'frames': self.frames,
+            'evaluated': dict(self.evaluated),
+            'skipped_landmarkers': dict(self.skipped_inputs),
+            'saved_metric_ms': round(skipped_us / 1000, 1)
+        }
@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import cv2
+import mediapipe as mp
+import numpy as np
+from config import POSE_MODEL_VARIANTS, POSE_MODEL_FRAME_BUDGET_MS, POSE_MODEL_BENCHMARK_FRAMES
+
+
+def get_model_directory():
+    """Directory holding the .task model files.
+
+    When running as PyInstaller bundle, use sys._MEIPASS,
+    otherwise use the script directory.
+    """
+    if getattr(sys, 'frozen', False):
+        return sys._MEIPASS
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def find_pose_models(model_dir=None):
+    """Find installed pose landmarker variants.
+
+    Returns:
+        dict: {variant: model_path}, only for variants whose file exists
+    """
+    model_dir = model_dir or get_model_directory()
+    models = {}
+    for variant in POSE_MODEL_VARIANTS:
+        path = os.path.join(model_dir, f'pose_landmarker_{variant}.task')
+        if os.path.exists(path):
+            models[variant] = path
+
+    # Legacy single-file install (downloaded as the heavy model)
+    legacy_path = os.path.join(model_dir, 'pose_landmarker.task')
+    if 'heavy' not in models and os.path.exists(legacy_path):
+        models['heavy'] = legacy_path
+
+    return models
+
+
+def create_face_landmarker(model_path, running_mode=None):
+    """Create a MediaPipe Face Landmarker for the given model file."""
+    vision = mp.tasks.vision
+    options = vision.FaceLandmarkerOptions(
+        base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+        running_mode=running_mode or vision.RunningMode.VIDEO,
+        num_faces=1,
+        min_face_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+    return vision.FaceLandmarker.create_from_options(options)
+
+
+def create_pose_landmarker(model_path, running_mode=None):
+    """Create a MediaPipe Pose Landmarker for the given model file."""
+    vision = mp.tasks.vision
+    options = vision.PoseLandmarkerOptions(
+        base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+        running_mode=running_mode or vision.RunningMode.VIDEO,
+        num_poses=1,
+        min_pose_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+    return vision.PoseLandmarker.create_from_options(options)
+
+
+def benchmark_pose_model(model_path, frames, num_frames=POSE_MODEL_BENCHMARK_FRAMES):
+    """Measure pose landmarker latency on this machine.
+
+    Args:
+        model_path: path to a pose_landmarker .task file
+        frames: list of BGR frames to cycle through
+        num_frames: number of timed inferences (one warm-up call is not timed)
+
+    Returns:
+        dict: {'median_ms': float, 'p90_ms': float, 'frames': int}
+    """
+    landmarker = create_pose_landmarker(model_path)
+    rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    timings = []
+    try:
+        # Warm-up call (graph initialization is much slower than steady state)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frames[0])
+        landmarker.detect_for_video(image, 0)
+
+        for i in range(num_frames):
+            image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frames[i % len(rgb_frames)])
+            start = time.perf_counter()
+            landmarker.detect_for_video(image, (i + 1) * 33)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        landmarker.close()
+
+    return {
+        'median_ms': round(float(np.median(timings)), 2),
+        'p90_ms': round(float(np.percentile(timings, 90)), 2),
+        'frames': len(timings)
+    }
+
+
+def select_pose_model(frames, budget_ms=POSE_MODEL_FRAME_BUDGET_MS, model_dir=None):
+    """Benchmark installed pose variants and pick the most accurate one within budget.
+
+    Variants are timed from most to least accurate; the first one whose median
+    latency fits the budget wins. If none fits, the fastest variant is used so
+    shoulder detection stays available on slow machines.
+
+    Frames must show a person: without one the landmarker stops after its
+    detector stage, so every variant times about the same.
+
+    Args:
+        frames: list of real BGR camera frames with a person in view
+        budget_ms: per-frame pose inference budget in milliseconds
+        model_dir: directory to search for models (defaults to model directory)
+
+    Returns:
+        dict: {
+            'variant': str or None,
+            'model_path': str or None,
+            'budget_ms': float,
+            'within_budget': bool,
+            'measurements': {variant: {'median_ms', 'p90_ms', 'frames'}}
+        }
+    """
+    models = find_pose_models(model_dir)
+    result = {
+        'variant': None,
+        'model_path': None,
+        'budget_ms': budget_ms,
+        'within_budget': False,
+        'measurements': {}
+    }
+    if not frames:
+        raise ValueError('Pose model benchmarking needs camera frames')
+    if not models:
+        return result
+
+    for variant in POSE_MODEL_VARIANTS:
+        if variant not in models:
+            continue
+        try:
+            result['measurements'][variant] = benchmark_pose_model(models[variant], frames)
+        except Exception as e:
+            print(f"Pose model '{variant}' benchmark failed: {e}", file=sys.stderr, flush=True)
+            continue
+
+        if result['measurements'][variant]['median_ms'] <= budget_ms:
+            result['variant'] = variant
+            result['within_budget'] = True
+            break
+
+    if result['variant'] is None and result['measurements']:
+        # Nothing fits the budget - fall back to the fastest measured variant
+        result['variant'] = min(result['measurements'],
+                                key=lambda v: result['measurements'][v]['median_ms'])
+
+    if result['variant'] is not None:
+        result['model_path'] = models[result['variant']]
+
+    return result
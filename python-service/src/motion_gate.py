@@ -0,0 +1,97 @@
+import cv2
+import numpy as np
+from config import (MOTION_GATE_THRESHOLD, MOTION_GATE_MAX_REUSE_SECONDS,
+                    MOTION_GATE_THUMBNAIL_SIZE, MOTION_GATE_USE_ROI)
+
+class MotionGate:
+    """
+    Cheap change detector that decides whether a frame needs a full inference.
+    Compares a tiny grayscale thumbnail of the frame (optionally only the last
+    face/shoulder region) against the thumbnail of the last inferred frame.
+    """
+    def __init__(self, threshold=MOTION_GATE_THRESHOLD,
+                 max_reuse_seconds=MOTION_GATE_MAX_REUSE_SECONDS,
+                 thumbnail_size=MOTION_GATE_THUMBNAIL_SIZE,
+                 use_roi=MOTION_GATE_USE_ROI):
+        """
+        Args:
+            threshold: Mean absolute grayscale difference (0-255) that counts as motion
+            max_reuse_seconds: Maximum age of a reused result before forcing inference
+            thumbnail_size: (width, height) of the comparison thumbnail
+            use_roi: Compare only the region of interest set by mark_inferred()
+        """
+        self.threshold = threshold
+        self.max_reuse_ms = max_reuse_seconds * 1000
+        self.thumbnail_size = thumbnail_size
+        self.use_roi = use_roi
+        
+        self.reference = None           # Thumbnail of last inferred frame
+        self.roi = None                 # (x1, y1, x2, y2) compared region
+        self.last_inference_ms = None   # Timestamp of last inferred frame
+        self.last_difference = None
+        
+        # Statistics
+        self.frames = 0
+        self.skipped_frames = 0
+    
+    def _thumbnail(self, frame, roi):
+        """Downscale (region of) frame to a small grayscale image."""
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            frame = frame[y1:y2, x1:x2]
+        small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.int16)
+    
+    def should_infer(self, frame, timestamp_ms):
+        """
+        Decide whether the frame needs a full inference.
+        
+        Returns:
+            bool: False if the previous result can be reused
+        """
+        self.frames += 1
+        
+        if self.reference is None or timestamp_ms - self.last_inference_ms >= self.max_reuse_ms:
+            return True
+        
+        thumbnail = self._thumbnail(frame, self.roi)
+        self.last_difference = float(np.mean(np.abs(thumbnail - self.reference)))
+        if self.last_difference >= self.threshold:
+            return True
+        
+        self.skipped_frames += 1
+        return False
+    
+    def mark_inferred(self, frame, timestamp_ms, roi=None):
+        """
+        Record the frame that was just inferred as the new reference.
+        
+        Args:
+            frame: BGR frame that went through full inference
+            timestamp_ms: Frame timestamp
+            roi: Optional (x1, y1, x2, y2) region to compare on following frames
+        """
+        if not self.use_roi or roi is None or roi[2] - roi[0] < 8 or roi[3] - roi[1] < 8:
+            roi = None
+        self.roi = roi
+        self.reference = self._thumbnail(frame, roi)
+        self.last_inference_ms = timestamp_ms
+    
+    def reset(self):
+        """Forget the reference frame (next frame is always inferred)."""
+        self.reference = None
+        self.roi = None
+        self.last_inference_ms = None
+    
+    def get_stats(self, timestamp_ms=None):
+        """Skip statistics for metrics reporting."""
+        reuse_age_ms = None
+        if timestamp_ms is not None and self.last_inference_ms is not None:
+            reuse_age_ms = max(0, int(timestamp_ms - self.last_inference_ms))
+        return {
+            'frames': self.frames,
+            'skipped_frames': self.skipped_frames,
+            'skip_rate': round(self.skipped_frames / self.frames, 3) if self.frames else 0.0,
+            'reuse_age_ms': reuse_age_ms,
+            'last_difference': round(self.last_difference, 2) if self.last_difference is not None else None
+        }
@@ -0,0 +1,355 @@
+import base64
+import queue
+import threading
+import time
+import multiprocessing as mp_proc
+import cv2
+import numpy as np
+from frame_ring import SharedFrameRing
+from landmark_tracker import TrackedLandmark
+from frame_source import create_frame_source
+from frame_buffer_pool import FrameBufferPool
+from config import (FRAME_RING_SLOTS, CAPTURE_WIDTH, CAPTURE_HEIGHT, TARGET_FPS, PREVIEW_SIZE, PREVIEW_JPEG_QUALITY,
+                    PREVIEW_INTERVAL)
+
+# Stage task queues hold at most this many pending frames; newer frames are
+# dropped for a busy stage rather than queued behind it
+STAGE_QUEUE_SIZE = 2
+
+# Max seconds workers wait for each other to finish loading before running anyway
+STARTUP_TIMEOUT_SECONDS = 30
+
+
+def landmarks_to_array(landmarks, with_visibility=False):
+    """Pack MediaPipe landmarks into a small float32 array (N x 3, or N x 4 with visibility)."""
+    if with_visibility:
+        return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+
+
+def landmarks_from_array(array):
+    """Unpack an array from landmarks_to_array() into landmark objects."""
+    if array is None:
+        return None
+    if array.shape[1] == 4:
+        return [TrackedLandmark(float(x), float(y), float(v)) for x, y, _, v in array]
+    return [TrackedLandmark(float(x), float(y)) for x, y, _ in array]
+
+
+def _wait_ready(ready):
+    """Wait until all workers are initialised (a failed or slow start doesn't block forever)."""
+    try:
+        ready.wait(STARTUP_TIMEOUT_SECONDS)
+    except threading.BrokenBarrierError:
+        pass
+
+
+def _put_latest(task_queue, item):
+    """Queue a task without blocking. Returns False if the stage is busy."""
+    try:
+        task_queue.put_nowait(item)
+        return True
+    except queue.Full:
+        return False
+
+
+def capture_worker(ring_name, slots, shape, source, task_queues, preview_interval, result_queue, stop_event, ready):
+    """
+    Capture process: reads frames from a FrameSource straight into ring slots.
+    Every frame goes to the landmarkers; every `preview_interval.value`-th frame
+    also goes to the preview encoder (none while it is 0).
+    """
+    ring = SharedFrameRing.attach(ring_name, slots, shape)
+    height, width = shape[:2]
+
+    if not source.open():
+        result_queue.put(('error', -1, 0, f'Failed to open frame source ({source.describe()})'))
+        ready.abort()
+        source.release()
+        ring.close()
+        return
+
+    # Don't capture before the landmarkers have loaded their models
+    _wait_ready(ready)
+
+    seq = 0
+    frames_since_preview = 0
+    try:
+        while not stop_event.is_set():
+            slot = ring.begin_write(seq)
+            ret, frame, timestamp_ms = source.read(slot)
+            if not ret:
+                if source.finished:
+                    result_queue.put(('finished', -1, 0, source.describe()))
+                    break
+                time.sleep(1.0 / TARGET_FPS)
+                continue
+
+            if not np.shares_memory(frame, slot):
+                # Driver returned a different buffer/size - copy (and fit) into the slot
+                if frame.shape != slot.shape:
+                    frame = cv2.resize(frame, (width, height))
+                np.copyto(slot, frame)
+
+            ring.commit(seq, timestamp_ms)
+            stages = [stage for stage in task_queues if stage != 'preview']
+            interval = preview_interval.value
+            frames_since_preview += 1
+            if interval > 0 and frames_since_preview >= interval:
+                frames_since_preview = 0
+                stages.append('preview')
+            dropped = [stage for stage in stages if not _put_latest(task_queues[stage], seq)]
+            if dropped:
+                result_queue.put(('dropped', seq, 0, dropped))
+            seq += 1
+    finally:
+        source.release()
+        ring.close()
+
+
+def landmarker_worker(stage, ring_name, slots, shape, model_path, task_queue, result_queue, stop_event, ready):
+    """Inference process for one landmarker ('face' or 'pose')."""
+    import mediapipe as mp
+    from model_selector import create_face_landmarker, create_pose_landmarker
+
+    ring = SharedFrameRing.attach(ring_name, slots, shape)
+    buffers = FrameBufferPool()
+    if stage == 'face':
+        landmarker = create_face_landmarker(model_path)
+    else:
+        landmarker = create_pose_landmarker(model_path)
+    _wait_ready(ready)
+
+    last_timestamp_ms = -1
+    try:
+        while not stop_event.is_set():
+            try:
+                seq = task_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            frame, timestamp_ms = ring.get(seq)
+            if frame is None:
+                continue
+            rgb_frame = buffers.cvt_color('rgb', frame, cv2.COLOR_BGR2RGB)
+            if not ring.is_valid(seq):
+                # Slot was overwritten while converting - frame is torn
+                continue
+
+            # Each landmarker needs strictly increasing timestamps
+            timestamp_ms = max(timestamp_ms, last_timestamp_ms + 1)
+            last_timestamp_ms = timestamp_ms
+
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+            landmarks = None
+            if stage == 'face':
+                detection_result = landmarker.detect_for_video(mp_image, timestamp_ms)
+                if detection_result.face_landmarks:
+                    landmarks = landmarks_to_array(detection_result.face_landmarks[0])
+            else:
+                detection_result = landmarker.detect_for_video(mp_image, timestamp_ms)
+                if detection_result.pose_landmarks:
+                    landmarks = landmarks_to_array(detection_result.pose_landmarks[0], with_visibility=True)
+
+            result_queue.put((stage, seq, timestamp_ms, landmarks))
+    finally:
+        landmarker.close()
+        ring.close()
+
+
+def preview_worker(ring_name, slots, shape, preview_size, jpeg_quality, task_queue, result_queue, stop_event, ready):
+    """Preview process: resizes and JPEG/base64-encodes frames."""
+    ring = SharedFrameRing.attach(ring_name, slots, shape)
+    buffers = FrameBufferPool()
+    _wait_ready(ready)
+    try:
+        while not stop_event.is_set():
+            try:
+                seq = task_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            frame, timestamp_ms = ring.get(seq)
+            if frame is None:
+                continue
+            preview_frame = buffers.resize('preview', frame, preview_size)
+            if not ring.is_valid(seq):
+                continue
+
+            _, buffer = cv2.imencode('.jpg', preview_frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+            result_queue.put(('preview', seq, timestamp_ms, base64.b64encode(buffer).decode('utf-8')))
+    finally:
+        ring.close()
+
+
+class MultiProcessPipeline:
+    """
+    Runs capture, face inference, pose inference and preview encoding as
+    separate processes. Frames travel through a SharedFrameRing; only sequence
+    numbers and small landmark arrays go through queues. Results are joined
+    by frame sequence number in the parent process, so stages overlap and
+    throughput is limited by the slowest stage rather than their sum.
+    """
+    def __init__(self, face_model_path, pose_model_path=None, source=None,
+                 slots=FRAME_RING_SLOTS, shape=(CAPTURE_HEIGHT, CAPTURE_WIDTH, 3),
+                 preview_size=PREVIEW_SIZE, jpeg_quality=PREVIEW_JPEG_QUALITY, preview_interval=PREVIEW_INTERVAL):
+        """
+        Args:
+            face_model_path: Path to face_landmarker.task
+            pose_model_path: Path to a pose landmarker model (None disables pose stage)
+            source: FrameSource to capture from (None = FRAME_SOURCE from config); it is
+                    opened in the capture process
+            slots: Frame slots in the shared-memory ring
+            shape: Capture frame shape (height, width, channels)
+            preview_size: (width, height) of encoded preview frames
+            jpeg_quality: Preview JPEG quality
+            preview_interval: Encode a preview of every Nth captured frame (0 = none,
+                              see set_preview_interval)
+        """
+        self.face_model_path = face_model_path
+        self.pose_model_path = pose_model_path
+        self.source = source if source is not None else create_frame_source()
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.preview_size = preview_size
+        self.jpeg_quality = jpeg_quality
+        self.preview_interval = preview_interval
+
+        self.ring = None
+        self._preview_interval = None  # Shared with the capture process once started
+        self.processes = []
+        self.pending = {}           # seq -> {'face': ..., 'pose': ..., 'timestamp_ms': ...}
+        self.last_joined_seq = -1
+        self.latest_preview = None
+        self.error = None
+        self.finished = False       # Frame source reached its end
+
+        # Statistics
+        self.joined = 0
+        self.stale = 0
+        self.dropped = {'face': 0, 'pose': 0, 'preview': 0}
+
+    @property
+    def stages(self):
+        """Stages whose results are needed to complete a frame."""
+        return ('face', 'pose') if self.pose_model_path else ('face',)
+
+    def start(self):
+        """Allocate the frame ring and start all worker processes."""
+        # 'spawn' works everywhere (and is the only option on Windows)
+        ctx = mp_proc.get_context('spawn')
+        self.ring = SharedFrameRing(slots=self.slots, shape=self.shape)
+        self.stop_event = ctx.Event()
+        self.ready = ready = ctx.Barrier(len(self.stages) + 2)  # landmarkers + capture + preview
+        self.result_queue = ctx.Queue()
+        self._preview_interval = ctx.Value('i', self.preview_interval)
+
+        # Kept on the instance: spawned children unpickle the queues after start() returns
+        self.task_queues = task_queues = {stage: ctx.Queue(maxsize=STAGE_QUEUE_SIZE)
+                                          for stage in self.stages + ('preview',)}
+        ring_args = (self.ring.name, self.slots, self.shape)
+
+        self.processes = [
+            ctx.Process(target=capture_worker, name='capture', daemon=True,
+                        args=ring_args + (self.source, task_queues, self._preview_interval,
+                                          self.result_queue, self.stop_event, ready)),
+            ctx.Process(target=landmarker_worker, name='face', daemon=True,
+                        args=('face',) + ring_args + (self.face_model_path, task_queues['face'],
+                                                      self.result_queue, self.stop_event, ready)),
+            ctx.Process(target=preview_worker, name='preview', daemon=True,
+                        args=ring_args + (self.preview_size, self.jpeg_quality, task_queues['preview'],
+                                          self.result_queue, self.stop_event, ready))
+        ]
+        if self.pose_model_path:
+            self.processes.append(
+                ctx.Process(target=landmarker_worker, name='pose', daemon=True,
+                            args=('pose',) + ring_args + (self.pose_model_path, task_queues['pose'],
+                                                          self.result_queue, self.stop_event, ready)))
+
+        for process in self.processes:
+            process.start()
+
+    def set_preview_interval(self, interval):
+        """Encode a preview of every Nth captured frame from now on (0 stops encoding)."""
+        self.preview_interval = interval
+        if self._preview_interval is not None:
+            self._preview_interval.value = interval
+
+    def next_result(self, timeout=0.1):
+        """
+        Wait for the next frame whose face (and pose) results are all available.
+        Blocking - call from a worker thread when used from asyncio.
+
+        Returns:
+            dict: {'seq', 'timestamp_ms', 'face', 'pose', 'frame'} with landmark
+                  arrays (None if nothing detected) and the base64 preview encoded
+                  since the previous result (None if there is none), or None if no
+                  frame completed within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                stage, seq, timestamp_ms, payload = self.result_queue.get(timeout=max(remaining, 0.001))
+            except queue.Empty:
+                return None
+
+            if stage == 'error':
+                self.error = payload
+                return None
+            if stage == 'finished':
+                self.finished = True
+                continue
+            if stage == 'dropped':
+                for dropped_stage in payload:
+                    self.dropped[dropped_stage] += 1
+                continue
+            if stage == 'preview':
+                self.latest_preview = payload
+                continue
+            if seq <= self.last_joined_seq:
+                self.stale += 1
+                continue
+
+            entry = self.pending.setdefault(seq, {'timestamp_ms': timestamp_ms})
+            entry[stage] = payload
+            if all(s in entry for s in self.stages):
+                del self.pending[seq]
+                # Frames older than this one can no longer complete in order
+                for old_seq in [s for s in self.pending if s < seq]:
+                    del self.pending[old_seq]
+                    self.stale += 1
+                self.last_joined_seq = seq
+                self.joined += 1
+                frame, self.latest_preview = self.latest_preview, None
+                return {
+                    'seq': seq,
+                    'timestamp_ms': entry['timestamp_ms'],
+                    'face': entry['face'],
+                    'pose': entry.get('pose'),
+                    'frame': frame
+                }
+
+    def get_stats(self):
+        """Pipeline statistics for metrics reporting."""
+        return {
+            'joined_frames': self.joined,
+            'stale_results': self.stale,
+            'dropped': dict(self.dropped),
+            'processes': {p.name: p.is_alive() for p in self.processes}
+        }
+
+    def stop(self):
+        """Stop all worker processes and free the frame ring."""
+        if self.ring is None:
+            return
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self.ring.close()
+        self.ring = None
+        self._preview_interval = None
+        self.pending.clear()
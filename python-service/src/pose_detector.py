@@ -1,67 +1,72 @@
+import copy
 import cv2
 import mediapipe as mp
 import numpy as np
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from mediapipe import solutions
 from mediapipe.framework.formats import landmark_pb2
 from smoothing_filter import SmoothingFilter
-from config import SMOOTHING_WINDOW_SIZE, THRESHOLDS
+from config import (SMOOTHING_WINDOW_SIZE, THRESHOLDS, POSE_MODEL_VARIANTS, POSE_MODEL_VARIANT,
+                    POSE_MODEL_FRAME_BUDGET_MS, POSE_MODEL_BENCHMARK_SAMPLES,
+                    MOTION_GATE_ENABLED, LANDMARK_TRACKING_ENABLED, CONCURRENT_LANDMARKERS,
+                    SUSTAIN_SECONDS, DEBOUNCE_RESET_GAP_SECONDS)
+from clock import MonotonicClock
+from motion_gate import MotionGate
+from landmark_tracker import LandmarkTracker
+from metric_registry import MetricRegistry, CALIBRATION_METRICS
+from frame_buffer_pool import FrameBufferPool
+from frame_tracer import FrameTracer
+from model_selector import (get_model_directory, find_pose_models, create_face_landmarker,
+                            create_pose_landmarker, select_pose_model)
 
 class PostureDetector:
-    def __init__(self):
-        # Initialize MediaPipe Face Landmarker
-        self.BaseOptions = mp.tasks.BaseOptions
-        self.FaceLandmarker = mp.tasks.vision.FaceLandmarker
-        self.FaceLandmarkerOptions = mp.tasks.vision.FaceLandmarkerOptions
-        self.VisionRunningMode = mp.tasks.vision.RunningMode
-        
-        # Get the path to the model file
-        # When running as PyInstaller bundle, use sys._MEIPASS
-        # Otherwise use the script directory
-        if getattr(sys, 'frozen', False):
-            # Running as compiled executable
-            script_dir = sys._MEIPASS
-        else:
-            # Running as script
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        model_path = os.path.join(script_dir, 'face_landmarker.task')
-        
-        # Configure face landmarker
-        options = self.FaceLandmarkerOptions(
-            base_options=self.BaseOptions(model_asset_path=model_path),
-            running_mode=self.VisionRunningMode.VIDEO,
-            num_faces=1,
-            min_face_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+    def __init__(self, pose_model_variant=POSE_MODEL_VARIANT, clock=None, load_models=True,
+                 concurrent_landmarkers=CONCURRENT_LANDMARKERS, running_mode=None):
+        """
+        Args:
+            pose_model_variant: 'heavy', 'full', 'lite', or 'auto' to benchmark
+                                the installed variants and pick one within budget
+            clock: Time source for sustain timers (defaults to MonotonicClock;
+                   a ReplayClock follows each frame's capture timestamp)
+            load_models: False for a metric-only detector (compute_posture() on
+                         landmarks produced elsewhere, e.g. worker processes)
+            concurrent_landmarkers: Run face and pose landmarkers in parallel on a
+                                    thread pool instead of one after the other
+            running_mode: MediaPipe running mode (default VIDEO). IMAGE mode keeps no
+                          state between frames, for detectors shared by many streams
+        """
+        self.clock = clock or MonotonicClock()
+        self.running_mode = running_mode or mp.tasks.vision.RunningMode.VIDEO
         
-        self.face_landmarker = self.FaceLandmarker.create_from_options(options)
+        # Thread pool for concurrent face/pose inference
+        self._landmarker_pool = None
+        if load_models and concurrent_landmarkers:
+            self._landmarker_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='landmarker')
         
-        # Initialize MediaPipe Pose Landmarker
-        self.PoseLandmarker = mp.tasks.vision.PoseLandmarker
-        self.PoseLandmarkerOptions = mp.tasks.vision.PoseLandmarkerOptions
+        # Last timestamp passed to each landmarker (VIDEO mode needs strictly increasing values)
+        self._last_landmarker_ts = {'face': -1, 'pose': -1}
         
-        # Get path to pose model (use same directory resolution as face model)
-        pose_model_path = os.path.join(script_dir, 'pose_landmarker.task')
+        # Initialize MediaPipe Face Landmarker
+        # (skipped for metric-only detectors fed with landmarks from elsewhere)
+        self.face_landmarker = None
+        if load_models:
+            model_path = os.path.join(get_model_directory(), 'face_landmarker.task')
+            self.face_landmarker = create_face_landmarker(model_path, self.running_mode)
         
-        # Configure pose landmarker (only if model file exists)
+        # Initialize MediaPipe Pose Landmarker (lite/full/heavy variant)
         self.pose_landmarker = None
-        if os.path.exists(pose_model_path):
-            try:
-                pose_options = self.PoseLandmarkerOptions(
-                    base_options=self.BaseOptions(model_asset_path=pose_model_path),
-                    running_mode=self.VisionRunningMode.VIDEO,
-                    num_poses=1,
-                    min_pose_detection_confidence=0.5,
-                    min_tracking_confidence=0.5
-                )
-                self.pose_landmarker = self.PoseLandmarker.create_from_options(pose_options)
-            except Exception as e:
-                pass
-        else:
-            pass
+        self._pose_benchmark_frames = None  # Live frames for a pending 'auto' benchmark
+        self.pose_model_info = {
+            'variant': None,
+            'model_path': None,
+            'budget_ms': POSE_MODEL_FRAME_BUDGET_MS,
+            'within_budget': False,
+            'measurements': {}
+        }
+        if load_models:
+            self.set_pose_model(pose_model_variant)
         
         # Good posture baseline (None until calibrated)
         self.good_head_pitch_angle = None
@@ -76,8 +81,17 @@ class PostureDetector:
         # Track current state for hysteresis
         self.is_currently_bad = False
         
-        # Hysteresis thresholds
-        self.thresholds = THRESHOLDS
+        # Enabled rules and consumers decide which metrics are computed per frame
+        self.metrics = MetricRegistry()
+        
+        # Reused RGB conversion buffers (MediaPipe images copy their data)
+        self.buffers = FrameBufferPool()
+        
+        # Stage spans of the current frame (the server installs its enabled tracer)
+        self.tracer = FrameTracer(enabled=False)
+        
+        # Hysteresis thresholds (per-detector copy, so set_thresholds only affects this detector)
+        self.thresholds = copy.deepcopy(THRESHOLDS)
         
         # Configurable thresholds
         self.pitch_threshold = -15  # degrees (negative = looking down)
@@ -95,9 +109,25 @@ class PostureDetector:
         # Track last compensation description for messaging
         self._last_compensation_desc = None
         
-        # Track sustained tilt duration to avoid false positives
-        self._shoulder_tilt_start_time = None
-        self._shoulder_tilt_sustained_seconds = 0.5  # Require 0.5 seconds of sustained tilt (reduced for higher sensitivity)
+        # Per-issue sustain windows (seconds an issue must persist before it counts)
+        self.sustain_seconds = dict(SUSTAIN_SECONDS)
+        self._issue_start_times = {}    # issue -> time its threshold was first exceeded
+        self._issue_last_seen = {}      # issue -> last time it was evaluated as exceeded
+        
+        # Motion gating - reuse the last result while the frame is static
+        self.motion_gate = MotionGate() if MOTION_GATE_ENABLED else None
+        self.calibrating = False  # Every frame is inferred while a calibration runs
+        self._last_result = None
+        self._last_result_ms = None
+        self.last_face_landmarks = None
+        self.last_pose_landmarks = None
+        self.result_landmarks = (None, None)
+        self.frame_count = 0
+        self.inference_count = 0
+        
+        # Optical-flow landmark propagation between full inferences
+        self.tracker = LandmarkTracker() if LANDMARK_TRACKING_ENABLED else None
+        self._keyframe_bbox = None
         
         # 3D face model coordinates (in mm)
         # Using stable landmarks that don't move with facial expressions (smiling, etc.)
@@ -113,16 +143,33 @@ class PostureDetector:
         # Landmark indices for PnP - using stable points that don't move when smiling
         self.landmark_indices = [33, 263, 1, 133, 362, 168]
         
-    def detect_landmarks(self, frame, timestamp_ms):
+    def _to_mp_image(self, frame):
+        """Convert a BGR frame to a MediaPipe image (shared by both landmarkers)."""
+        with self.tracer.span('rgb'):
+            rgb_frame = self.buffers.cvt_color('rgb', frame, cv2.COLOR_BGR2RGB)
+        return mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+    
+    def _landmarker_timestamp(self, landmarker, timestamp_ms):
+        """Timestamp for a landmarker call, kept strictly increasing per landmarker."""
+        timestamp_ms = max(int(timestamp_ms), self._last_landmarker_ts[landmarker] + 1)
+        self._last_landmarker_ts[landmarker] = timestamp_ms
+        return timestamp_ms
+    
+    def _run_landmarker(self, landmarker, name, mp_image, timestamp_ms):
+        """Run a landmarker in the detector's running mode."""
+        if self.running_mode == mp.tasks.vision.RunningMode.IMAGE:
+            return landmarker.detect(mp_image)
+        return landmarker.detect_for_video(mp_image, self._landmarker_timestamp(name, timestamp_ms))
+    
+    def detect_landmarks(self, frame, timestamp_ms, mp_image=None):
         """Detect facial landmarks using MediaPipe Face Landmarker."""
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Create MediaPipe Image
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        # Convert BGR to RGB MediaPipe Image (unless already converted)
+        if mp_image is None:
+            mp_image = self._to_mp_image(frame)
         
         # Detect landmarks
-        detection_result = self.face_landmarker.detect_for_video(mp_image, timestamp_ms)
+        with self.tracer.span('face_landmarker'):
+            detection_result = self._run_landmarker(self.face_landmarker, 'face', mp_image, timestamp_ms)
         
         if detection_result.face_landmarks:
             return detection_result.face_landmarks[0]
@@ -340,16 +387,114 @@ class PostureDetector:
         
         return distance
     
-    def detect_pose_landmarks(self, frame, timestamp_ms):
+    def set_pose_model(self, variant='auto', frames=None):
+        """Load a pose landmarker variant, replacing the current one.
+        
+        Without frames, 'auto' can't benchmark yet: it keeps the current model
+        (the fastest installed variant at start-up) and collects the next
+        inferred frames with a face, see take_pose_benchmark_frames().
+        
+        Args:
+            variant: 'heavy', 'full', 'lite', or 'auto' to benchmark installed
+                     variants and pick the most accurate one within budget
+            frames: real camera frames with a person in view to benchmark on (for 'auto')
+        
+        Returns:
+            dict: pose model info (variant, model_path, budget_ms, within_budget, measurements)
+        """
+        models = find_pose_models()
+        
+        if variant == 'auto' and len(models) > 1:
+            if frames:
+                self._pose_benchmark_frames = None
+                return self.apply_pose_model(select_pose_model(frames))
+            # Timings need frames showing a person - benchmark once live ones are collected
+            self._pose_benchmark_frames = []
+            if self.pose_landmarker is not None:
+                return self.pose_model_info
+            variant = [v for v in POSE_MODEL_VARIANTS if v in models][-1]
+        else:
+            # Forced variant, or a single installed variant - nothing to benchmark
+            self._pose_benchmark_frames = None
+            if variant == 'auto':
+                variant = next(iter(models), None)
+        
+        info = {
+            'variant': variant,
+            'model_path': models.get(variant),
+            'budget_ms': POSE_MODEL_FRAME_BUDGET_MS,
+            'within_budget': None,
+            'measurements': {}
+        }
+        
+        return self.apply_pose_model(info)
+    
+    def apply_pose_model(self, info):
+        """Switch to the pose model described by a select_pose_model() result.
+        A model that is missing or fails to load leaves the current one in use.
+        
+        Returns:
+            dict: pose model info actually in use
+        """
+        if info['model_path'] is None:
+            missing = f"Pose model '{info['variant']}' not" if info['variant'] else "No pose model"
+            if self.pose_landmarker is not None:
+                print(f"{missing} installed - keeping '{self.pose_model_info['variant']}'. "
+                      f"Run download_pose_model.py to install it.", file=sys.stderr, flush=True)
+                return self.pose_model_info
+            print(f"{missing} installed - shoulder tilt detection disabled. "
+                  f"Run download_pose_model.py to install it.", file=sys.stderr, flush=True)
+        elif info['model_path'] != self.pose_model_info['model_path'] or self.pose_landmarker is None:
+            try:
+                new_landmarker = create_pose_landmarker(info['model_path'], self.running_mode)
+            except Exception as e:
+                print(f"Failed to load pose model '{info['variant']}': {e}", file=sys.stderr, flush=True)
+                return self.pose_model_info
+            
+            if self.pose_landmarker is not None:
+                self.pose_landmarker.close()
+            self.pose_landmarker = new_landmarker
+            print(f"Pose model: {info['variant']} ({os.path.basename(info['model_path'])})", flush=True)
+        
+        self.pose_model_info = info
+        return info
+    
+    @property
+    def pose_benchmark_pending(self):
+        """True while an 'auto' pose model selection waits for live frames."""
+        return self._pose_benchmark_frames is not None
+    
+    def add_pose_benchmark_frame(self, frame):
+        """Keep a copy of an inferred frame with a face for a pending 'auto' benchmark."""
+        frames = self._pose_benchmark_frames
+        if frames is not None and len(frames) < POSE_MODEL_BENCHMARK_SAMPLES:
+            frames.append(frame.copy())
+    
+    def take_pose_benchmark_frames(self):
+        """
+        Frames for a pending 'auto' benchmark once enough have been collected
+        (pass them to select_pose_model(), then apply_pose_model()).
+        
+        Returns:
+            list: BGR frames with a face in view, or None if not ready
+        """
+        frames = self._pose_benchmark_frames
+        if frames is None or len(frames) < POSE_MODEL_BENCHMARK_SAMPLES:
+            return None
+        self._pose_benchmark_frames = None
+        return frames
+    
+    def detect_pose_landmarks(self, frame, timestamp_ms, mp_image=None):
         """Detect body landmarks using MediaPipe Pose Landmarker."""
         if self.pose_landmarker is None:
             return None
         
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+            if mp_image is None:
+                mp_image = self._to_mp_image(frame)
             
-            detection_result = self.pose_landmarker.detect_for_video(mp_image, timestamp_ms)
+            with self.tracer.span('pose_landmarker'):
+                detection_result = self._run_landmarker(self.pose_landmarker, 'pose', mp_image, timestamp_ms)
             
             if detection_result.pose_landmarks:
                 return detection_result.pose_landmarks[0]
@@ -452,7 +597,7 @@ class PostureDetector:
     
     def save_good_posture(self, frame, timestamp_ms):
         """Capture current posture as good posture baseline."""
-        face_landmarks = self.detect_landmarks(frame, timestamp_ms)
+        face_landmarks, pose_landmarks = self.detect_all_landmarks(frame, timestamp_ms)
         
         if not face_landmarks:
             return False
@@ -464,28 +609,56 @@ class PostureDetector:
         eye_roll = self.calculate_eye_roll_angle(face_landmarks, frame.shape)
         
         # Try to get shoulder tilt and body lean offset
-        pose_landmarks = self.detect_pose_landmarks(frame, timestamp_ms)
         shoulder_tilt = None
         body_lean_offset = None
         if pose_landmarks:
             shoulder_tilt = self.calculate_shoulder_tilt(pose_landmarks, frame.shape)
             body_lean_offset = self.calculate_body_lean_offset(face_landmarks, pose_landmarks, frame.shape)
         
-        if pitch is not None and distance is not None:
-            self.good_head_pitch_angle = pitch
-            self.good_head_roll = eye_roll if eye_roll is not None else 0
-            self.good_head_distance = distance
-            self.good_shoulder_tilt = shoulder_tilt if shoulder_tilt is not None else 0
-            self.good_body_lean_offset = body_lean_offset if body_lean_offset is not None else 0
-            
-            # Reset smoothing filter to start fresh
-            self.smoothing_filter.reset()
-            # Reset hysteresis state
-            self.is_currently_bad = False
-            
-            return True
+        return self.set_baseline(pitch, eye_roll, shoulder_tilt, body_lean_offset, distance)
+    
+    def set_baseline(self, pitch, roll, shoulder_tilt, body_lean_offset, distance):
+        """Set good posture baseline from already-measured values.
+        
+        Args:
+            pitch: head pitch angle (degrees)
+            roll: eye-based head roll angle (degrees)
+            shoulder_tilt: shoulder tilt angle (degrees), None if not detected
+            body_lean_offset: shoulder/face offset (% of frame width), None if not detected
+            distance: head-to-camera distance (cm)
+        
+        Returns:
+            bool: True if baseline was saved (pitch and distance are required)
+        """
+        if pitch is None or distance is None:
+            return False
+        
+        self.good_head_pitch_angle = pitch
+        self.good_head_roll = roll if roll is not None else 0
+        self.good_head_distance = distance
+        self.good_shoulder_tilt = shoulder_tilt if shoulder_tilt is not None else 0
+        self.good_body_lean_offset = body_lean_offset if body_lean_offset is not None else 0
+        
+        # Reset smoothing filter to start fresh
+        self.smoothing_filter.reset()
+        # Reset hysteresis state and sustain timers
+        self.is_currently_bad = False
+        self._issue_start_times.clear()
+        # Cached result was computed against the old baseline
+        self._last_result = None
+        if self.tracker is not None:
+            self.tracker.reset()
         
-        return False
+        return True
+    
+    def set_calibrating(self, calibrating):
+        """
+        Start or end a baseline calibration. The baseline stores every metric,
+        whether or not its rule is enabled, and is built from fresh landmarks:
+        while calibrating, the motion gate and tracker are bypassed.
+        """
+        self.calibrating = calibrating
+        self.metrics.set_consumer('calibration', CALIBRATION_METRICS if calibrating else None)
     
     def check_posture(self, frame, timestamp_ms):
         """
@@ -502,10 +675,189 @@ class PostureDetector:
                 'adjusted_roll': float,
                 'adjusted_shoulder_tilt': float,
                 'posture_issues': list,
+                'distance_deviation': float (cm closer than the baseline, smoothed),
+                'raw_metrics': dict (unsmoothed pitch/roll/shoulder_tilt/body_lean_offset/distance),
+                'reused': bool (optional, True if the frame was static and the last result reused),
+                'tracked': bool (optional, True if landmarks were propagated by optical flow),
                 'error': str (optional)
             }
         """
-        face_landmarks = self.detect_landmarks(frame, timestamp_ms)
+        # Replay clocks follow the frame's capture time
+        self.clock.on_frame(timestamp_ms)
+        self.frame_count += 1
+        
+        # Static frame - reuse the last result instead of running the landmarkers
+        static = False
+        if self.motion_gate is not None and self._last_result is not None and not self.calibrating:
+            with self.tracer.span('motion_gate'):
+                static = not self.motion_gate.should_infer(frame, timestamp_ms)
+        if static:
+            result = dict(self._last_result)
+            result['reused'] = True
+            result['reuse_age_ms'] = int(timestamp_ms - self._last_result_ms)
+            self._carry_sustain(result)
+            return result
+        
+        # Between full inferences, propagate key landmarks with optical flow
+        tracked = None
+        if self.tracker is not None and not self.calibrating:
+            with self.tracer.span('tracker'):
+                tracked = self.tracker.track(frame, timestamp_ms)
+        if tracked is not None:
+            face_landmarks, pose_landmarks, (dx, dy) = tracked
+            face_bbox = self._shift_bbox(self._keyframe_bbox, dx, dy, frame.shape)
+            with self.tracer.span('metrics'):
+                result = self.compute_posture(face_landmarks, pose_landmarks, frame.shape, face_bbox=face_bbox)
+            result['tracked'] = True
+        else:
+            result = self._analyze_frame(frame, timestamp_ms)
+            self.inference_count += 1
+            if self.last_face_landmarks:
+                self.add_pose_benchmark_frame(frame)
+            self._keyframe_bbox = result.get('face_bbox')
+            if self.tracker is not None:
+                self._start_tracking(frame, timestamp_ms)
+        
+        self._last_result = result
+        self._last_result_ms = timestamp_ms
+        
+        if self.motion_gate is not None:
+            roi = self._motion_roi(result.get('face_bbox'), self.last_pose_landmarks, frame.shape)
+            self.motion_gate.mark_inferred(frame, timestamp_ms, roi)
+        
+        return result
+    
+    def _start_tracking(self, frame, timestamp_ms):
+        """Start optical-flow tracking from the landmarks just inferred."""
+        face_landmarks = self.last_face_landmarks
+        face_indices = list(self.landmark_indices)
+        if face_landmarks and len(face_landmarks) > 473:
+            face_indices += [468, 473]  # Pupils (distance metric)
+        
+        pose_landmarks = self.last_pose_landmarks
+        if pose_landmarks and len(pose_landmarks) < 13:
+            pose_landmarks = None
+        
+        self.tracker.start(frame, timestamp_ms, face_landmarks, face_indices, pose_landmarks, (11, 12))
+    
+    def _shift_bbox(self, bbox, dx, dy, frame_shape):
+        """Translate a bbox by the tracked displacement, clipped to the frame."""
+        if not bbox:
+            return None
+        height, width = frame_shape[:2]
+        x1, y1, x2, y2 = bbox
+        dx, dy = int(round(dx)), int(round(dy))
+        return (min(max(x1 + dx, 0), width - 1), min(max(y1 + dy, 0), height - 1),
+                min(max(x2 + dx, 0), width - 1), min(max(y2 + dy, 0), height - 1))
+    
+    def _motion_roi(self, face_bbox, pose_landmarks, frame_shape, padding_ratio=0.1):
+        """Region covering the face and shoulders, used for motion gating."""
+        if not face_bbox:
+            return None
+        
+        height, width = frame_shape[:2]
+        x1, y1, x2, y2 = face_bbox
+        if pose_landmarks and len(pose_landmarks) >= 13:
+            for idx in (11, 12):
+                x1 = min(x1, int(pose_landmarks[idx].x * width))
+                x2 = max(x2, int(pose_landmarks[idx].x * width))
+                y2 = max(y2, int(pose_landmarks[idx].y * height))
+        
+        pad = int(min(width, height) * padding_ratio)
+        return (max(x1 - pad, 0), max(y1 - pad, 0), min(x2 + pad, width), min(y2 + pad, height))
+    
+    def get_metrics(self, timestamp_ms=None):
+        """Inference statistics (frames, landmarker calls, motion gate skips)."""
+        metrics = {
+            'frames': self.frame_count,
+            'inferences': self.inference_count,
+            'pose_model': self.pose_model_info['variant'],
+            'concurrent_landmarkers': self._landmarker_pool is not None
+        }
+        if self.motion_gate is not None:
+            metrics['motion_gate'] = self.motion_gate.get_stats(timestamp_ms)
+        if self.tracker is not None:
+            metrics['tracker'] = self.tracker.get_stats()
+        metrics['metric_registry'] = self.metrics.get_stats()
+        metrics['buffers'] = self.buffers.get_stats()
+        return metrics
+    
+    def detect_all_landmarks(self, frame, timestamp_ms, metrics=None):
+        """
+        Run face and pose landmarkers on a frame.
+        
+        With the thread pool, both landmarkers are submitted at once on the same
+        RGB image and joined, so latency is max(face, pose). Sequentially, pose
+        only runs when a face was found (its result is unused otherwise). Pose
+        is skipped when no required metric reads pose landmarks.
+        
+        Args:
+            metrics: MetricRegistry deciding whether pose is needed (default: this
+                     detector's; pooled detectors pass the session's)
+        
+        Returns:
+            tuple: (face_landmarks, pose_landmarks), either may be None
+        """
+        metrics = metrics or self.metrics
+        with_pose = self.pose_landmarker is not None and metrics.needs_input('pose')
+        if self.pose_landmarker is not None and not with_pose:
+            metrics.record_skipped_input('pose')
+        mp_image = self._to_mp_image(frame)
+        
+        if self._landmarker_pool is not None and with_pose:
+            face_future = self._landmarker_pool.submit(self.detect_landmarks, frame, timestamp_ms, mp_image)
+            pose_future = self._landmarker_pool.submit(self.detect_pose_landmarks, frame, timestamp_ms, mp_image)
+            face_landmarks = face_future.result()
+            pose_landmarks = pose_future.result()
+            return face_landmarks, (pose_landmarks if face_landmarks else None)
+        
+        face_landmarks = self.detect_landmarks(frame, timestamp_ms, mp_image)
+        pose_landmarks = None
+        if face_landmarks and with_pose:
+            pose_landmarks = self.detect_pose_landmarks(frame, timestamp_ms, mp_image)
+        return face_landmarks, pose_landmarks
+    
+    def _analyze_frame(self, frame, timestamp_ms):
+        """Run the landmarkers on a frame and compute posture status."""
+        face_landmarks, pose_landmarks = self.detect_all_landmarks(frame, timestamp_ms)
+        
+        self.last_face_landmarks = face_landmarks
+        self.last_pose_landmarks = pose_landmarks
+        
+        # Motion gating watches the region around the face of inferred frames, and
+        # tracked frames shift the keyframe's bbox (their sparse landmarks can't
+        # give one if a consumer starts needing it mid-track)
+        face_bbox = None
+        evaluated = ()
+        if face_landmarks and (self.motion_gate is not None or self.tracker is not None):
+            face_bbox = self.get_face_bbox(face_landmarks, frame.shape)
+            evaluated = ('face_bbox',)
+        
+        with self.tracer.span('metrics'):
+            return self.compute_posture(face_landmarks, pose_landmarks, frame.shape,
+                                        face_bbox=face_bbox, evaluated=evaluated)
+    
+    def compute_posture(self, face_landmarks, pose_landmarks, frame_shape, face_bbox=None, evaluated=()):
+        """
+        Compute posture status from face and pose landmarks.
+        Landmarks may come from the landmarkers or be propagated by the tracker
+        (sparse lists where only the landmarks used by the metrics are set).
+        Only metrics required by the metric registry are computed; the others
+        are None.
+        
+        Args:
+            face_landmarks: Face landmarks, or None if no face detected
+            pose_landmarks: Pose landmarks, or None
+            frame_shape: Shape of the frame (height, width, channels)
+            face_bbox: Precomputed face bbox (computed from landmarks if None)
+            evaluated: Metrics the caller already evaluated on this frame (counted
+                       in the metric registry with the ones computed here)
+        
+        Returns:
+            dict: posture status (see check_posture)
+        """
+        # Landmarks behind the latest result (client-side overlays)
+        self.result_landmarks = (face_landmarks, pose_landmarks)
         
         if not face_landmarks:
             return {
@@ -521,20 +873,35 @@ class PostureDetector:
                 'error': 'No face detected'
             }
         
+        required = self.metrics.required_metrics()
+        evaluated = list(evaluated)
+        
         # Calculate face metrics
-        pitch, yaw, roll = self.calculate_head_angles(face_landmarks, frame.shape)
-        distance = self.calculate_distance(face_landmarks, frame.shape, yaw)
+        pitch = yaw = roll = None
+        if 'head_pose' in required:
+            pitch, yaw, roll = self.calculate_head_angles(face_landmarks, frame_shape)
+            evaluated.append('head_pose')
+        distance = None
+        if 'distance' in required:
+            distance = self.calculate_distance(face_landmarks, frame_shape, yaw)
+            evaluated.append('distance')
         
         # Use eye-based roll calculation (more reliable than Euler angles)
-        eye_roll = self.calculate_eye_roll_angle(face_landmarks, frame.shape)
+        eye_roll = None
+        if 'eye_roll' in required:
+            eye_roll = self.calculate_eye_roll_angle(face_landmarks, frame_shape)
+            evaluated.append('eye_roll')
         
         # Calculate body metrics
-        pose_landmarks = self.detect_pose_landmarks(frame, timestamp_ms)
         shoulder_tilt = None
         body_lean_offset = None
         if pose_landmarks:
-            shoulder_tilt = self.calculate_shoulder_tilt(pose_landmarks, frame.shape)
-            body_lean_offset = self.calculate_body_lean_offset(face_landmarks, pose_landmarks, frame.shape)
+            if 'shoulder_tilt' in required:
+                shoulder_tilt = self.calculate_shoulder_tilt(pose_landmarks, frame_shape)
+                evaluated.append('shoulder_tilt')
+            if 'body_lean_offset' in required:
+                body_lean_offset = self.calculate_body_lean_offset(face_landmarks, pose_landmarks, frame_shape)
+                evaluated.append('body_lean_offset')
         
         # Add to smoothing filter
         self.smoothing_filter.add_measurement(pitch, eye_roll, shoulder_tilt, body_lean_offset, distance)
@@ -550,7 +917,19 @@ class PostureDetector:
         distance_smoothed = smoothed['distance'] if smoothed['distance'] is not None else distance
         
         # Compute face bbox for drawing
-        face_bbox = self.get_face_bbox(face_landmarks, frame.shape)
+        if face_bbox is None and 'face_bbox' in required:
+            face_bbox = self.get_face_bbox(face_landmarks, frame_shape)
+            evaluated.append('face_bbox')
+        self.metrics.record(evaluated)
+        
+        # Unsmoothed per-frame measurements (used for multi-frame baseline calibration)
+        raw_metrics = {
+            'pitch': pitch,
+            'roll': eye_roll,
+            'shoulder_tilt': shoulder_tilt,
+            'body_lean_offset': body_lean_offset,
+            'distance': distance
+        }
 
         # If no baseline saved, can't determine bad posture
         if self.good_head_pitch_angle is None:
@@ -567,14 +946,16 @@ class PostureDetector:
                 'adjusted_body_lean': None,
                 'posture_issues': [],
                 'face_bbox': face_bbox,
+                'raw_metrics': raw_metrics,
                 'error': 'No baseline posture saved'
             }
         
         # Calculate adjusted values relative to baseline (using smoothed values)
-        adjusted_pitch = pitch_smoothed - self.good_head_pitch_angle
+        adjusted_pitch = pitch_smoothed - self.good_head_pitch_angle if pitch_smoothed is not None else None
         adjusted_roll = eye_roll_smoothed - self.good_head_roll if eye_roll_smoothed is not None and self.good_head_roll is not None else 0
         adjusted_shoulder_tilt = shoulder_tilt_smoothed - self.good_shoulder_tilt if shoulder_tilt_smoothed is not None and self.good_shoulder_tilt is not None else 0
         adjusted_body_lean = body_lean_offset_smoothed - self.good_body_lean_offset if body_lean_offset_smoothed is not None and self.good_body_lean_offset is not None else 0
+        distance_deviation = self.good_head_distance - distance_smoothed if distance_smoothed is not None and self.good_head_distance is not None else None
         
         # Determine if posture is bad (using smoothed measurements)
         is_bad, issues = self._is_posture_bad(
@@ -596,10 +977,12 @@ class PostureDetector:
             'adjusted_pitch': round(adjusted_pitch, 2) if adjusted_pitch else None,
             'adjusted_roll': round(adjusted_roll, 2) if adjusted_roll else None,
             'adjusted_shoulder_tilt': round(adjusted_shoulder_tilt, 2) if adjusted_shoulder_tilt else None,
+            'distance_deviation': round(distance_deviation, 2) if distance_deviation is not None else None,
             'posture_issues': issues,
             'shoulder_detection_active': pose_landmarks is not None,
             'shoulder_detection_confidence': self._get_shoulder_confidence(pose_landmarks),
-            'face_bbox': face_bbox
+            'face_bbox': face_bbox,
+            'raw_metrics': raw_metrics
         }
     
     def _check_threshold_with_hysteresis(self, value, threshold_config, is_lower_bad=True):
@@ -631,6 +1014,45 @@ class PostureDetector:
             else:
                 return abs(value) > enter_threshold
     
+    def _is_sustained(self, issue, exceeded):
+        """
+        Apply the issue's sustain window: True once the threshold has been
+        exceeded continuously for sustain_seconds[issue] (clock time, so the
+        window is the same at any frame rate).
+        """
+        if not exceeded:
+            self._issue_start_times.pop(issue, None)
+            return False
+        
+        current_time = self.clock.now()
+        start_time = self._issue_start_times.get(issue)
+        last_seen = self._issue_last_seen.get(issue)
+        if start_time is None or current_time - last_seen > DEBOUNCE_RESET_GAP_SECONDS:
+            # New exceedance (or the frame stream had a gap) - start timing
+            start_time = current_time
+            self._issue_start_times[issue] = start_time
+        self._issue_last_seen[issue] = current_time
+        
+        return current_time - start_time >= self.sustain_seconds.get(issue, 0.0)
+    
+    def _carry_sustain(self, result):
+        """
+        Keep sustain windows running through a reused result. The metrics
+        haven't changed, so issues still being timed are still exceeded; without
+        this, the gap until the next inference would restart their windows and
+        a still user would never be reported.
+        """
+        if 'error' in result:
+            return
+        issues = list(result['posture_issues'])
+        for issue in list(self._issue_start_times):
+            if self._is_sustained(issue, True) and issue not in issues:
+                issues.append(issue)
+        if len(issues) > len(result['posture_issues']):
+            result['posture_issues'] = issues
+            result['is_bad'] = True
+            self.is_currently_bad = True
+    
     def _is_posture_bad(self, adjusted_pitch, adjusted_roll, adjusted_shoulder_tilt, adjusted_body_lean, current_distance, good_distance, yaw=None):
         """Determine if current posture is bad based on thresholds with hysteresis.
         
@@ -640,12 +1062,12 @@ class PostureDetector:
         reasons = []
         
         # Check pitch with hysteresis (looking down)
-        if adjusted_pitch is not None:
-            if self._check_threshold_with_hysteresis(
+        if adjusted_pitch is not None and self.metrics.rule_enabled('head_pitch'):
+            if self._is_sustained('head_pitch', self._check_threshold_with_hysteresis(
                 adjusted_pitch, 
                 self.thresholds['pitch'], 
                 is_lower_bad=True
-            ):
+            )):
                 reasons.append('head_pitch')
         
         # Only check distance/roll if head is not rotated significantly
@@ -655,70 +1077,50 @@ class PostureDetector:
         if head_is_facing_forward:
             # Check distance with hysteresis (leaning forward)
             # Distance detection using IPD is only reliable when facing camera
-            if good_distance is not None and current_distance is not None:
+            if good_distance is not None and current_distance is not None and self.metrics.rule_enabled('distance'):
                 distance_deviation = good_distance - current_distance
-                if self._check_threshold_with_hysteresis(
+                if self._is_sustained('distance', self._check_threshold_with_hysteresis(
                     distance_deviation,
                     self.thresholds['distance'],
                     is_lower_bad=False
-                ):
+                )):
                     reasons.append('distance')
             
             # Check head roll with hysteresis (head tilted sideways)
-            if adjusted_roll is not None:
-                if self._check_threshold_with_hysteresis(
+            if adjusted_roll is not None and self.metrics.rule_enabled('head_roll'):
+                if self._is_sustained('head_roll', self._check_threshold_with_hysteresis(
                     adjusted_roll,
                     self.thresholds['head_roll'],
                     is_lower_bad=False
-                ):
+                )):
                     reasons.append('head_roll')
         
         # Check shoulder tilt with hysteresis (body tilted sideways)
         # Shoulder tilt is independent of head rotation - check it regardless of yaw
         # Requires sustained tilt to avoid false positives from temporary movements
-        if adjusted_shoulder_tilt is not None:
+        if adjusted_shoulder_tilt is not None and self.metrics.rule_enabled('shoulder_tilt'):
             tilt_exceeds_threshold = self._check_threshold_with_hysteresis(
                 adjusted_shoulder_tilt,
                 self.thresholds['shoulder_tilt'],
                 is_lower_bad=False
             )
             
-            # Track sustained tilt duration
-            import time
-            current_time = time.time()
-            
-            if tilt_exceeds_threshold:
-                # Check if this is a new tilt or continuation
-                if self._shoulder_tilt_start_time is None:
-                    # Just started tilting - record start time
-                    self._shoulder_tilt_start_time = current_time
-                
-                # Calculate how long tilt has been sustained
-                tilt_duration = current_time - self._shoulder_tilt_start_time
-                
-                # Only add to reasons if tilt sustained for required duration
-                if tilt_duration >= self._shoulder_tilt_sustained_seconds:
-                    reasons.append('shoulder_tilt')
-            else:
-                # No longer tilting (or within threshold), reset timer
-                if self._shoulder_tilt_start_time is not None:
-                    pass
-                self._shoulder_tilt_start_time = None
+            if self._is_sustained('shoulder_tilt', tilt_exceeds_threshold):
+                reasons.append('shoulder_tilt')
         
         # Check body lean (horizontal offset of shoulders from face)
-        # DISABLED: This method is unreliable due to:
+        # DISABLED by default (METRIC_RULES): this method is unreliable due to:
         # 1. Head compensation - users naturally center head while body leans
         # 2. Camera angle sensitivity - false positives from off-center cameras
         # 3. Depth dependency - measurements vary with distance
-        # Body lean is better detected through shoulder_tilt (see below)
-        #
-        # if adjusted_body_lean is not None:
-        #     if self._check_threshold_with_hysteresis(
-        #         adjusted_body_lean,
-        #         self.thresholds['body_lean'],
-        #         is_lower_bad=False
-        #     ):
-        #         reasons.append('body_lean')
+        # Body lean is better detected through shoulder_tilt (see above)
+        if adjusted_body_lean is not None and self.metrics.rule_enabled('body_lean'):
+            if self._is_sustained('body_lean', self._check_threshold_with_hysteresis(
+                adjusted_body_lean,
+                self.thresholds['body_lean'],
+                is_lower_bad=False
+            )):
+                reasons.append('body_lean')
         
         is_bad = len(reasons) > 0
         
@@ -727,8 +1129,38 @@ class PostureDetector:
         
         return is_bad, reasons
     
+    def reload_landmarkers(self):
+        """
+        Replace the face and pose landmarkers with fresh instances (watchdog
+        recovery after an inference stall). The old landmarkers are not closed:
+        a stalled call may still be running in them.
+        """
+        if self.face_landmarker is None:
+            return
+        
+        model_path = os.path.join(get_model_directory(), 'face_landmarker.task')
+        self.face_landmarker = create_face_landmarker(model_path, self.running_mode)
+        if self.pose_model_info['model_path']:
+            self.pose_landmarker = create_pose_landmarker(self.pose_model_info['model_path'], self.running_mode)
+        
+        if self._landmarker_pool is not None:
+            # Threads of the old pool may be blocked in the old landmarkers
+            self._landmarker_pool.shutdown(wait=False)
+            self._landmarker_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='landmarker')
+        
+        # Nothing computed before the stall is reused or tracked from
+        self._last_result = None
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
+    
     def close(self):
         """Clean up resources."""
-        self.face_landmarker.close()
+        if self._landmarker_pool is not None:
+            self._landmarker_pool.shutdown(wait=True)
+            self._landmarker_pool = None
+        if self.face_landmarker is not None:
+            self.face_landmarker.close()
         if self.pose_landmarker is not None:
             self.pose_landmarker.close()
@@ -1,9 +1,17 @@
-import time
+from clock import MonotonicClock
 from state_debouncer import StateDebouncer
-from config import GOOD_TO_BAD_FRAMES, BAD_TO_GOOD_FRAMES, INITIAL_WARNING_SECONDS, REPEAT_WARNING_INTERVAL
+from telemetry_ring import TelemetryRing
+from posture_distributions import PostureDistributions
+from config import GOOD_TO_BAD_SECONDS, BAD_TO_GOOD_SECONDS, INITIAL_WARNING_SECONDS, REPEAT_WARNING_INTERVAL
 
 class PostureAnalyzer:
-    def __init__(self):
+    def __init__(self, clock=None):
+        """
+        Args:
+            clock: Time source (defaults to MonotonicClock; ReplayClock for replay)
+        """
+        self.clock = clock or MonotonicClock()
+        
         self.bad_posture_start = None
         self.bad_posture_duration = 0
         self.warning_sent_at = set()  # Track which durations we've warned at
@@ -12,19 +20,26 @@ class PostureAnalyzer:
         self.total_bad_duration = 0
         self.longest_bad_streak = 0
         self.longest_good_streak = 0
-        self.good_posture_start = time.time()
+        self.good_posture_start = None  # Set by the first frame (replay clocks start there)
         
         # Warning thresholds (in seconds) - from config
         self.initial_warning_seconds = INITIAL_WARNING_SECONDS
         self.repeat_warning_interval = REPEAT_WARNING_INTERVAL
         
         # Add state debouncer
-        # - Need 2 consecutive bad frames to start bad posture
-        # - Need 3 consecutive good frames to end bad posture
+        # - Bad posture must persist GOOD_TO_BAD_SECONDS to start bad posture
+        # - Good posture must persist BAD_TO_GOOD_SECONDS to end bad posture
         self.debouncer = StateDebouncer(
-            bad_to_good_frames=BAD_TO_GOOD_FRAMES,
-            good_to_bad_frames=GOOD_TO_BAD_FRAMES
+            bad_to_good_seconds=BAD_TO_GOOD_SECONDS,
+            good_to_bad_seconds=GOOD_TO_BAD_SECONDS,
+            clock=self.clock
         )
+        
+        # Per-frame records of the last minutes (see telemetry_ring.py)
+        self.telemetry = TelemetryRing()
+        
+        # Metric distributions and per-issue time (constant memory, mergeable)
+        self.distributions = PostureDistributions()
     
     def _generate_warning_message(self, issues, duration):
         """Generate specific warning message based on posture issues."""
@@ -50,12 +65,13 @@ class PostureAnalyzer:
         else:
             return f"Bad posture: {', '.join(messages[:-1])}, and {messages[-1]}"
         
-    def update(self, posture_status):
+    def update(self, posture_status, latencies=None):
         """
         Update analyzer with new posture status.
         
         Args:
             posture_status: dict from PostureDetector.check_posture()
+            latencies: Optional stage latencies for telemetry (capture_ms, inference_ms, publish_ms)
             
         Returns:
             dict: {
@@ -66,23 +82,33 @@ class PostureAnalyzer:
                 'shoulder_tilt': float,
                 'distance': float,
                 'posture_issues': list,
-                'message': str
+                'message': str,
+                'transition': 'bad' or 'good' when the debounced state changed on this
+                              frame, else None,
+                'ended_bad_duration': int (seconds, length of the bad posture a 'good'
+                                      transition ended, else 0)
             }
         """
-        current_time = time.time()
+        current_time = self.clock.now()
+        if self.good_posture_start is None:
+            self.good_posture_start = current_time
         
         # Get raw detection
         detected_is_bad = posture_status.get('is_bad', False)
         
         # Apply debouncing to get stable state
-        is_bad = self.debouncer.update(detected_is_bad)
+        is_bad = self.debouncer.update(detected_is_bad, current_time)
+        self.telemetry.append(current_time, posture_status, is_bad, latencies)
+        self.distributions.update(current_time, posture_status)
         
         issues = posture_status.get('posture_issues', [])
         
         if is_bad:
             # Bad posture detected
+            transition = None
             if self.bad_posture_start is None:
                 # Bad posture just started
+                transition = 'bad'
                 self.bad_posture_start = current_time
                 
                 # Update good posture streak
@@ -107,12 +133,18 @@ class PostureAnalyzer:
                 'shoulder_tilt': posture_status.get('adjusted_shoulder_tilt'),
                 'distance': posture_status.get('distance'),
                 'posture_issues': issues,
-                'message': self._generate_warning_message(issues, self.bad_posture_duration)
+                'message': self._generate_warning_message(issues, self.bad_posture_duration),
+                'transition': transition,
+                'ended_bad_duration': 0
             }
         else:
             # Good posture
+            transition = None
+            ended_bad_duration = 0
             if self.bad_posture_start is not None:
                 # Bad posture session just ended
+                transition = 'good'
+                ended_bad_duration = self.bad_posture_duration
                 self.total_bad_duration += self.bad_posture_duration
                 
                 # Update longest bad streak
@@ -133,7 +165,9 @@ class PostureAnalyzer:
                 'shoulder_tilt': posture_status.get('adjusted_shoulder_tilt'),
                 'distance': posture_status.get('distance'),
                 'posture_issues': [],
-                'message': "Good posture"
+                'message': "Good posture",
+                'transition': transition,
+                'ended_bad_duration': ended_bad_duration
             }
     
     def _should_send_warning(self, duration):
@@ -157,19 +191,27 @@ class PostureAnalyzer:
         
         return False
     
-    def get_statistics(self):
-        """Get current session statistics."""
+    def get_statistics(self, distributions=True):
+        """
+        Get current session statistics.
+        
+        Args:
+            distributions: Include the metric distributions (False for compact summaries)
+        """
         current_good_duration = 0
-        if self.bad_posture_start is None and self.good_posture_start:
-            current_good_duration = int(time.time() - self.good_posture_start)
+        if self.bad_posture_start is None and self.good_posture_start is not None:
+            current_good_duration = int(self.clock.now() - self.good_posture_start)
         
-        return {
+        statistics = {
             'total_bad_duration': int(self.total_bad_duration),
             'current_bad_duration': self.bad_posture_duration,
             'longest_bad_streak': int(self.longest_bad_streak),
             'longest_good_streak': int(self.longest_good_streak),
             'current_good_duration': current_good_duration
         }
+        if distributions:
+            statistics['distributions'] = self.distributions.get_summary()
+        return statistics
     
     def reset_statistics(self):
         """Reset all statistics."""
@@ -178,6 +220,7 @@ class PostureAnalyzer:
         self.longest_good_streak = 0
         self.bad_posture_start = None
         self.bad_posture_duration = 0
-        self.good_posture_start = time.time()
+        self.good_posture_start = None
         self.warning_sent_at.clear()
         self.debouncer.reset()
+        self.distributions.reset()
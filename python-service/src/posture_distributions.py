@@ -0,0 +1,119 @@
+from quantile_sketch import TDigest
+from config import STATISTICS_QUANTILES, DEBOUNCE_RESET_GAP_SECONDS
+
+# Sketched metric -> posture_status field (all relative to the saved baseline)
+DISTRIBUTION_FIELDS = {
+    'pitch': 'adjusted_pitch',
+    'distance': 'distance_deviation',
+    'head_roll': 'adjusted_roll',
+    'shoulder_tilt': 'adjusted_shoulder_tilt'
+}
+
+STATE_VERSION = 1
+
+
+def _quantile_key(q):
+    """0.5 -> 'p50', 0.99 -> 'p99', 0.999 -> 'p99.9'."""
+    return 'p' + f'{q * 100:g}'
+
+
+class PostureDistributions:
+    """
+    Session-long distributions of the adjusted posture metrics plus the time
+    spent in each posture issue.
+    
+    Each metric feeds a TDigest per frame and issue time is accumulated from
+    frame-to-frame clock deltas, so memory stays constant no matter how long
+    the session runs. State can be exported and merged, so distributions
+    survive service restarts and combine across streams.
+    """
+    def __init__(self, quantiles=STATISTICS_QUANTILES, gap_seconds=DEBOUNCE_RESET_GAP_SECONDS):
+        """
+        Args:
+            quantiles: Quantiles reported by get_summary()
+            gap_seconds: Frame gaps longer than this don't count towards issue time
+        """
+        self.quantiles = quantiles
+        self.gap_seconds = gap_seconds
+        self.sketches = {metric: TDigest() for metric in DISTRIBUTION_FIELDS}
+        self.issue_seconds = {}
+        self.observed_seconds = 0.0   # Time covered by frames with a measured posture
+        self.last_time = None
+    
+    def update(self, current_time, posture_status):
+        """Add one frame's metrics and issue time."""
+        for metric, field in DISTRIBUTION_FIELDS.items():
+            self.sketches[metric].add(posture_status.get(field))
+        
+        # Credit the time since the previous frame to this frame's issues
+        elapsed = 0.0 if self.last_time is None else current_time - self.last_time
+        self.last_time = current_time
+        if elapsed <= 0 or elapsed > self.gap_seconds or posture_status.get('error'):
+            return
+        self.observed_seconds += elapsed
+        for issue in posture_status.get('posture_issues', ()):
+            self.issue_seconds[issue] = self.issue_seconds.get(issue, 0.0) + elapsed
+    
+    def get_summary(self):
+        """
+        Returns:
+            dict: {
+                'metrics': {metric: {'count', 'min', 'max', 'p50', 'p90', 'p99'}},
+                'issue_seconds': {issue: seconds},
+                'issue_fractions': {issue: share of observed time},
+                'observed_seconds': float
+            }
+        """
+        metrics = {}
+        for metric, sketch in self.sketches.items():
+            summary = {'count': int(sketch.count)}
+            if sketch.count:
+                summary['min'] = round(sketch.min, 2)
+                summary['max'] = round(sketch.max, 2)
+            for q in self.quantiles:
+                value = sketch.quantile(q)
+                summary[_quantile_key(q)] = round(value, 2) if value is not None else None
+            metrics[metric] = summary
+        
+        return {
+            'metrics': metrics,
+            'issue_seconds': {issue: round(seconds, 1) for issue, seconds in self.issue_seconds.items()},
+            'issue_fractions': {
+                issue: round(seconds / self.observed_seconds, 4) if self.observed_seconds else 0.0
+                for issue, seconds in self.issue_seconds.items()
+            },
+            'observed_seconds': round(self.observed_seconds, 1)
+        }
+    
+    def export_state(self):
+        """Serialisable state for merge_state() (sketch centroids, no raw samples)."""
+        return {
+            'version': STATE_VERSION,
+            'sketches': {metric: sketch.to_dict() for metric, sketch in self.sketches.items()},
+            'issue_seconds': dict(self.issue_seconds),
+            'observed_seconds': self.observed_seconds
+        }
+    
+    def merge_state(self, state):
+        """
+        Merge exported state (e.g. from a previous run or another stream).
+        
+        Raises:
+            ValueError: for an unsupported state version
+        """
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported statistics state version: {state.get('version')}")
+        
+        for metric, sketch_state in state.get('sketches', {}).items():
+            if metric in self.sketches:
+                self.sketches[metric].merge(TDigest.from_dict(sketch_state))
+        for issue, seconds in state.get('issue_seconds', {}).items():
+            self.issue_seconds[issue] = self.issue_seconds.get(issue, 0.0) + float(seconds)
+        self.observed_seconds += float(state.get('observed_seconds', 0.0))
+    
+    def reset(self):
+        """Drop all samples."""
+        self.sketches = {metric: TDigest() for metric in DISTRIBUTION_FIELDS}
+        self.issue_seconds = {}
+        self.observed_seconds = 0.0
+        self.last_time = None
@@ -0,0 +1,62 @@
+import os
+import sys
+
+try:
+    import psutil
+except ImportError:  # Optional - falls back to /proc or resource
+    psutil = None
+
+
+def get_rss_bytes():
+    """
+    Resident set size of the current process in bytes.
+    
+    Uses psutil when installed, /proc/self/statm on Linux, and the peak RSS
+    from resource.getrusage() elsewhere (None if nothing is available).
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, kilobytes on Linux/BSD
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+
+def get_cpu_seconds():
+    """User plus system CPU time of the current process (all threads) in seconds."""
+    times = os.times()
+    return times.user + times.system
+
+
+def get_open_handles():
+    """
+    Open file descriptors (handles on Windows) of the current process.
+    
+    Uses psutil when installed, /proc/self/fd on Linux and /dev/fd on macOS
+    (None if nothing is available).
+    """
+    if psutil is not None:
+        process = psutil.Process()
+        return process.num_handles() if sys.platform == 'win32' else process.num_fds()
+    
+    for fd_dir in ('/proc/self/fd', '/dev/fd'):
+        try:
+            return len(os.listdir(fd_dir)) - 1  # Minus the descriptor listdir opened
+        except OSError:
+            pass
+    return None
+
+
+def bytes_to_mb(value):
+    """Convert a byte count to megabytes (None stays None)."""
+    return None if value is None else round(value / (1024 * 1024), 1)
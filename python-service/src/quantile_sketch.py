@@ -0,0 +1,148 @@
+import math
+import numpy as np
+from config import SKETCH_COMPRESSION
+
+
+class TDigest:
+    """
+    Mergeable streaming quantile sketch (merging t-digest).
+    
+    Values are summarised by at most ~compression weighted centroids, kept
+    small near the tails (k1 scale function) so extreme quantiles like p99
+    stay accurate. New values are buffered and folded in batches, so add()
+    is O(1) amortised and memory is constant however long a session runs.
+    Two digests merge by folding one's centroids into the other, so sketches
+    from different streams or service restarts combine without raw samples.
+    """
+    def __init__(self, compression=SKETCH_COMPRESSION):
+        """
+        Args:
+            compression: Accuracy/size trade-off (~number of centroids kept)
+        """
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+        self._buffer_limit = 5 * compression
+    
+    def add(self, value, weight=1.0):
+        """Add a value (NaN and None are ignored)."""
+        if value is None or value != value:
+            return
+        value = float(value)
+        self._buffer.append((value, weight))
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+    
+    def merge(self, other):
+        """Fold another digest's centroids into this one."""
+        other._compress()
+        if other.count == 0:
+            return
+        self._buffer.extend(zip(other.means.tolist(), other.weights.tolist()))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+    
+    def _q_limit(self, q):
+        """Largest quantile a centroid starting at q may reach (k1 scale: one unit of k)."""
+        k = self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+        k_next = k + 1
+        if k_next >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k_next / self.compression) + 1) / 2
+    
+    def _compress(self):
+        """Merge buffered values into the centroids."""
+        if not self._buffer:
+            return
+        values, weights = zip(*self._buffer)
+        self._buffer = []
+        
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means = means[order].tolist()
+        weights = weights[order].tolist()
+        total = sum(weights)
+        
+        new_means = []
+        new_weights = []
+        merged_weight = 0.0
+        q_limit = self._q_limit(0.0)
+        current_mean, current_weight = means[0], weights[0]
+        for mean, weight in zip(means[1:], weights[1:]):
+            if (merged_weight + current_weight + weight) / total <= q_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                new_means.append(current_mean)
+                new_weights.append(current_weight)
+                merged_weight += current_weight
+                q_limit = self._q_limit(merged_weight / total)
+                current_mean, current_weight = mean, weight
+        new_means.append(current_mean)
+        new_weights.append(current_weight)
+        
+        self.means = np.array(new_means)
+        self.weights = np.array(new_weights)
+    
+    def quantile(self, q):
+        """
+        Estimate the q-quantile (0 <= q <= 1).
+        
+        Returns:
+            float, or None if no values were added
+        """
+        self._compress()
+        if self.count == 0:
+            return None
+        
+        # Interpolate between centroid centres, anchored at the exact min and max
+        centres = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate([[0.0], centres, [self.count]])
+        y = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * self.count, x, y))
+    
+    def to_dict(self):
+        """Serialisable state (see from_dict)."""
+        self._compress()
+        return {
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'means': [round(m, 4) for m in self.means.tolist()],
+            'weights': self.weights.tolist()
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild a digest from to_dict() output.
+        
+        Raises:
+            ValueError: if means and weights don't match
+        """
+        digest = cls(state.get('compression', SKETCH_COMPRESSION))
+        means = np.asarray(state.get('means', []), dtype=np.float64)
+        weights = np.asarray(state.get('weights', []), dtype=np.float64)
+        if means.shape != weights.shape:
+            raise ValueError('Sketch means and weights differ in length')
+        if len(means):
+            order = np.argsort(means, kind='stable')
+            digest.means = means[order]
+            digest.weights = weights[order]
+            digest.count = float(weights.sum())
+            digest.min = float(state['min']) if state.get('min') is not None else float(means.min())
+            digest.max = float(state['max']) if state.get('max') is not None else float(means.max())
+        return digest
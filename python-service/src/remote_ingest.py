@@ -0,0 +1,242 @@
+import asyncio
+import struct
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import mediapipe as mp
+import numpy as np
+from clock import ReplayClock
+from process_stats import get_rss_bytes, bytes_to_mb
+from pose_detector import PostureDetector
+from posture_analyzer import PostureAnalyzer
+from config import DETECTOR_POOL_SIZE, REMOTE_MAX_FRAME_BYTES
+
+# Binary frame header: capture timestamp in milliseconds (little-endian uint64)
+FRAME_HEADER = struct.Struct('<Q')
+
+
+def decode_frame_message(message):
+    """
+    Split a binary frame message into timestamp and JPEG payload.
+    
+    Returns:
+        tuple: (timestamp_ms, jpeg_bytes)
+    
+    Raises:
+        ValueError: if the message is malformed or too large
+    """
+    if len(message) <= FRAME_HEADER.size:
+        raise ValueError('Frame message too short')
+    if len(message) > REMOTE_MAX_FRAME_BYTES:
+        raise ValueError(f'Frame message exceeds {REMOTE_MAX_FRAME_BYTES} bytes')
+    timestamp_ms, = FRAME_HEADER.unpack_from(message)
+    return timestamp_ms, memoryview(message)[FRAME_HEADER.size:]
+
+
+class RemoteSession:
+    """
+    Per-client state for remote frame ingestion.
+    
+    Smoothing, hysteresis, baseline, thresholds and analyzer state belong to
+    the session; a metric-only PostureDetector computes posture from landmarks
+    produced by the shared DetectorPool. Time follows the client's capture
+    timestamps through a ReplayClock.
+    """
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.clock = ReplayClock()
+        self.detector = PostureDetector(clock=self.clock, load_models=False)
+        self.analyzer = PostureAnalyzer(clock=self.clock)
+        
+        # Baseline calibration (same fields as the server's local calibration)
+        self.calibrator = None
+        self.calibration_client = None
+        
+        # Only the newest unprocessed frame is kept - older ones are dropped
+        self.pending = None          # (timestamp_ms, jpeg_bytes)
+        self.scheduled = False       # Queued or being processed by the pool
+        self.last_timestamp_ms = -1
+        
+        # Statistics
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.out_of_order = 0
+    
+    def submit(self, timestamp_ms, jpeg):
+        """
+        Store a new frame. Returns False if its timestamp is not newer than
+        the last accepted frame (stale or duplicate).
+        """
+        self.received += 1
+        if timestamp_ms <= self.last_timestamp_ms:
+            self.out_of_order += 1
+            return False
+        self.last_timestamp_ms = timestamp_ms
+        
+        if self.pending is not None:
+            self.dropped += 1
+        self.pending = (timestamp_ms, bytes(jpeg))
+        return True
+    
+    def get_stats(self):
+        """Per-session frame counters."""
+        return {
+            'received': self.received,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'out_of_order': self.out_of_order
+        }
+    
+    def close(self):
+        """Clean up resources."""
+        self.detector.close()
+
+
+def _decode_and_detect(detector, jpeg, metrics=None):
+    """Worker thread: decode a JPEG and run the landmarkers the session's metrics need."""
+    frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError('Could not decode frame')
+    face_landmarks, pose_landmarks = detector.detect_all_landmarks(frame, 0, metrics)
+    return face_landmarks, pose_landmarks, frame.shape
+
+
+class DetectorPool:
+    """
+    Bounded pool of PostureDetector workers shared by all remote sessions.
+    
+    Detectors run in IMAGE mode so they keep no temporal state between frames
+    of different sessions. Scheduling is round-robin: a session holds at most
+    one place in the run queue and rejoins at the back after each frame, so a
+    fast sender cannot starve the others. Capacity (sessions x FPS) scales
+    with the pool size.
+    """
+    def __init__(self, size=DETECTOR_POOL_SIZE, pose_model_variant='auto', on_result=None, on_error=None):
+        """
+        Args:
+            size: Number of detector workers
+            pose_model_variant: Pose model for the pool detectors
+            on_result: Coroutine called as on_result(session, posture_status)
+            on_error: Coroutine called as on_error(session, message) when a frame fails
+        """
+        self.size = size
+        self.on_result = on_result
+        self.on_error = on_error
+        
+        # Start-up cost and resident memory of the detectors (reported in get_stats)
+        start = time.perf_counter()
+        rss_before = get_rss_bytes()
+        self.detectors = [
+            PostureDetector(pose_model_variant=pose_model_variant, concurrent_landmarkers=False,
+                            running_mode=mp.tasks.vision.RunningMode.IMAGE)
+            for _ in range(size)
+        ]
+        rss_after = get_rss_bytes()
+        self.startup_seconds = time.perf_counter() - start
+        self.rss_per_detector = None
+        if rss_before is not None and rss_after is not None:
+            self.rss_per_detector = (rss_after - rss_before) / size
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='detector-pool')
+        self.run_queue = deque()
+        self.ready = None
+        self.workers = []
+        
+        # Statistics
+        self.busy = 0
+        self.processed = 0
+        self.errors = 0
+    
+    def start(self):
+        """Start one worker task per detector (call from the event loop)."""
+        self.ready = asyncio.Condition()
+        self.workers = [asyncio.create_task(self._worker(detector)) for detector in self.detectors]
+    
+    async def submit(self, session, timestamp_ms, jpeg):
+        """Queue a session's frame for inference."""
+        if not session.submit(timestamp_ms, jpeg):
+            return
+        if not session.scheduled:
+            session.scheduled = True
+            async with self.ready:
+                self.run_queue.append(session)
+                self.ready.notify()
+    
+    async def _next_session(self):
+        """Wait for the next session in round-robin order."""
+        async with self.ready:
+            while not self.run_queue:
+                await self.ready.wait()
+            return self.run_queue.popleft()
+    
+    async def _worker(self, detector):
+        """Process frames from the run queue with one detector."""
+        loop = asyncio.get_running_loop()
+        while True:
+            session = await self._next_session()
+            if session.pending is None:
+                session.scheduled = False
+                continue
+            timestamp_ms, jpeg = session.pending
+            session.pending = None
+            
+            self.busy += 1
+            try:
+                face_landmarks, pose_landmarks, frame_shape = await loop.run_in_executor(
+                    self.executor, _decode_and_detect, detector, jpeg, session.detector.metrics)
+                
+                # Metric stage runs on the event loop with the session's own state
+                session.clock.on_frame(timestamp_ms)
+                posture_status = session.detector.compute_posture(face_landmarks, pose_landmarks, frame_shape)
+                session.processed += 1
+                self.processed += 1
+                if self.on_result:
+                    await self.on_result(session, posture_status)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                if self.on_error:
+                    await self.on_error(session, f'Frame processing error: {str(e)}')
+            finally:
+                self.busy -= 1
+            
+            # Back of the queue if another frame arrived meanwhile
+            async with self.ready:
+                if session.pending is not None:
+                    self.run_queue.append(session)
+                    self.ready.notify()
+                else:
+                    session.scheduled = False
+    
+    def remove(self, session):
+        """Forget a session (client disconnected)."""
+        session.pending = None
+        try:
+            self.run_queue.remove(session)
+        except ValueError:
+            pass
+    
+    def get_stats(self):
+        """Pool utilisation statistics."""
+        return {
+            'size': self.size,
+            'busy': self.busy,
+            'queued_sessions': len(self.run_queue),
+            'processed': self.processed,
+            'errors': self.errors,
+            'startup_seconds': round(self.startup_seconds, 3),
+            'rss_mb': bytes_to_mb(get_rss_bytes()),
+            'rss_per_detector_mb': bytes_to_mb(self.rss_per_detector)
+        }
+    
+    async def close(self):
+        """Stop workers and release detectors."""
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.executor.shutdown(wait=True)
+        for detector in self.detectors:
+            detector.close()
@@ -0,0 +1,360 @@
+"""
+Soak test for memory and latency drift.
+
+Runs the full PostureService in this process (so tracemalloc sees it) against
+a looping video file of a person at a desk. A ReplayClock follows the frame
+timestamps, so sustain timers, warnings and statistics behave as in
+`--hours` of real monitoring while frames are processed `--speed` times
+faster than the source frame rate. A connected client drains the results.
+
+Every SOAK_SAMPLE_INTERVAL_SECONDS it samples RSS, tracemalloc's traced memory
+and top allocators (growth since the end of warm-up), open file handles,
+threads, and capture / inference / publish latency percentiles of the frames
+since the previous sample. At the end it fits a line per series after warm-up
+and fails (exit status 1) if a slope per simulated hour exceeds SOAK_LIMITS,
+or if no frame had a face: without one the landmark, metric and overlay
+stages never run, so the soak says nothing about them. The synthetic source
+never has a face and is only useful to soak capture and transport.
+
+Usage:
+    python soak_test.py --source clip.mp4 --hours 8 --speed 4
+    python soak_test.py --source clip.mp4 --hours 24 --speed 8 --output soak.json
+    python soak_test.py --source clip.mp4 --hours 0.5 --interval 5 --warmup-minutes 5 --limit rss_mb_per_hour=20
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import threading
+import time
+import tracemalloc
+import numpy as np
+import websockets
+from clock import ReplayClock
+from config import (SOAK_PORT, SOAK_HOURS, SOAK_SPEED, SOAK_SAMPLE_INTERVAL_SECONDS, SOAK_WARMUP_MINUTES,
+                    SOAK_TOP_ALLOCATORS, SOAK_LIMITS)
+from load_test import wait_for_server, _request, percentiles
+from main import PostureService
+from process_stats import get_rss_bytes, get_open_handles, bytes_to_mb
+from telemetry_ring import LATENCY_FIELDS
+
+# Allocations of the measurement itself
+TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, __file__)
+)
+
+
+def source_spec(source):
+    """start_monitoring source for a soak run: unpaced, and looping for files."""
+    if source == 'synthetic':
+        return {'type': 'synthetic'}
+    return {'type': 'video', 'path': source, 'paced': False, 'loop': True}
+
+
+def top_allocators(snapshot, baseline, limit=SOAK_TOP_ALLOCATORS):
+    """Source lines whose traced memory grew the most since `baseline`."""
+    stats = snapshot.filter_traces(TRACEMALLOC_FILTERS).compare_to(
+        baseline.filter_traces(TRACEMALLOC_FILTERS), 'lineno')
+    return [{
+        'location': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+        'size_kb': round(stat.size / 1024, 1),
+        'size_diff_kb': round(stat.size_diff / 1024, 1),
+        'count_diff': stat.count_diff
+    } for stat in stats[:limit]]
+
+
+class SoakSampler:
+    """Collects one sample of memory, handles and stage latencies per call."""
+    def __init__(self, service, warmup_hours, trace_memory=True):
+        self.service = service
+        self.warmup_hours = warmup_hours
+        self.trace_memory = trace_memory
+        self.sim_start = None
+        self.wall_start = time.monotonic()
+        self.baseline = None        # tracemalloc snapshot at the end of warm-up
+        self._appended = 0          # Telemetry rows seen by the previous sample
+        self._frames = 0
+        self._wall = self.wall_start
+    
+    def start(self):
+        """Anchor simulated time at the current frame."""
+        self.sim_start = self.service.clock.now()
+        self._appended = self.service.analyzer.telemetry.appended
+        self._frames = self.service.detector.frame_count
+        self._wall = time.monotonic()
+    
+    def simulated_hours(self):
+        return (self.service.clock.now() - self.sim_start) / 3600
+    
+    def sample(self):
+        now = time.monotonic()
+        hours = self.simulated_hours()
+        frames = self.service.detector.frame_count
+        
+        # Stage latencies of the frames analyzed since the previous sample
+        telemetry = self.service.analyzer.telemetry
+        new_rows = min(telemetry.appended - self._appended, telemetry.count)
+        rows = telemetry.window()[telemetry.count - new_rows:]
+        self._appended = telemetry.appended
+        latency = {}
+        for field in LATENCY_FIELDS:
+            values = rows[field]
+            latency[field] = percentiles(values[~np.isnan(values)].tolist())
+        face_frames = int(np.count_nonzero(~np.isnan(rows['pitch'])))
+        
+        sample = {
+            'wall_seconds': round(now - self.wall_start, 1),
+            'hours': round(hours, 4),
+            'frames': frames,
+            'fps': round((frames - self._frames) / max(now - self._wall, 1e-9), 1),
+            'rss_mb': bytes_to_mb(get_rss_bytes()),
+            'handles': get_open_handles(),
+            'threads': threading.active_count(),
+            'analyzed_frames': new_rows,
+            'face_frames': face_frames,
+            'latency_ms': latency
+        }
+        self._frames = frames
+        self._wall = now
+        
+        if self.trace_memory:
+            sample['traced_mb'] = bytes_to_mb(tracemalloc.get_traced_memory()[0])
+            if hours >= self.warmup_hours:
+                snapshot = tracemalloc.take_snapshot()
+                if self.baseline is None:
+                    self.baseline = snapshot
+                else:
+                    sample['top_allocators'] = top_allocators(snapshot, self.baseline)
+        return sample
+
+
+def print_sample(sample):
+    latency = sample['latency_ms']
+    p99 = ' '.join(f"{field[:-3]} {(latency[field] or {}).get('p99', '-')}" for field in LATENCY_FIELDS)
+    traced = f", traced {sample['traced_mb']} MB" if 'traced_mb' in sample else ''
+    print(f"[{sample['hours']:7.3f} h] {sample['fps']:6.1f} fps, rss {sample['rss_mb']} MB{traced}, "
+          f"handles {sample['handles']}, threads {sample['threads']}, p99 ms: {p99}", flush=True)
+
+
+async def drain(websocket):
+    """Read and discard broadcasts (a client that keeps up)."""
+    async for _ in websocket:
+        pass
+
+
+async def run_soak(hours, source, speed=SOAK_SPEED, interval=SOAK_SAMPLE_INTERVAL_SECONDS,
+                   warmup_minutes=SOAK_WARMUP_MINUTES, trace_memory=True, port=SOAK_PORT):
+    """
+    Run the service for `hours` of simulated time and sample it.
+    
+    Returns:
+        tuple: (samples, wall seconds, simulated hours)
+    """
+    if trace_memory:
+        tracemalloc.start()
+    service = PostureService(clock=ReplayClock(), port=port, ipc=False)
+    server = service.ws_server
+    service_task = asyncio.create_task(service.run())
+    sampler = SoakSampler(service, warmup_minutes / 60, trace_memory)
+    samples = []
+    try:
+        url = f'ws://localhost:{port}'
+        await wait_for_server(url)
+        async with websockets.connect(url, max_size=None, close_timeout=1) as client:
+            await _request(client, {'type': 'start_monitoring', 'source': source_spec(source)},
+                           'monitoring_started')
+            server.pacer.set_target_fps(server.source.fps * speed)
+            reader = asyncio.ensure_future(drain(client))
+            
+            while service.detector.frame_count == 0:
+                await asyncio.sleep(0.1)
+            sampler.start()
+            next_sample = time.monotonic() + interval
+            while sampler.simulated_hours() < hours and not server.monitoring_task.done():
+                if time.monotonic() >= next_sample:
+                    samples.append(sampler.sample())
+                    print_sample(samples[-1])
+                    next_sample += interval
+                await asyncio.sleep(min(interval, 1.0))
+            samples.append(sampler.sample())
+            print_sample(samples[-1])
+            
+            await server.stop_monitoring()
+            reader.cancel()
+        return samples, time.monotonic() - sampler.wall_start, sampler.simulated_hours()
+    finally:
+        service_task.cancel()
+        await asyncio.gather(service_task, return_exceptions=True)
+        if trace_memory:
+            tracemalloc.stop()
+
+
+def slope(samples, key):
+    """Least-squares slope of a sample series per simulated hour (None if < 3 points)."""
+    points = [(s['hours'], key(s)) for s in samples]
+    points = [(x, y) for x, y in points if y is not None]
+    if len(points) < 3 or points[-1][0] - points[0][0] <= 0:
+        return None
+    x, y = zip(*points)
+    return round(float(np.polyfit(x, y, 1)[0]), 3)
+
+
+def summarize(samples, wall_seconds, hours, warmup_minutes):
+    """Slopes after warm-up and the final state of each series."""
+    steady = [s for s in samples if s['hours'] >= warmup_minutes / 60]
+    latency_slopes = {field: slope(steady, lambda s, f=field: (s['latency_ms'][f] or {}).get('p99'))
+                      for field in LATENCY_FIELDS}
+    measured = [value for value in latency_slopes.values() if value is not None]
+    last = samples[-1] if samples else {}
+    analyzed = sum(s['analyzed_frames'] for s in samples)
+    face_frames = sum(s['face_frames'] for s in samples)
+    return {
+        'simulated_hours': round(hours, 3),
+        'wall_hours': round(wall_seconds / 3600, 3),
+        'speed': round(hours * 3600 / wall_seconds, 2) if wall_seconds else None,
+        'frames': last.get('frames'),
+        'steady_samples': len(steady),
+        'face_frames': face_frames,
+        'face_fraction': round(face_frames / analyzed, 3) if analyzed else None,
+        'slopes': {
+            'rss_mb_per_hour': slope(steady, lambda s: s['rss_mb']),
+            'traced_mb_per_hour': slope(steady, lambda s: s.get('traced_mb')),
+            'handles_per_hour': slope(steady, lambda s: s['handles']),
+            'threads_per_hour': slope(steady, lambda s: s['threads']),
+            'p99_latency_ms_per_hour': max(measured) if measured else None
+        },
+        'latency_slopes': latency_slopes,
+        'final': {key: last.get(key) for key in ('rss_mb', 'traced_mb', 'handles', 'threads', 'latency_ms')},
+        'top_allocators': last.get('top_allocators', []),
+        'samples': samples
+    }
+
+
+def check_limits(report, limits):
+    """
+    Compare slopes with their limits.
+    
+    Returns:
+        list: (name, slope, limit, passed) - slopes that could not be measured
+              (too few samples after warm-up, no tracemalloc) pass with None
+    """
+    results = []
+    for name, limit in limits.items():
+        if name not in report['slopes']:
+            raise ValueError(f'Unknown limit: {name}')
+        value = report['slopes'][name]
+        results.append((name, value, limit, value is None or value <= limit))
+    return results
+
+
+def check_face_coverage(report):
+    """Coverage check: True if at least one analyzed frame had a face."""
+    return report['face_frames'] > 0
+
+
+def print_synthetic_warning():
+    print("!" * 72, file=sys.stderr)
+    print("WARNING: the synthetic source never contains a face. Landmarks, metrics,", file=sys.stderr)
+    print("sustain timers and overlays are not exercised, so this soak only covers", file=sys.stderr)
+    print("capture and transport, and its face coverage check will fail.", file=sys.stderr)
+    print("Pass --source with a video of a person for a meaningful soak.", file=sys.stderr)
+    print("!" * 72, file=sys.stderr, flush=True)
+
+
+def parse_limits(overrides):
+    """SOAK_LIMITS updated with 'name=value' overrides."""
+    limits = dict(SOAK_LIMITS)
+    for override in overrides or []:
+        name, _, value = override.partition('=')
+        if name not in SOAK_LIMITS:
+            raise ValueError(f"Unknown limit '{name}' (expected one of {', '.join(SOAK_LIMITS)})")
+        limits[name] = float(value)
+    return limits
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test the posture service for memory and latency drift")
+    parser.add_argument('--hours', type=float, default=SOAK_HOURS, help="Simulated hours of frames")
+    parser.add_argument('--source', required=True,
+                        help="Video file of a person at a desk (looped), or 'synthetic' (no face - coverage fails)")
+    parser.add_argument('--speed', type=float, default=SOAK_SPEED,
+                        help="Processing rate as a multiple of the source frame rate")
+    parser.add_argument('--interval', type=float, default=SOAK_SAMPLE_INTERVAL_SECONDS,
+                        help="Wall-clock seconds between samples")
+    parser.add_argument('--warmup-minutes', type=float, default=SOAK_WARMUP_MINUTES,
+                        help="Simulated minutes left out of the slopes")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="Skip tracemalloc (it slows Python allocations down)")
+    parser.add_argument('--port', type=int, default=SOAK_PORT, help="Port of the soak service")
+    parser.add_argument('--limit', action='append', default=[], metavar='NAME=VALUE',
+                        help="Override a limit from SOAK_LIMITS (repeatable)")
+    parser.add_argument('--output', '-o', default=None, help="Write the report (with all samples) as JSON")
+    return parser.parse_args(argv)
+
+
+def print_report(report, limit_results):
+    print()
+    print(f"{report['simulated_hours']} simulated hours in {report['wall_hours']} h "
+          f"({report['speed']}x), {report['frames']} frames, {report['steady_samples']} samples after warm-up")
+    print(f"face in {report['face_frames']} frames ({report['face_fraction']} of analyzed frames)")
+    final = report['final']
+    print(f"final: rss {final['rss_mb']} MB, traced {final['traced_mb']} MB, "
+          f"handles {final['handles']}, threads {final['threads']}")
+    print("p99 latency slopes (ms/h): " + ', '.join(
+        f"{field}: {'n/a' if value is None else value}" for field, value in report['latency_slopes'].items()))
+    
+    if report['top_allocators']:
+        print()
+        print("Top allocators since warm-up:")
+        for stat in report['top_allocators']:
+            print(f"  {stat['size_diff_kb']:+10.1f} KB  {stat['count_diff']:+8d}  {stat['location']}")
+    
+    print()
+    for name, value, limit, passed in limit_results:
+        status = 'PASS' if passed else 'FAIL'
+        print(f"{status}  {name}: {'n/a' if value is None else value} (limit {limit})")
+    if report['face_coverage_passed']:
+        print(f"PASS  face_coverage: {report['face_frames']} frames with a face")
+    else:
+        print("FAIL  face_coverage: no frame had a face - landmark and metric stages were never exercised")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        limits = parse_limits(args.limit)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
+    if not args.hours > 0 or not args.speed > 0 or not math.isfinite(args.speed):
+        print("ERROR: --hours and --speed must be positive", file=sys.stderr)
+        sys.exit(2)
+    if args.source == 'synthetic':
+        print_synthetic_warning()
+    
+    try:
+        samples, wall_seconds, hours = asyncio.run(run_soak(
+            args.hours, args.source, args.speed, args.interval, args.warmup_minutes,
+            not args.no_tracemalloc, args.port))
+    except (RuntimeError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
+    
+    report = summarize(samples, wall_seconds, hours, args.warmup_minutes)
+    limit_results = check_limits(report, limits)
+    report['face_coverage_passed'] = check_face_coverage(report)
+    report['limits'] = [{'name': name, 'value': value, 'limit': limit, 'passed': passed}
+                        for name, value, limit, passed in limit_results]
+    print_report(report, limit_results)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+    
+    passed = report['face_coverage_passed'] and all(passed for *_, passed in limit_results)
+    sys.exit(0 if passed else 1)
@@ -1,95 +1,97 @@
-import time
+from clock import MonotonicClock
+from config import GOOD_TO_BAD_SECONDS, BAD_TO_GOOD_SECONDS, DEBOUNCE_RESET_GAP_SECONDS
 
 class StateDebouncer:
     """
-    Prevents rapid state transitions by requiring consistent
-    state detection over multiple frames before changing state.
+    Prevents rapid state transitions by requiring the opposite state to be
+    detected continuously for a minimum duration before changing state.
+    
+    Durations come from the clock (frame timestamps with a ReplayClock), not
+    from frame counts, so the behaviour doesn't change with the frame rate.
     """
     def __init__(self, 
-                 bad_to_good_frames=3,    # Frames needed to transition bad → good
-                 good_to_bad_frames=2):    # Frames needed to transition good → bad
+                 bad_to_good_seconds=BAD_TO_GOOD_SECONDS,    # Duration needed to transition bad → good
+                 good_to_bad_seconds=GOOD_TO_BAD_SECONDS,    # Duration needed to transition good → bad
+                 reset_gap_seconds=DEBOUNCE_RESET_GAP_SECONDS,
+                 clock=None):
         """
         Args:
-            bad_to_good_frames: Consecutive good frames needed to exit bad posture
-            good_to_bad_frames: Consecutive bad frames needed to enter bad posture
+            bad_to_good_seconds: Seconds of continuous good detections needed to exit bad posture
+            good_to_bad_seconds: Seconds of continuous bad detections needed to enter bad posture
+            reset_gap_seconds: Gap between updates after which a pending transition restarts
+            clock: Time source (defaults to MonotonicClock; ReplayClock for replay)
         """
-        self.bad_to_good_frames = bad_to_good_frames
-        self.good_to_bad_frames = good_to_bad_frames
+        self.clock = clock or MonotonicClock()
+        self.bad_to_good_seconds = bad_to_good_seconds
+        self.good_to_bad_seconds = good_to_bad_seconds
+        self.reset_gap_seconds = reset_gap_seconds
         
         # Current stable state
         self.current_state = 'good'  # 'good' or 'bad'
         
-        # Transition tracking
-        self.consecutive_good_frames = 0
-        self.consecutive_bad_frames = 0
+        # Transition tracking: time the opposite state was first detected (None = no transition pending)
+        self.pending_since = None
         
         # Timestamp tracking
-        self.last_update = time.time()
+        self.last_update = None
     
-    def update(self, detected_is_bad):
+    def update(self, detected_is_bad, timestamp=None):
         """
         Update debouncer with new detection.
         
         Args:
             detected_is_bad: bool - what the current frame detected
+            timestamp: Frame time in seconds (defaults to clock.now())
             
         Returns:
             bool: The stable debounced state (is_bad)
         """
-        current_time = time.time()
+        current_time = self.clock.now() if timestamp is None else timestamp
         
-        # Reset counters if too much time has passed (>1 second gap)
-        if current_time - self.last_update > 1.0:
-            self.consecutive_good_frames = 0
-            self.consecutive_bad_frames = 0
+        # Restart a pending transition if too much time has passed between frames
+        if self.last_update is not None and current_time - self.last_update > self.reset_gap_seconds:
+            self.pending_since = None
         
         self.last_update = current_time
         
-        # Update consecutive frame counts
-        if detected_is_bad:
-            self.consecutive_bad_frames += 1
-            self.consecutive_good_frames = 0
+        detected_state = 'bad' if detected_is_bad else 'good'
+        if detected_state == self.current_state:
+            # Consistent with the stable state - cancel any pending transition
+            self.pending_since = None
         else:
-            self.consecutive_good_frames += 1
-            self.consecutive_bad_frames = 0
-        
-        # State transition logic
-        if self.current_state == 'good':
-            # Need consecutive bad frames to transition to bad
-            if self.consecutive_bad_frames >= self.good_to_bad_frames:
-                self.current_state = 'bad'
-        else:  # current_state == 'bad'
-            # Need consecutive good frames to transition to good
-            if self.consecutive_good_frames >= self.bad_to_good_frames:
-                self.current_state = 'good'
+            if self.pending_since is None:
+                self.pending_since = current_time
+            
+            # Transition once the opposite state has persisted long enough
+            if current_time - self.pending_since >= self._required_seconds():
+                self.current_state = detected_state
+                self.pending_since = None
         
         return self.current_state == 'bad'
     
+    def _required_seconds(self):
+        """Duration needed to leave the current state."""
+        return self.good_to_bad_seconds if self.current_state == 'good' else self.bad_to_good_seconds
+    
     def get_transition_progress(self):
-        """Get current progress toward state transition (for debugging/UI)."""
-        if self.current_state == 'good':
-            return {
-                'current_state': 'good',
-                'transitioning_to': 'bad' if self.consecutive_bad_frames > 0 else None,
-                'progress': self.consecutive_bad_frames,
-                'required': self.good_to_bad_frames
-            }
-        else:
-            return {
-                'current_state': 'bad',
-                'transitioning_to': 'good' if self.consecutive_good_frames > 0 else None,
-                'progress': self.consecutive_good_frames,
-                'required': self.bad_to_good_frames
-            }
+        """Get current progress toward state transition in seconds (for debugging/UI)."""
+        progress = 0.0
+        if self.pending_since is not None:
+            progress = self.last_update - self.pending_since
+        return {
+            'current_state': self.current_state,
+            'transitioning_to': ('bad' if self.current_state == 'good' else 'good') if self.pending_since is not None else None,
+            'progress': progress,
+            'required': self._required_seconds()
+        }
     
     def reset(self):
         """Reset to initial state."""
         self.current_state = 'good'
-        self.consecutive_good_frames = 0
-        self.consecutive_bad_frames = 0
+        self.pending_since = None
+        self.last_update = None
     
     def force_state(self, is_bad):
         """Force a specific state (used when user saves good posture)."""
         self.current_state = 'bad' if is_bad else 'good'
-        self.consecutive_good_frames = 0
-        self.consecutive_bad_frames = 0
+        self.pending_since = None
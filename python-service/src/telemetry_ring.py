@@ -0,0 +1,189 @@
+import math
+import numpy as np
+from config import TELEMETRY_CAPACITY
+
+# Bit of each posture issue in the 'issues' column
+ISSUE_BITS = {
+    'head_pitch': 1,
+    'distance': 2,
+    'head_roll': 4,
+    'shoulder_tilt': 8,
+    'body_lean': 16
+}
+
+# One row per analyzed frame. Missing values are NaN.
+TELEMETRY_DTYPE = np.dtype([
+    ('timestamp', 'f8'),                  # Analyzer clock time (seconds)
+    ('pitch', 'f4'),                      # Raw (unsmoothed) metrics
+    ('roll', 'f4'),
+    ('shoulder_tilt', 'f4'),
+    ('body_lean_offset', 'f4'),
+    ('distance', 'f4'),
+    ('adjusted_pitch', 'f4'),             # Smoothed metrics relative to the baseline
+    ('adjusted_roll', 'f4'),
+    ('adjusted_shoulder_tilt', 'f4'),
+    ('issues', 'u1'),                     # ISSUE_BITS bitmask
+    ('detected_bad', '?'),                # Per-frame decision
+    ('is_bad', '?'),                      # Debounced state
+    ('reused', '?'),                      # Motion gate reused the last result
+    ('tracked', '?'),                     # Landmarks propagated by optical flow
+    ('capture_ms', 'f4'),                 # Stage latencies
+    ('inference_ms', 'f4'),
+    ('publish_ms', 'f4')
+])
+
+LATENCY_FIELDS = ('capture_ms', 'inference_ms', 'publish_ms')
+
+
+def _value(value):
+    """None -> NaN for float columns."""
+    return math.nan if value is None else value
+
+
+def issues_to_mask(issues):
+    """Pack a list of issue names into an ISSUE_BITS bitmask."""
+    mask = 0
+    for issue in issues:
+        mask |= ISSUE_BITS.get(issue, 0)
+    return mask
+
+
+def mask_to_issues(mask):
+    """Unpack an ISSUE_BITS bitmask into issue names."""
+    return [issue for issue, bit in ISSUE_BITS.items() if mask & bit]
+
+
+class TelemetryRing:
+    """
+    Fixed-capacity columnar ring of per-frame records.
+    
+    Rows live in one preallocated NumPy structured array: appending writes a
+    row in place (O(1), nothing retained per frame) and the oldest row is
+    overwritten once the ring is full. Reads return slice views in time
+    order, so consumers get columns without copying.
+    """
+    def __init__(self, capacity=TELEMETRY_CAPACITY):
+        """
+        Args:
+            capacity: Number of rows kept
+        """
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=TELEMETRY_DTYPE)
+        self._next = 0       # Row written by the next append
+        self.count = 0       # Rows currently held
+        self.appended = 0    # Rows appended since creation/clear
+    
+    def append(self, timestamp, posture_status, is_bad, latencies=None):
+        """
+        Record one analyzed frame.
+        
+        Args:
+            timestamp: Clock time of the frame in seconds
+            posture_status: dict from PostureDetector.check_posture()
+            is_bad: Debounced state after this frame
+            latencies: Optional dict with capture_ms / inference_ms / publish_ms
+        """
+        raw = posture_status.get('raw_metrics') or {}
+        latencies = latencies or {}
+        self._data[self._next] = (
+            timestamp,
+            _value(raw.get('pitch')),
+            _value(raw.get('roll')),
+            _value(raw.get('shoulder_tilt')),
+            _value(raw.get('body_lean_offset')),
+            _value(raw.get('distance')),
+            _value(posture_status.get('adjusted_pitch')),
+            _value(posture_status.get('adjusted_roll')),
+            _value(posture_status.get('adjusted_shoulder_tilt')),
+            issues_to_mask(posture_status.get('posture_issues', ())),
+            bool(posture_status.get('is_bad', False)),
+            bool(is_bad),
+            bool(posture_status.get('reused', False)),
+            bool(posture_status.get('tracked', False)),
+            _value(latencies.get('capture_ms')),
+            _value(latencies.get('inference_ms')),
+            _value(latencies.get('publish_ms'))
+        )
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.appended += 1
+    
+    def segments(self, start=None, end=None):
+        """
+        Rows with start <= timestamp <= end as views into the ring.
+        
+        Returns:
+            list: Up to two structured-array views, oldest first (a window that
+                  wraps around the end of the buffer is split in two)
+        """
+        if self.count < self.capacity:
+            parts = [self._data[:self.count]]
+        else:
+            parts = [self._data[self._next:], self._data[:self._next]]
+        
+        views = []
+        for part in parts:
+            # Timestamps increase within each part (clocks never move backwards)
+            lo = 0 if start is None else np.searchsorted(part['timestamp'], start, side='left')
+            hi = len(part) if end is None else np.searchsorted(part['timestamp'], end, side='right')
+            if hi > lo:
+                views.append(part[lo:hi])
+        return views
+    
+    def window(self, start=None, end=None):
+        """Rows of a time window as one array (a view unless the window wraps)."""
+        views = self.segments(start, end)
+        if not views:
+            return self._data[:0]
+        if len(views) == 1:
+            return views[0]
+        return np.concatenate(views)
+    
+    def last(self, seconds):
+        """Rows of the last `seconds` before the newest row."""
+        if self.count == 0:
+            return self._data[:0]
+        newest = self._data[(self._next - 1) % self.capacity]['timestamp']
+        return self.window(newest - seconds)
+    
+    def to_columns(self, rows, fields=None):
+        """
+        Convert rows to JSON-ready columns.
+        
+        Args:
+            rows: Structured array from window() / last()
+            fields: Column names to include (None = all)
+        
+        Returns:
+            dict: {field: list}, NaN converted to None
+        
+        Raises:
+            ValueError: for unknown fields
+        """
+        fields = list(fields) if fields else list(TELEMETRY_DTYPE.names)
+        unknown = [f for f in fields if f not in TELEMETRY_DTYPE.names]
+        if unknown:
+            raise ValueError(f'Unknown telemetry fields: {", ".join(unknown)}')
+        
+        columns = {}
+        for field in fields:
+            column = rows[field]
+            if column.dtype.kind == 'f':
+                column = np.where(np.isnan(column), None, np.round(column.astype(np.float64), 3))
+            columns[field] = column.tolist()
+        return columns
+    
+    def clear(self):
+        """Drop all rows."""
+        self._next = 0
+        self.count = 0
+        self.appended = 0
+    
+    def get_stats(self):
+        """Ring size for metrics reporting."""
+        return {
+            'rows': self.count,
+            'capacity': self.capacity,
+            'appended': self.appended,
+            'bytes': self._data.nbytes
+        }
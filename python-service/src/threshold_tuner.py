@@ -0,0 +1,464 @@
+"""
+Offline threshold tuner.
+
+Replays recorded metric streams (headless.py JSON Lines) against user-labelled
+good and bad periods and evaluates the hysteresis -> sustain -> debounce ->
+warning pipeline for thousands of (enter, exit) threshold pairs at once.
+Rather than stepping every candidate through every sample, the tuner works
+on episodes: one segmented running minimum per distinct exit threshold gives
+the exceedance episodes of all enter thresholds sharing it, and sustain,
+debouncing and warnings are applied to the episode arrays of all candidates
+together with NumPy. A week of recordings is evaluated in seconds. The
+Pareto-optimal settings for false alerts per hour against detection delay
+are printed (and written as JSON with --output).
+
+Labels are a JSON list of periods in the recording's millisecond timestamps:
+    [{"start": 1700000000000, "end": 1700000600000, "label": "bad", "issue": "head_pitch"},
+     {"start": 1700000600000, "end": 1700004200000, "label": "good"}]
+"issue" is optional; bad periods labelled with another issue are ignored
+when tuning a metric. Unlabelled time is ignored. Each metric is tuned on
+its own (the live detector shares one hysteresis state across metrics).
+
+Usage:
+    python threshold_tuner.py posture.jsonl posture.jsonl.1 --labels labels.json --metric pitch
+    python threshold_tuner.py posture.jsonl --labels labels.json --metric distance --output pareto.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+import numpy as np
+from config import (GOOD_TO_BAD_SECONDS, BAD_TO_GOOD_SECONDS, SUSTAIN_SECONDS, DEBOUNCE_RESET_GAP_SECONDS,
+                    INITIAL_WARNING_SECONDS, REPEAT_WARNING_INTERVAL, THRESHOLDS,
+                    TUNER_SAMPLE_SECONDS, TUNER_ENTER_STEPS,
+                    scale_to_pitch_threshold, scale_to_distance_threshold,
+                    scale_to_head_roll_threshold, scale_to_shoulder_tilt_threshold)
+
+# Threshold name -> record field, issue name, lower-is-bad, enter range, max hysteresis gap, scale function
+METRICS = {
+    'pitch': {
+        'field': 'adjusted_pitch', 'issue': 'head_pitch', 'lower_is_bad': True,
+        'enter_range': (-25.0, -3.0), 'max_gap': 6.0, 'scale': scale_to_pitch_threshold
+    },
+    'distance': {
+        'field': 'distance_deviation', 'issue': 'distance', 'lower_is_bad': False,
+        'enter_range': (3.0, 20.0), 'max_gap': 6.0, 'scale': scale_to_distance_threshold
+    },
+    'head_roll': {
+        'field': 'adjusted_roll', 'issue': 'head_roll', 'lower_is_bad': False,
+        'enter_range': (1.0, 30.0), 'max_gap': 8.0, 'scale': scale_to_head_roll_threshold
+    },
+    'shoulder_tilt': {
+        'field': 'adjusted_shoulder_tilt', 'issue': 'shoulder_tilt', 'lower_is_bad': False,
+        'enter_range': (0.5, 12.0), 'max_gap': 4.0, 'scale': scale_to_shoulder_tilt_threshold
+    }
+}
+
+_NEVER = np.iinfo(np.int64).max
+
+
+def load_recordings(paths, field):
+    """
+    Read (timestamp_ms, value) pairs of one field from JSON Lines files.
+    Frames without the value (no face, no baseline) are kept as NaN.
+    
+    Returns:
+        tuple: (timestamps_ms, values) as float64 arrays sorted by time
+    """
+    timestamps = []
+    values = []
+    for path in paths:
+        with open(path, encoding='utf-8') as recording:
+            for line in recording:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get('timestamp') is None:
+                    continue
+                value = record.get(field)
+                timestamps.append(record['timestamp'])
+                values.append(math.nan if value is None else value)
+    
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(timestamps, kind='stable')
+    return timestamps[order], values[order]
+
+
+def resample(timestamps_ms, values, step_seconds, gap_seconds=DEBOUNCE_RESET_GAP_SECONDS):
+    """
+    Resample a stream onto a fixed time grid (last value at or before each
+    sample). Samples further than gap_seconds from the previous frame are NaN.
+    
+    Returns:
+        tuple: (grid_ms, sampled_values)
+    """
+    step_ms = step_seconds * 1000
+    grid = np.arange(timestamps_ms[0], timestamps_ms[-1] + step_ms / 2, step_ms)
+    index = np.searchsorted(timestamps_ms, grid, side='right') - 1
+    sampled = values[index]
+    sampled[grid - timestamps_ms[index] > gap_seconds * 1000] = np.nan
+    return grid, sampled
+
+
+def build_label_masks(grid_ms, labels, issue):
+    """
+    Returns:
+        tuple: (good_mask, bad_periods) - samples labelled good, and an
+               (N, 2) array of [start, end) sample indices of bad periods
+    """
+    good = np.zeros(len(grid_ms), dtype=bool)
+    bad_periods = []
+    for period in labels:
+        start, end = np.searchsorted(grid_ms, [period['start'], period['end']])
+        if end <= start:
+            continue
+        if period['label'] == 'good':
+            good[start:end] = True
+        elif period['label'] == 'bad' and period.get('issue') in (None, issue):
+            bad_periods.append((start, end))
+    return good, np.array(bad_periods, dtype=np.int64).reshape(-1, 2)
+
+
+def candidate_grid(metric, enter_steps=TUNER_ENTER_STEPS):
+    """
+    (enter, exit) pairs covering the metric's useful range. Exit thresholds
+    are enter moved towards good posture by whole grid steps up to max_gap,
+    so all candidates share few distinct exit values.
+    
+    Returns:
+        tuple: (enter, exit) float arrays of equal length
+    """
+    spec = METRICS[metric]
+    low, high = spec['enter_range']
+    spacing = (high - low) / (enter_steps - 1)
+    gap_steps = int(spec['max_gap'] / spacing) + 1
+    
+    # Thresholds from integer lattice positions, so equal exits compare equal
+    enter_index, gap_index = (a.ravel() for a in np.meshgrid(np.arange(enter_steps), np.arange(gap_steps),
+                                                              indexing='ij'))
+    exit_index = enter_index + gap_index if spec['lower_is_bad'] else enter_index - gap_index
+    enter = low + enter_index * spacing
+    exit_ = low + exit_index * spacing
+    keep = exit_ >= 0 if not spec['lower_is_bad'] else np.ones(len(enter), dtype=bool)
+    return enter[keep], exit_[keep]
+
+
+def hysteresis_episodes(values, enter, exit_):
+    """
+    Exceedance episodes of every candidate (values below `enter` start an
+    episode, which lasts until a value is no longer below `exit`; NaN ends it).
+    
+    Samples below an exit threshold form runs. Within a run the state turns bad
+    at the first sample whose running minimum drops below enter, so one
+    segmented running minimum per distinct exit serves all its candidates.
+    
+    Yields:
+        tuple: (candidate, start, end) int64 arrays for the candidates of one
+               exit threshold, sorted by candidate and start
+    """
+    positions = np.arange(len(values), dtype=np.int64)
+    
+    for exit_value in np.unique(exit_):
+        members = np.flatnonzero(exit_ == exit_value)
+        with np.errstate(invalid='ignore'):
+            inside = values < exit_value
+        if not inside.any():
+            continue
+        
+        edges = np.diff(np.concatenate([[False], inside, [False]]).astype(np.int8))
+        run_ends = np.flatnonzero(edges == -1)
+        run_of_sample = np.cumsum(edges[:-1] == 1) - 1
+        
+        run = run_of_sample[inside]
+        run_values = values[inside]
+        run_positions = positions[inside]
+        
+        # Segmented running minimum: offset each run below all earlier ones
+        span = run_values.max() - run_values.min() + 1.0
+        running = np.minimum.accumulate(run_values - run * span) + run * span
+        run_minimum = np.full(len(run_ends), np.inf)
+        np.minimum.at(run_minimum, run, run_values)
+        
+        # Samples where the running minimum drops (first sample of each run included)
+        new_run = np.concatenate([[True], run[1:] != run[:-1]])
+        record = new_run | (running < np.concatenate([[np.inf], running[:-1]]))
+        record_run = run[record]
+        record_value = running[record]
+        record_position = run_positions[record]
+        top = record_value.max() + 1.0
+        width = top - record_value.min() + 1.0
+        record_key = record_run * width + (top - record_value)  # Increasing within and across runs
+        
+        # Episode of (candidate, run) wherever the run gets below the candidate's enter
+        member_index, run_index = np.nonzero(run_minimum[np.newaxis, :] < enter[members][:, np.newaxis])
+        if not len(member_index):
+            continue
+        query = run_index * width + (top - enter[members][member_index])
+        first_record = np.searchsorted(record_key, query, side='right')
+        yield members[member_index], record_position[first_record], run_ends[run_index]
+
+
+def _samples(seconds, step_seconds):
+    """Samples that must elapse after a run starts for `seconds` to have passed."""
+    return int(math.ceil(seconds / step_seconds - 1e-9))
+
+
+def debounced_intervals(candidate, start, end, samples, sustain_samples, enter_samples, exit_samples):
+    """
+    Apply the sustain window and StateDebouncer to exceedance episodes.
+    
+    An episode counts from `sustain_samples` after its start. The debounced
+    state turns bad `enter_samples` into an episode long enough for it, and
+    stays bad until a gap between episodes exceeds `exit_samples`, so
+    episodes separated by short gaps form one chain.
+    
+    Returns:
+        tuple: (candidate, bad_start, bad_end) of debounced bad intervals
+    """
+    start = start + sustain_samples
+    keep = end > start
+    candidate, start, end = candidate[keep], start[keep], end[keep]
+    if not len(candidate):
+        return candidate, start, end
+    
+    new_chain = np.concatenate([[True], (candidate[1:] != candidate[:-1]) | (start[1:] - end[:-1] > exit_samples)])
+    chain_first = np.flatnonzero(new_chain)
+    chain_last = np.concatenate([chain_first[1:] - 1, [len(candidate) - 1]])
+    
+    set_time = np.where(end - start > enter_samples, start + enter_samples, _NEVER)
+    bad_start = np.minimum.reduceat(set_time, chain_first)
+    bad_end = np.minimum(end[chain_last] + exit_samples, samples)
+    keep = bad_start != _NEVER
+    return candidate[chain_first][keep], bad_start[keep], bad_end[keep]
+
+
+def _residue_cumsum(mask, period):
+    """cumsum[t] = mask[t] + mask[t - period] + mask[t - 2 * period] + ..."""
+    padded = np.zeros(-(-len(mask) // period) * period, dtype=np.int64)
+    padded[:len(mask)] = mask
+    return np.cumsum(padded.reshape(-1, period), axis=0).ravel()[:len(mask)]
+
+
+def evaluate(values, good_mask, bad_periods, enter, exit_, lower_is_bad, step_seconds,
+             sustain_seconds=0.0, good_to_bad_seconds=GOOD_TO_BAD_SECONDS,
+             bad_to_good_seconds=BAD_TO_GOOD_SECONDS, initial_warning=INITIAL_WARNING_SECONDS,
+             repeat_warning=REPEAT_WARNING_INTERVAL):
+    """
+    Score candidates against the labels.
+    
+    Warnings follow PostureAnalyzer: INITIAL_WARNING_SECONDS into a debounced
+    bad interval, then every REPEAT_WARNING_INTERVAL (rounded to whole samples).
+    
+    Returns:
+        dict of arrays (one value per candidate): 'false_alerts_per_hour',
+        'mean_delay_seconds' (missed periods count with their full length),
+        'detection_rate', 'bad_time_recall'
+    """
+    count = len(enter)
+    samples = len(values)
+    enter = np.asarray(enter, dtype=np.float64)
+    exit_ = np.asarray(exit_, dtype=np.float64)
+    if lower_is_bad:
+        oriented, enter_o, exit_o = values, enter, exit_
+    else:
+        # |value| > threshold is bad  <=>  -|value| < -threshold
+        oriented, enter_o, exit_o = -np.abs(values), -enter, -exit_
+    
+    # Number candidates in exit order, so the per-exit episode batches come out
+    # sorted by candidate without a global sort (scores are mapped back at the end)
+    by_exit = np.argsort(exit_o, kind='stable')
+    enter_o, exit_o = enter_o[by_exit], exit_o[by_exit]
+    
+    # Debounced bad intervals of all candidates, sorted by candidate and time
+    durations = (_samples(sustain_seconds, step_seconds), _samples(good_to_bad_seconds, step_seconds),
+                 _samples(bad_to_good_seconds, step_seconds))
+    intervals = [debounced_intervals(candidate, start, end, samples, *durations)
+                 for candidate, start, end in hysteresis_episodes(oriented, enter_o, exit_o)]
+    empty = np.empty(0, dtype=np.int64)
+    candidate, bad_start, bad_end = (np.concatenate([empty] + [part[i] for part in intervals]) for i in range(3))
+    
+    # Warning progression of each interval: first_warning, first_warning + period, ... < bad_end
+    first_delay = _samples(initial_warning, step_seconds)
+    period = max(1, int(round(repeat_warning / step_seconds)))
+    first_warning = bad_start + first_delay
+    warned = first_warning < bad_end
+    candidate_w, first_w, end_w = candidate[warned], first_warning[warned], bad_end[warned]
+    last_w = first_w + (end_w - 1 - first_w) // period * period
+    
+    # Warnings on good-labelled samples, counted per progression with residue prefix sums
+    good_sums = _residue_cumsum(good_mask, period)
+    before = np.where(first_w >= period, good_sums[np.maximum(first_w - period, 0)], 0)
+    false_alerts = np.bincount(candidate_w, weights=good_sums[last_w] - before, minlength=count)
+    good_hours = good_mask.sum() * step_seconds / 3600
+    
+    scores = {
+        'false_alerts_per_hour': false_alerts / good_hours if good_hours else np.zeros(count),
+        'mean_delay_seconds': np.zeros(count),
+        'detection_rate': np.zeros(count),
+        'bad_time_recall': np.zeros(count)
+    }
+    if len(bad_periods):
+        scores.update(_period_scores(candidate, bad_start, bad_end, candidate_w, first_w, end_w,
+                                     bad_periods, samples, period, step_seconds, count))
+    
+    # Back to the caller's candidate order
+    for name, values in scores.items():
+        unsorted = np.empty_like(values)
+        unsorted[by_exit] = values
+        scores[name] = unsorted
+    return scores
+
+
+def _period_scores(candidate, bad_start, bad_end, candidate_w, first_w, end_w,
+                   bad_periods, samples, period, step_seconds, count):
+    """Detection delay, detection rate and bad-time recall over labelled bad periods."""
+    scores = {}
+    
+    bad_mask = np.zeros(samples, dtype=bool)
+    for period_start, period_end in bad_periods:
+        bad_mask[period_start:period_end] = True
+    bad_sums = np.concatenate([[0], np.cumsum(bad_mask)])
+    overlap = bad_sums[bad_end] - bad_sums[bad_start]
+    scores['bad_time_recall'] = np.bincount(candidate, weights=overlap, minlength=count) / bad_mask.sum()
+    
+    # First warning at or after each bad period start, for every candidate
+    period_start = np.tile(bad_periods[:, 0], count)
+    period_end = np.tile(bad_periods[:, 1], count)
+    query_candidate = np.repeat(np.arange(count), len(bad_periods))
+    stride = samples + 1
+    keys = candidate_w * stride + first_w
+    j = np.searchsorted(keys, query_candidate * stride + period_start, side='right') - 1
+    
+    first = np.full(len(period_start), _NEVER)
+    if len(keys):
+        # Inside a warned interval that started warning before the period
+        jc = np.maximum(j, 0)
+        inside = (j >= 0) & (candidate_w[jc] == query_candidate) & (period_start < end_w[jc])
+        steps = -(-(period_start - first_w[jc]) // period)
+        within = first_w[jc] + steps * period
+        first = np.where(inside & (within < end_w[jc]), within, first)
+        # Otherwise the next warned interval of the same candidate
+        jn = np.minimum(j + 1, len(keys) - 1)
+        has_next = (j + 1 < len(keys)) & (candidate_w[jn] == query_candidate)
+        first = np.where((first == _NEVER) & has_next, first_w[jn], first)
+    
+    detected = first < period_end
+    delay = np.where(detected, first - period_start, period_end - period_start) * step_seconds
+    scores['mean_delay_seconds'] = delay.reshape(count, -1).mean(axis=1)
+    scores['detection_rate'] = detected.reshape(count, -1).mean(axis=1)
+    return scores
+
+
+def pareto_front(cost_a, cost_b):
+    """Indices of candidates not dominated on (cost_a, cost_b), both minimised, sorted by cost_a."""
+    order = np.lexsort((cost_b, cost_a))
+    front = []
+    best_b = math.inf
+    for index in order:
+        if cost_b[index] < best_b:
+            front.append(int(index))
+            best_b = cost_b[index]
+    return front
+
+
+def nearest_scale(metric, enter, exit_):
+    """Closest sensitivity scale (1.0-5.0, 0.1 steps) for set_thresholds."""
+    scale_fn = METRICS[metric]['scale']
+    scales = np.round(np.arange(1.0, 5.01, 0.1), 1)
+    errors = [abs(scale_fn(s)[0] - enter) + abs(scale_fn(s)[1] - exit_) for s in scales]
+    return float(scales[int(np.argmin(errors))])
+
+
+def tune(paths, labels, metric, step_seconds=TUNER_SAMPLE_SECONDS, enter_steps=TUNER_ENTER_STEPS):
+    """
+    Evaluate the candidate grid on recordings and return the Pareto front.
+    
+    Returns:
+        dict: {'metric', 'candidates', 'samples', ..., 'current', 'pareto': [...]}
+    
+    Raises:
+        ValueError: for an unknown metric or recordings without the metric's field
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}' (choose from {', '.join(METRICS)})")
+    spec = METRICS[metric]
+    
+    timestamps, values = load_recordings(paths, spec['field'])
+    if not len(timestamps) or np.all(np.isnan(values)):
+        raise ValueError(f"No '{spec['field']}' values in the recordings")
+    grid, sampled = resample(timestamps, values, step_seconds)
+    good_mask, bad_periods = build_label_masks(grid, labels, spec['issue'])
+    sustain = SUSTAIN_SECONDS.get(spec['issue'], 0.0)
+    
+    start = time.perf_counter()
+    enter, exit_ = candidate_grid(metric, enter_steps)
+    scores = evaluate(sampled, good_mask, bad_periods, enter, exit_, spec['lower_is_bad'],
+                      step_seconds, sustain)
+    elapsed = time.perf_counter() - start
+    
+    # Score the current thresholds the same way for comparison
+    current = THRESHOLDS[metric]
+    current_scores = evaluate(sampled, good_mask, bad_periods, np.array([current['enter_bad']]),
+                              np.array([current['exit_bad']]), spec['lower_is_bad'], step_seconds, sustain)
+    
+    def describe(enter_value, exit_value, candidate_scores, index):
+        return {
+            'enter_bad': round(float(enter_value), 2),
+            'exit_bad': round(float(exit_value), 2),
+            'scale': nearest_scale(metric, enter_value, exit_value),
+            **{name: round(float(values[index]), 3) for name, values in candidate_scores.items()}
+        }
+    
+    front = pareto_front(scores['false_alerts_per_hour'], scores['mean_delay_seconds'])
+    return {
+        'metric': metric,
+        'candidates': len(enter),
+        'samples': len(sampled),
+        'recording_hours': round(len(sampled) * step_seconds / 3600, 2),
+        'good_hours': round(good_mask.sum() * step_seconds / 3600, 2),
+        'bad_periods': len(bad_periods),
+        'seconds': round(elapsed, 2),
+        'current': describe(current['enter_bad'], current['exit_bad'], current_scores, 0),
+        'pareto': [describe(enter[i], exit_[i], scores, i) for i in front]
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Tune hysteresis thresholds on recorded sessions")
+    parser.add_argument('recordings', nargs='+', help="headless.py JSON Lines files")
+    parser.add_argument('--labels', required=True, help="JSON list of labelled good/bad periods")
+    parser.add_argument('--metric', default='pitch', choices=list(METRICS), help="Threshold to tune")
+    parser.add_argument('--step', type=float, default=TUNER_SAMPLE_SECONDS,
+                        help="Resampling step in seconds")
+    parser.add_argument('--enter-steps', type=int, default=TUNER_ENTER_STEPS,
+                        help="Candidate enter thresholds")
+    parser.add_argument('--output', '-o', default=None, help="Write the result as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with open(args.labels, encoding='utf-8') as labels_file:
+        labels = json.load(labels_file)
+    
+    try:
+        result = tune(args.recordings, labels, args.metric, args.step, args.enter_steps)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"{result['candidates']} candidates x {result['samples']} samples "
+          f"({result['recording_hours']} h) evaluated in {result['seconds']}s")
+    print(f"{'enter':>8} {'exit':>8} {'scale':>6} {'alerts/h':>9} {'delay s':>8} {'detected':>9} {'recall':>7}")
+    rows = [('current', result['current'])] + [('', row) for row in result['pareto']]
+    for name, row in rows:
+        print(f"{row['enter_bad']:>8} {row['exit_bad']:>8} {row['scale']:>6} {row['false_alerts_per_hour']:>9} "
+              f"{row['mean_delay_seconds']:>8} {row['detection_rate']:>9} {row['bad_time_recall']:>7} {name}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(result, output, indent=2)
@@ -0,0 +1,181 @@
+import asyncio
+import time
+from config import (WATCHDOG_CHECK_INTERVAL, WATCHDOG_LOOP_LAG_MS, WATCHDOG_FRAME_TIMEOUT_SECONDS,
+                    WATCHDOG_RESULT_TIMEOUT_SECONDS, WATCHDOG_BACKOFF_INITIAL_SECONDS,
+                    WATCHDOG_BACKOFF_MAX_SECONDS)
+
+class PipelineWatchdog:
+    """
+    Health monitor for the monitoring pipeline.
+    
+    Runs as its own asyncio task and measures event-loop lag (how late its
+    own periodic wake-ups are), the age of the last captured frame and the
+    age of the last posture result. Crossing a threshold raises an alert;
+    a stalled capture or inference, or a crashed loop, triggers the recover
+    callback, repeated with exponential backoff while the problem persists.
+    """
+    def __init__(self, recover, on_alert=None,
+                 check_interval=WATCHDOG_CHECK_INTERVAL,
+                 loop_lag_ms=WATCHDOG_LOOP_LAG_MS,
+                 frame_timeout=WATCHDOG_FRAME_TIMEOUT_SECONDS,
+                 result_timeout=WATCHDOG_RESULT_TIMEOUT_SECONDS,
+                 backoff_initial=WATCHDOG_BACKOFF_INITIAL_SECONDS,
+                 backoff_max=WATCHDOG_BACKOFF_MAX_SECONDS):
+        """
+        Args:
+            recover: Coroutine called as recover(problem) with 'frame_stall',
+                     'result_stall' or a reported failure; returns the action taken
+                     and raises if recovery failed
+            on_alert: Coroutine called as on_alert(alert, active, details)
+            check_interval: Seconds between health checks
+            loop_lag_ms: Event-loop lag alert threshold
+            frame_timeout: Seconds without a captured frame before recovering
+            result_timeout: Seconds without a result before recovering
+            backoff_initial: First delay between recovery attempts
+            backoff_max: Maximum delay between recovery attempts
+        """
+        self.recover = recover
+        self.on_alert = on_alert
+        self.check_interval = check_interval
+        self.loop_lag_ms_threshold = loop_lag_ms
+        self.frame_timeout = frame_timeout
+        self.result_timeout = result_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        
+        self.task = None
+        self.active_alerts = set()
+        self.pending_failure = None
+        self.loop_lag_ms = 0.0
+        self.max_loop_lag_ms = 0.0
+        
+        # Recovery statistics
+        self.recoveries = {}          # action -> count
+        self.failed_recoveries = 0
+        self.recovery_durations_ms = []
+        self.reset()
+    
+    def reset(self):
+        """Treat the pipeline as freshly (re)started."""
+        now = time.monotonic()
+        self.last_frame = now
+        self.last_result = now
+        self.backoff = self.backoff_initial
+        self.next_attempt = 0.0
+        self.pending_failure = None
+    
+    def mark_frame(self):
+        """A frame was captured."""
+        self.last_frame = time.monotonic()
+    
+    def mark_result(self):
+        """A posture result was produced."""
+        self.last_result = time.monotonic()
+    
+    def report_failure(self, problem):
+        """Report a failure the pipeline can't handle itself (e.g. the loop crashed)."""
+        self.pending_failure = problem
+    
+    def start(self):
+        """Start checking (call from the event loop)."""
+        self.reset()
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+    
+    async def stop(self):
+        """Stop checking and clear active alerts."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        for alert in list(self.active_alerts):
+            await self._set_alert(alert, False, {})
+    
+    async def run(self):
+        """Periodic health check loop."""
+        expected = time.monotonic() + self.check_interval
+        while True:
+            await asyncio.sleep(self.check_interval)
+            now = time.monotonic()
+            
+            # A busy event loop wakes us up late
+            self.loop_lag_ms = max(0.0, (now - expected) * 1000)
+            self.max_loop_lag_ms = max(self.max_loop_lag_ms, self.loop_lag_ms)
+            
+            await self.check(now)
+            # Time spent in a recovery is not loop lag
+            expected = time.monotonic() + self.check_interval
+    
+    async def check(self, now):
+        """Update alerts and start a recovery if the pipeline is unhealthy."""
+        frame_age = now - self.last_frame
+        result_age = now - self.last_result
+        
+        # A frame newer than the last result means the pipeline is stuck in
+        # inference; otherwise it is waiting for the next frame
+        in_inference = self.last_frame > self.last_result
+        frame_stall = not in_inference and frame_age > self.frame_timeout
+        result_stall = in_inference and result_age > self.result_timeout
+        
+        await self._set_alert('loop_lag', self.loop_lag_ms > self.loop_lag_ms_threshold,
+                              {'loop_lag_ms': round(self.loop_lag_ms, 1)})
+        await self._set_alert('frame_stall', frame_stall, {'frame_age_s': round(frame_age, 2)})
+        await self._set_alert('result_stall', result_stall, {'result_age_s': round(result_age, 2)})
+        
+        problem = self.pending_failure
+        if problem is None:
+            problem = 'frame_stall' if frame_stall else 'result_stall' if result_stall else None
+        
+        if problem is None:
+            # Healthy again - next problem starts with the initial backoff
+            self.backoff = self.backoff_initial
+            return
+        
+        if now < self.next_attempt:
+            return
+        
+        start = time.perf_counter()
+        try:
+            action = await self.recover(problem)
+            self.recoveries[action] = self.recoveries.get(action, 0) + 1
+            self.pending_failure = None
+            # Give the restarted pipeline a full timeout before judging it again
+            self.last_frame = self.last_result = time.monotonic()
+        except Exception:
+            self.failed_recoveries += 1
+        self.recovery_durations_ms.append((time.perf_counter() - start) * 1000)
+        del self.recovery_durations_ms[:-20]
+        
+        self.next_attempt = time.monotonic() + self.backoff
+        self.backoff = min(self.backoff * 2, self.backoff_max)
+    
+    async def _set_alert(self, alert, active, details):
+        """Raise or clear an alert, notifying only on changes."""
+        if active == (alert in self.active_alerts):
+            return
+        if active:
+            self.active_alerts.add(alert)
+        else:
+            self.active_alerts.discard(alert)
+        if self.on_alert:
+            await self.on_alert(alert, active, details)
+    
+    def get_stats(self):
+        """Health and recovery statistics for metrics reporting."""
+        now = time.monotonic()
+        durations = self.recovery_durations_ms
+        return {
+            'loop_lag_ms': round(self.loop_lag_ms, 1),
+            'max_loop_lag_ms': round(self.max_loop_lag_ms, 1),
+            'frame_age_s': round(now - self.last_frame, 2),
+            'result_age_s': round(now - self.last_result, 2),
+            'active_alerts': sorted(self.active_alerts),
+            'recoveries': dict(self.recoveries),
+            'failed_recoveries': self.failed_recoveries,
+            'last_recovery_ms': round(durations[-1], 1) if durations else None,
+            'max_recovery_ms': round(max(durations), 1) if durations else None,
+            'backoff_s': self.backoff
+        }
@@ -1,48 +1,143 @@
 import asyncio
+import copy
+import threading
 import websockets
 import json
 import cv2
 import base64
 import numpy as np
+import os
+import socket
+import stat
+import sys
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
+from config import (POSE_MODEL_VARIANTS, PIPELINE_MODE, REMOTE_INGEST_ENABLED, DETECTOR_POOL_SIZE,
+                    WATCHDOG_ENABLED, TARGET_FPS, OVERLAY_MODE, OVERLAY_LANDMARKS, PREVIEW_INTERVAL,
+                    IPC_SOCKET_ENABLED, IPC_SOCKET_PATH, CAPTURE_WIDTH, CAPTURE_HEIGHT, PREVIEW_SIZE,
+                    PREVIEW_JPEG_QUALITY, EVENT_HEARTBEAT_SECONDS)
+from frame_source import create_frame_source
+from model_selector import select_pose_model, get_model_directory
+from multiprocess_pipeline import MultiProcessPipeline, landmarks_from_array
+from baseline_calibrator import BaselineCalibrator
+from process_stats import get_rss_bytes, get_cpu_seconds, bytes_to_mb
+from remote_ingest import RemoteSession, DetectorPool, decode_frame_message
+from watchdog import PipelineWatchdog
+from frame_pacer import FramePacer
+from telemetry_ring import ISSUE_BITS
+from landmark_codec import LANDMARK_SETS, landmark_indices, encode_landmarks_base64
+from metric_registry import RULE_METRICS
+from frame_buffer_pool import FrameBufferPool
+from frame_tracer import FrameTracer
+
+OVERLAY_MODES = ('server', 'client', 'none')
+SUBSCRIPTION_MODES = ('full', 'events')
+
+
+def default_ipc_path():
+    """Unix socket path for the local IPC transport (None if disabled)."""
+    if not IPC_SOCKET_ENABLED:
+        return None
+    return IPC_SOCKET_PATH or os.path.join(tempfile.gettempdir(), 'slouti-posture.sock')
+
 
 class WebSocketServer:
-    def __init__(self, host='localhost', port=8765):
+    def __init__(self, host='localhost', port=8765, ipc_path=None):
         self.host = host
         self.port = port
+        self.ipc_path = ipc_path  # Unix socket path for same-host clients (None = TCP only)
         self.clients = set()
+        self.result_clients = set()  # Subscribed to every posture_result ('full', the default)
+        self.event_clients = set()   # Subscribed to posture_event transitions and heartbeats only
         self.on_client_change = None  # Callback for when clients connect/disconnect
         self.detector = None  # Will be set externally
         self.analyzer = None  # Will be set externally
-        self.camera = None
+        self.source = None  # FrameSource (camera, video file, image directory or synthetic)
         self.is_monitoring = False
         self.monitoring_task = None
+        self.pose_model_requests = set()  # Clients waiting for an 'auto' pose model benchmark
+        self.pose_benchmark_task = None
+        self.calibrator = None  # BaselineCalibrator while a calibration is running
+        self.calibration_client = None  # Client that requested the calibration
+        self.pipeline = None  # MultiProcessPipeline when PIPELINE_MODE == 'multiprocess'
+        self.sessions = {}  # websocket -> RemoteSession for clients streaming their own frames
+        self.detector_pool = None  # DetectorPool, created on the first remote frame
+        self._pool_lock = asyncio.Lock()
+        
+        # Capture and inference run on their own threads so a hung camera read or
+        # landmarker call can't freeze the event loop (and can be abandoned on recovery)
+        self._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='capture')
+        self._inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self.watchdog = PipelineWatchdog(recover=self.recover_pipeline, on_alert=self.send_pipeline_alert)
+        self.pacer = FramePacer(TARGET_FPS)  # Frame deadlines for the monitoring loop
+        
+        # Overlay rendering: 'server' draws into the preview, 'client' sends landmarks
+        self.overlay_mode = OVERLAY_MODE
+        self.overlay_landmarks = OVERLAY_LANDMARKS
+        self.preview_interval = PREVIEW_INTERVAL  # Preview with every Nth result (0 = none)
+        self._preview_count = 0
+        
+        # Reused capture and preview buffers (only touched from the event loop)
+        self.buffers = FrameBufferPool()
+        self.buffers.preallocate('capture', (CAPTURE_HEIGHT, CAPTURE_WIDTH, 3))
+        self.buffers.preallocate('preview', (PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3))
+        
+        # Per-frame stage spans ('dump_trace'), shared with the local detector
+        self.tracer = FrameTracer()
         
     async def register(self, websocket):
         self.clients.add(websocket)
+        self.result_clients.add(websocket)
+        self.update_overlay_metrics()
         if self.on_client_change:
             await self.on_client_change(True)
         
     async def unregister(self, websocket):
         self.clients.remove(websocket)
+        self.result_clients.discard(websocket)
+        self.event_clients.discard(websocket)
+        self.pose_model_requests.discard(websocket)
+        self.update_overlay_metrics()
+        session = self.sessions.pop(websocket, None)
+        if session is not None:
+            if self.detector_pool:
+                self.detector_pool.remove(session)
+            session.calibrator = None
+            session.close()
         if self.on_client_change:
             await self.on_client_change(len(self.clients) > 0)
         
-    async def send(self, data):
-        """Send data to all connected clients."""
-        if not self.clients:
+    async def send(self, data, traced=False, clients=None):
+        """
+        Send data to all connected clients (or to `clients`).
+        `traced` records serialise and per-client send spans for the current frame.
+        """
+        clients = self.clients if clients is None else clients
+        if not clients:
             return
-        message = json.dumps(data)
-        await asyncio.gather(
-            *[client.send(message) for client in self.clients],
-            return_exceptions=True
-        )
+        if traced and self.tracer.enabled:
+            with self.tracer.span('serialise'):
+                message = json.dumps(data)
+            sends = [self.traced_send(client, message) for client in clients]
+        else:
+            message = json.dumps(data)
+            sends = [client.send(message) for client in clients]
+        await asyncio.gather(*sends, return_exceptions=True)
+    
+    async def traced_send(self, client, message):
+        """Send a message to one client, recording a span on the client's lane."""
+        with self.tracer.span('send', lane=f'send {str(client.id)[:8]}'):
+            await client.send(message)
     
     async def handler(self, websocket):
         await self.register(websocket)
         try:
             async for message in websocket:
-                await self.process_message(websocket, message)
+                if isinstance(message, bytes):
+                    await self.handle_remote_frame(websocket, message)
+                else:
+                    await self.process_message(websocket, message)
         except websockets.exceptions.ConnectionClosed:
             pass
         finally:
@@ -54,31 +149,53 @@ class WebSocketServer:
             data = json.loads(message)
             msg_type = data.get('type')
             
+            # Clients streaming their own frames have their own detector/analyzer state
+            session = self.sessions.get(websocket)
+            detector = session.detector if session else self.detector
+            analyzer = session.analyzer if session else self.analyzer
+            
             if msg_type == 'start_monitoring':
-                # Start camera and monitoring
-                await self.start_monitoring()
+                # Start capture and monitoring (optional 'source' overrides FRAME_SOURCE)
+                await self.start_monitoring(data.get('source'))
             
             elif msg_type == 'stop_monitoring':
                 # Stop monitoring
                 await self.stop_monitoring()
             
             elif msg_type == 'save_good_posture':
-                # Save baseline posture with current frame
-                await self.handle_save_current_posture(websocket)
+                # Calibrate baseline posture from the next frames
+                await self.handle_save_current_posture(websocket, session)
             
             elif msg_type == 'get_statistics':
                 # Return statistics
-                if self.analyzer:
-                    stats = self.analyzer.get_statistics()
+                if analyzer:
+                    stats = analyzer.get_statistics()
                     await websocket.send(json.dumps({
                         'type': 'statistics',
                         'data': stats
                     }))
             
+            elif msg_type == 'export_statistics':
+                # Sketch state of the metric distributions (store it to merge after a restart)
+                if analyzer:
+                    await websocket.send(json.dumps({
+                        'type': 'statistics_state',
+                        'data': analyzer.distributions.export_state()
+                    }))
+            
+            elif msg_type == 'merge_statistics':
+                # Merge distributions exported earlier or by another stream
+                if analyzer:
+                    analyzer.distributions.merge_state(data.get('state') or {})
+                    await websocket.send(json.dumps({
+                        'type': 'statistics',
+                        'data': analyzer.get_statistics()
+                    }))
+            
             elif msg_type == 'reset_statistics':
                 # Reset statistics
-                if self.analyzer:
-                    self.analyzer.reset_statistics()
+                if analyzer:
+                    analyzer.reset_statistics()
                     await websocket.send(json.dumps({
                         'type': 'statistics_reset',
                         'success': True
@@ -87,7 +204,7 @@ class WebSocketServer:
             elif msg_type == 'set_thresholds':
                 # Update thresholds using sensitivity scales (1.0-5.0 continuous)
                 # Python service is the single source of truth for threshold mappings
-                if self.detector:
+                if detector:
                     from config import (scale_to_pitch_threshold, scale_to_distance_threshold,
                                        scale_to_head_roll_threshold, scale_to_shoulder_tilt_threshold)
                     
@@ -103,20 +220,130 @@ class WebSocketServer:
                     head_roll_enter, head_roll_exit = scale_to_head_roll_threshold(head_roll_scale)
                     shoulder_tilt_enter, shoulder_tilt_exit = scale_to_shoulder_tilt_threshold(shoulder_tilt_scale)
                     
-                    # Update thresholds
-                    self.detector.thresholds['pitch']['enter_bad'] = pitch_enter
-                    self.detector.thresholds['pitch']['exit_bad'] = pitch_exit
-                    self.detector.thresholds['distance']['enter_bad'] = distance_enter
-                    self.detector.thresholds['distance']['exit_bad'] = distance_exit
-                    self.detector.thresholds['head_roll']['enter_bad'] = head_roll_enter
-                    self.detector.thresholds['head_roll']['exit_bad'] = head_roll_exit
-                    self.detector.thresholds['shoulder_tilt']['enter_bad'] = shoulder_tilt_enter
-                    self.detector.thresholds['shoulder_tilt']['exit_bad'] = shoulder_tilt_exit
+                    # Update thresholds (the detector's own copy - other sessions are unaffected)
+                    detector.thresholds['pitch']['enter_bad'] = pitch_enter
+                    detector.thresholds['pitch']['exit_bad'] = pitch_exit
+                    detector.thresholds['distance']['enter_bad'] = distance_enter
+                    detector.thresholds['distance']['exit_bad'] = distance_exit
+                    detector.thresholds['head_roll']['enter_bad'] = head_roll_enter
+                    detector.thresholds['head_roll']['exit_bad'] = head_roll_exit
+                    detector.thresholds['shoulder_tilt']['enter_bad'] = shoulder_tilt_enter
+                    detector.thresholds['shoulder_tilt']['exit_bad'] = shoulder_tilt_exit
                     
                     await websocket.send(json.dumps({
                         'type': 'thresholds_updated',
                         'success': True
                     }))
+            
+            elif msg_type == 'get_metrics':
+                # Return pipeline performance metrics
+                await websocket.send(json.dumps({
+                    'type': 'metrics',
+                    'data': self.get_metrics()
+                }))
+            
+            elif msg_type == 'dump_trace':
+                # Frame spans of the last 'seconds' (plus sampled slow frames) as
+                # Chrome trace-event JSON
+                if not self.tracer.enabled:
+                    raise ValueError('Frame tracing is disabled (TRACE_ENABLED)')
+                seconds = data.get('seconds', 10)
+                await websocket.send(json.dumps({
+                    'type': 'trace',
+                    'data': self.tracer.dump(None if seconds is None else float(seconds),
+                                             bool(data.get('slow_frames', True)))
+                }))
+            
+            elif msg_type == 'get_telemetry':
+                # Per-frame records of a time window ('seconds' back from the newest
+                # frame, or 'start'/'end' in analyzer clock seconds)
+                if analyzer:
+                    await websocket.send(json.dumps({
+                        'type': 'telemetry',
+                        'data': self.query_telemetry(analyzer, data)
+                    }))
+            
+            elif msg_type == 'set_target_fps':
+                # Change the monitoring frame rate at runtime
+                fps = float(data.get('fps', TARGET_FPS))
+                if not 1 <= fps <= 120:
+                    raise ValueError(f'Target FPS must be between 1 and 120, got {fps}')
+                self.pacer.set_target_fps(fps)
+                await websocket.send(json.dumps({
+                    'type': 'target_fps_updated',
+                    'success': True,
+                    'fps': fps
+                }))
+            
+            elif msg_type == 'set_overlay_mode':
+                # Choose who draws the overlay and how often preview frames are sent
+                mode = data.get('mode', self.overlay_mode)
+                landmark_set = data.get('landmarks', self.overlay_landmarks)
+                interval = int(data.get('preview_interval', self.preview_interval))
+                if mode not in OVERLAY_MODES:
+                    raise ValueError(f'Unknown overlay mode: {mode}')
+                if landmark_set not in LANDMARK_SETS:
+                    raise ValueError(f'Unknown landmark set: {landmark_set}')
+                if interval < 0:
+                    raise ValueError(f'Preview interval must be >= 0, got {interval}')
+                self.overlay_mode = mode
+                self.overlay_landmarks = landmark_set
+                self.preview_interval = interval
+                self.update_overlay_metrics()
+                face_indices, pose_indices = landmark_indices(landmark_set)
+                await websocket.send(json.dumps({
+                    'type': 'overlay_mode_updated',
+                    'success': True,
+                    'mode': mode,
+                    'landmarks': landmark_set,
+                    'preview_interval': interval,
+                    'face_indices': face_indices,
+                    'pose_indices': pose_indices
+                }))
+            
+            elif msg_type == 'subscribe':
+                # 'full': every posture_result; 'events': only state transitions,
+                # warnings and a periodic heartbeat (for notification-only clients)
+                mode = data.get('mode', 'full')
+                if mode not in SUBSCRIPTION_MODES:
+                    raise ValueError(f'Unknown subscription mode: {mode}')
+                if mode == 'events':
+                    self.result_clients.discard(websocket)
+                    self.event_clients.add(websocket)
+                else:
+                    self.event_clients.discard(websocket)
+                    self.result_clients.add(websocket)
+                self.update_overlay_metrics()
+                await websocket.send(json.dumps({
+                    'type': 'subscribed',
+                    'success': True,
+                    'mode': mode,
+                    'heartbeat_seconds': EVENT_HEARTBEAT_SECONDS,
+                    'state': self.build_heartbeat(analyzer)
+                }))
+            
+            elif msg_type == 'set_metric_rules':
+                # Enable/disable posture rules and request metrics to report regardless
+                # of rules - only what is needed is computed per frame
+                if detector:
+                    rules = data.get('rules') or {}
+                    unknown = [rule for rule in rules if rule not in RULE_METRICS]
+                    if unknown:
+                        raise ValueError(f"Unknown posture rule: {', '.join(unknown)}")
+                    if 'report' in data:
+                        detector.metrics.set_consumer('client', data.get('report'))
+                    for rule, enabled in rules.items():
+                        detector.metrics.set_rule(rule, enabled)
+                    await websocket.send(json.dumps({
+                        'type': 'metric_rules_updated',
+                        'success': True,
+                        'data': detector.metrics.get_stats()
+                    }))
+            
+            elif msg_type == 'set_pose_model':
+                # Switch pose model variant ('auto' benchmarks the installed variants)
+                if self.detector:
+                    await self.handle_set_pose_model(websocket, data.get('variant', 'auto'))
         
         except Exception as e:
             await websocket.send(json.dumps({
@@ -124,114 +351,360 @@ class WebSocketServer:
                 'message': str(e)
             }))
     
-    async def start_monitoring(self):
-        """Start camera and monitoring loop."""
+    async def start_monitoring(self, source=None):
+        """Start frame capture and monitoring loop.
+        
+        Args:
+            source: Frame source spec for create_frame_source() (None = FRAME_SOURCE)
+        """
         if self.is_monitoring:
             return
         
-        self.camera = cv2.VideoCapture(0)
-        
-        # Set camera properties for better performance
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        self.camera.set(cv2.CAP_PROP_FPS, 30)
-        self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer to get latest frames
-        
-        if not self.camera.isOpened():
+        try:
+            frame_source = create_frame_source(source)
+        except (ValueError, TypeError) as e:
             await self.send({
                 'type': 'error',
-                'message': 'Failed to open camera'
+                'message': f'Invalid frame source: {str(e)}'
             })
             return
         
+        if PIPELINE_MODE == 'multiprocess':
+            # Capture, inference and encoding run in worker processes
+            self.pipeline = MultiProcessPipeline(
+                face_model_path=os.path.join(get_model_directory(), 'face_landmarker.task'),
+                pose_model_path=self.detector.pose_model_info['model_path'],
+                source=frame_source,
+                preview_interval=self.pipeline_preview_interval()
+            )
+            self.pipeline.start()
+            loop_coroutine = self.multiprocess_monitoring_loop()
+        else:
+            self.source = frame_source
+            if not self.source.open():
+                self.source.release()
+                self.source = None
+                await self.send({
+                    'type': 'error',
+                    'message': f'Failed to open frame source ({frame_source.describe()})'
+                })
+                return
+            loop_coroutine = self.monitoring_loop()
+        
         self.is_monitoring = True
-        self.monitoring_task = asyncio.create_task(self.monitoring_loop())
+        self.monitoring_task = asyncio.create_task(loop_coroutine)
+        if WATCHDOG_ENABLED:
+            self.watchdog.start()
         
         await self.send({
             'type': 'monitoring_started',
-            'success': True
+            'success': True,
+            'pose_model': self.detector.pose_model_info if self.detector else None
         })
     
     async def stop_monitoring(self):
-        """Stop camera and monitoring loop."""
+        """Stop frame capture and monitoring loop."""
         if not self.is_monitoring:
             return
         
         self.is_monitoring = False
         
-        if self.monitoring_task:
-            self.monitoring_task.cancel()
-            try:
-                await self.monitoring_task
-            except asyncio.CancelledError:
-                pass
+        # No recoveries while shutting down
+        await self.watchdog.stop()
+        await self.cancel_monitoring_task()
         
-        if self.camera:
-            self.camera.release()
-            self.camera = None
+        if self.source:
+            self.source.release()
+            self.source = None
+        
+        if self.pipeline:
+            # Joining worker processes blocks - keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.pipeline.stop)
+            self.pipeline = None
+        
+        if self.calibrator is not None:
+            await self.cancel_calibration('Monitoring stopped')
         
         await self.send({
             'type': 'monitoring_stopped',
             'success': True
         })
     
+    def encode_preview(self, frame):
+        """Resize and JPEG/base64-encode a frame for the client preview."""
+        # Resize frame for preview - smaller size reduces encoding/decoding CPU time
+        preview_frame = self.buffers.resize('preview', frame, PREVIEW_SIZE)
+        
+        # Encode frame to JPEG - quality can be higher for localhost
+        _, buffer = cv2.imencode('.jpg', preview_frame, [cv2.IMWRITE_JPEG_QUALITY, PREVIEW_JPEG_QUALITY])
+        return base64.b64encode(buffer).decode('utf-8')
+    
+    def update_overlay_metrics(self):
+        """
+        Compute the face bbox only while a connected client sees it drawn into the
+        preview, and have pipeline workers encode previews only while clients get them.
+        """
+        if self.detector:
+            drawn = self.overlay_mode == 'server' and self.preview_interval > 0 and bool(self.result_clients)
+            self.detector.metrics.set_consumer('overlay', ('face_bbox',) if drawn else None)
+        if self.pipeline is not None:
+            self.pipeline.set_preview_interval(self.pipeline_preview_interval())
+    
+    def pipeline_preview_interval(self):
+        """Preview interval for the worker processes (0 while no client receives previews)."""
+        return self.preview_interval if self.result_clients else 0
+    
+    def preview_due(self):
+        """Count a result and return True if it should carry a preview frame."""
+        if self.preview_interval <= 0:
+            return False
+        self._preview_count += 1
+        if self._preview_count >= self.preview_interval:
+            self._preview_count = 0
+            return True
+        return False
+    
+    def encode_overlay(self, detector):
+        """Quantised landmarks of the detector's latest result (client overlay mode only)."""
+        if self.overlay_mode != 'client':
+            return None
+        face_landmarks, pose_landmarks = detector.result_landmarks
+        return encode_landmarks_base64(face_landmarks, pose_landmarks, self.overlay_landmarks)
+    
+    async def publish_result(self, posture_status, frame_base64, latencies=None):
+        """Update analyzer and calibration with a frame result and send it to clients."""
+        # Update analyzer
+        with self.tracer.span('analyzer'):
+            analysis = self.analyzer.update(posture_status, latencies)
+        
+        # Feed baseline calibration with this frame's result (no extra inference)
+        if self.calibrator is not None:
+            await self.update_calibration(posture_status)
+        if self.calibrator is None:
+            self.detector.set_calibrating(False)
+        
+        # Send results to full subscribers, transitions and warnings to event subscribers
+        if self.result_clients:
+            with self.tracer.span('encode_landmarks'):
+                landmarks = self.encode_overlay(self.detector)
+            await self.send(self.build_posture_result(posture_status, analysis, frame_base64, landmarks,
+                                                      self.tracer.frame_id or None),
+                            traced=True, clients=self.result_clients)
+        for event in self.build_posture_events(analysis):
+            # Remote sessions get the events of their own analyzer
+            await self.send(event, clients=self.event_clients.difference(self.sessions))
+    
+    def build_posture_events(self, analysis):
+        """
+        'posture_event' messages for a frame's analysis: a transition of the
+        debounced state ('bad' with the issues, 'good' with how long the bad
+        posture lasted) and a 'warning' when the analyzer says to warn.
+        """
+        events = []
+        if analysis.get('transition'):
+            events.append({
+                'type': 'posture_event',
+                'event': analysis['transition'],
+                'posture_issues': analysis['posture_issues'],
+                'bad_duration': (analysis['ended_bad_duration'] if analysis['transition'] == 'good'
+                                 else analysis['bad_duration']),
+                'message': analysis['message'],
+                'published_at': time.time() * 1000
+            })
+        if analysis['should_warn']:
+            events.append({
+                'type': 'posture_event',
+                'event': 'warning',
+                'posture_issues': analysis['posture_issues'],
+                'bad_duration': analysis['bad_duration'],
+                'message': analysis['message'],
+                'published_at': time.time() * 1000
+            })
+        return events
+    
+    def build_heartbeat(self, analyzer):
+        """Compact state and session summary for event subscribers."""
+        data = {
+            'monitoring': self.is_monitoring,
+            'published_at': time.time() * 1000
+        }
+        if analyzer:
+            data['is_bad'] = analyzer.bad_posture_start is not None
+            data.update(analyzer.get_statistics(distributions=False))
+        return data
+    
+    async def heartbeat_loop(self):
+        """Send a heartbeat to event subscribers every EVENT_HEARTBEAT_SECONDS."""
+        while True:
+            await asyncio.sleep(EVENT_HEARTBEAT_SECONDS)
+            if not self.event_clients:
+                continue
+            await self.send({
+                'type': 'heartbeat',
+                'data': self.build_heartbeat(self.analyzer)
+            }, clients=self.event_clients.difference(self.sessions))
+            
+            # Clients streaming their own frames get their own analyzer's state
+            for websocket in self.event_clients.intersection(self.sessions):
+                try:
+                    await websocket.send(json.dumps({
+                        'type': 'heartbeat',
+                        'data': self.build_heartbeat(self.sessions[websocket].analyzer)
+                    }))
+                except websockets.exceptions.ConnectionClosed:
+                    pass
+    
+    def build_posture_result(self, posture_status, analysis, frame_base64, landmarks=None, trace_id=None):
+        """
+        Build a 'posture_result' message from detector and analyzer output.
+        `landmarks` is the base64 landmark_codec payload in client overlay mode,
+        `trace_id` the frame's ID in 'dump_trace' output.
+        """
+        return {
+            'type': 'posture_result',
+            'data': {
+                'is_bad': posture_status['is_bad'],
+                'pitch_angle': posture_status['pitch_angle'],
+                'roll_angle': posture_status['roll_angle'],
+                'shoulder_tilt': posture_status['shoulder_tilt'],
+                'adjusted_pitch': posture_status['adjusted_pitch'],
+                'adjusted_roll': posture_status['adjusted_roll'],
+                'adjusted_shoulder_tilt': posture_status['adjusted_shoulder_tilt'],
+                'distance': posture_status['distance'],
+                'bad_duration': analysis['bad_duration'],
+                'should_warn': analysis['should_warn'],
+                'message': analysis['message'],
+                'posture_issues': posture_status['posture_issues'],
+                'error': posture_status.get('error'),
+                'published_at': time.time() * 1000,  # Wall-clock ms, for client-side latency
+                'frame': frame_base64,
+                'landmarks': landmarks,
+                'trace_id': trace_id
+            }
+        }
+    
     async def monitoring_loop(self):
         """Continuously capture and analyze frames."""
+        loop = asyncio.get_running_loop()
+        self.detector.tracer = self.tracer
+        self.pacer.start()
         try:
             while self.is_monitoring:
-                if not self.camera or not self.camera.isOpened():
+                if not self.source or not self.source.is_opened():
+                    self.watchdog.report_failure('source_closed')
                     break
                 
-                ret, frame = self.camera.read()
+                self.tracer.begin_frame()
+                capture_start = time.perf_counter()
+                capture_buffer = self.buffers.capture_buffer(self.source)
+                with self.tracer.span('capture'):
+                    ret, frame, timestamp_ms = await loop.run_in_executor(
+                        self._capture_executor, self.source.read, capture_buffer)
                 if not ret:
+                    if self.source.finished:
+                        # End of a video file / image directory
+                        await self.watchdog.stop()
+                        await self.send({
+                            'type': 'source_finished',
+                            'source': self.source.describe()
+                        })
+                        break
                     await asyncio.sleep(0.033)  # ~30 FPS retry
                     continue
                 
-                # Get timestamp
-                timestamp_ms = int(time.time() * 1000)
+                self.watchdog.mark_frame()
+                self.buffers.check_capture(frame, capture_buffer)
                 
                 # Analyze posture on every frame
-                posture_status = self.detector.check_posture(frame, timestamp_ms)
+                inference_start = time.perf_counter()
+                with self.tracer.span('inference'):
+                    posture_status = await loop.run_in_executor(
+                        self._inference_executor, self.detector.check_posture, frame, timestamp_ms)
+                publish_start = time.perf_counter()
 
-                # Draw face bounding box on the frame if available
-                bbox = posture_status.get('face_bbox') if posture_status else None
-                if bbox:
-                    x1, y1, x2, y2 = bbox
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                frame_base64 = None
+                if self.result_clients and self.preview_due():
+                    with self.tracer.span('encode'):
+                        # Draw face bounding box on the frame if available
+                        bbox = posture_status.get('face_bbox') if posture_status else None
+                        if bbox and self.overlay_mode == 'server':
+                            x1, y1, x2, y2 = bbox
+                            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                        
+                        frame_base64 = self.encode_preview(frame)
+                latencies = {
+                    'capture_ms': (inference_start - capture_start) * 1000,
+                    'inference_ms': (publish_start - inference_start) * 1000,
+                    'publish_ms': (time.perf_counter() - publish_start) * 1000
+                }
+                await self.publish_result(posture_status, frame_base64, latencies)
+                self.tracer.end_frame()
+                self.watchdog.mark_result()
+                self.start_pose_benchmark()
                 
-                # Update analyzer
-                analysis = self.analyzer.update(posture_status)
+                # Wait for the next frame deadline (TARGET_FPS, skipping slots when behind)
+                await self.pacer.wait()
+        
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            await self.send({
+                'type': 'error',
+                'message': f'Monitoring error: {str(e)}'
+            })
+            self.watchdog.report_failure('loop_error')
+    
+    async def multiprocess_monitoring_loop(self):
+        """Consume joined results from the multi-process pipeline."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self.is_monitoring:
+                # Wait for the next frame off the event loop
+                result = await loop.run_in_executor(None, self.pipeline.next_result, 0.1)
+                if result is None:
+                    if self.pipeline.error:
+                        await self.send({
+                            'type': 'error',
+                            'message': self.pipeline.error
+                        })
+                        self.watchdog.report_failure('pipeline_error')
+                        break
+                    if self.pipeline.finished:
+                        # End of a video file / image directory and all frames drained
+                        await self.watchdog.stop()
+                        await self.send({
+                            'type': 'source_finished',
+                            'source': self.pipeline.source.describe()
+                        })
+                        break
+                    continue
                 
-                # Resize frame for preview - smaller size reduces encoding/decoding CPU time
-                preview_frame = cv2.resize(frame, (640, 360), interpolation=cv2.INTER_LINEAR)
+                # Frames are captured in another process - a joined result proves both
+                self.watchdog.mark_frame()
+                self.watchdog.mark_result()
                 
-                # Encode frame to JPEG - quality can be higher for localhost
-                _, buffer = cv2.imencode('.jpg', preview_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                frame_base64 = base64.b64encode(buffer).decode('utf-8')
+                # Metric stage: join face and pose landmarks of the same frame
+                # (traced from here - capture, inference and encode ran in the workers)
+                self.tracer.begin_frame()
+                self.detector.clock.on_frame(result['timestamp_ms'])
+                with self.tracer.span('metrics'):
+                    posture_status = self.detector.compute_posture(
+                        landmarks_from_array(result['face']),
+                        landmarks_from_array(result['pose']),
+                        self.pipeline.shape
+                    )
                 
-                # Send results to all clients
-                await self.send({
-                    'type': 'posture_result',
-                    'data': {
-                        'is_bad': posture_status['is_bad'],
-                        'pitch_angle': posture_status['pitch_angle'],
-                        'roll_angle': posture_status['roll_angle'],
-                        'shoulder_tilt': posture_status['shoulder_tilt'],
-                        'adjusted_pitch': posture_status['adjusted_pitch'],
-                        'adjusted_roll': posture_status['adjusted_roll'],
-                        'adjusted_shoulder_tilt': posture_status['adjusted_shoulder_tilt'],
-                        'distance': posture_status['distance'],
-                        'bad_duration': analysis['bad_duration'],
-                        'should_warn': analysis['should_warn'],
-                        'message': analysis['message'],
-                        'posture_issues': posture_status['posture_issues'],
-                        'error': posture_status.get('error'),
-                        'frame': frame_base64
-                    }
-                })
+                # Previews are only encoded at the preview interval while clients get them
+                frame = result['frame'] if self.result_clients else None
+                await self.publish_result(posture_status, frame)
+                self.tracer.end_frame()
                 
-                # Process at ~30 FPS for smoother preview (33ms per frame)
-                await asyncio.sleep(0.033)
+                if self.detector.pose_benchmark_pending and result['face'] is not None:
+                    # Pending 'auto' pose model benchmark: copy the frame out of the ring
+                    frame, _ = self.pipeline.ring.get(result['seq'])
+                    if frame is not None:
+                        self.detector.add_pose_benchmark_frame(frame)
+                    self.start_pose_benchmark()
         
         except asyncio.CancelledError:
             pass
@@ -240,53 +713,464 @@ class WebSocketServer:
                 'type': 'error',
                 'message': f'Monitoring error: {str(e)}'
             })
+            self.watchdog.report_failure('loop_error')
+    
+    async def cancel_monitoring_task(self):
+        """Cancel the monitoring loop task and wait for it to end."""
+        if self.monitoring_task:
+            self.monitoring_task.cancel()
+            try:
+                await self.monitoring_task
+            except asyncio.CancelledError:
+                pass
+            self.monitoring_task = None
+    
+    def restart_monitoring_task(self):
+        """Start a new monitoring loop task for the current pipeline mode."""
+        loop_coroutine = self.multiprocess_monitoring_loop() if self.pipeline else self.monitoring_loop()
+        self.monitoring_task = asyncio.create_task(loop_coroutine)
     
-    async def handle_save_current_posture(self, websocket):
-        """Save good posture baseline from current camera frame."""
-        if not self.detector:
+    async def recover_pipeline(self, problem):
+        """
+        Watchdog recovery: restart whatever is stuck.
+        
+        Returns:
+            str: Recovery action taken
+        
+        Raises:
+            RuntimeError: if the pipeline could not be restarted
+        """
+        await self.cancel_monitoring_task()
+        loop = asyncio.get_running_loop()
+        
+        if self.pipeline is not None:
+            # Worker processes: restart all of them
+            await self.restart_pipeline()
+            action = 'restart_pipeline'
+        
+        elif problem in ('frame_stall', 'source_closed'):
+            # A hung read keeps its thread - abandon it together with the old source
+            old_source = self.source
+            self._capture_executor.shutdown(wait=False)
+            self._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='capture')
+            threading.Thread(target=old_source.release, daemon=True).start()
+            
+            new_source = copy.copy(old_source)
+            if not await loop.run_in_executor(self._capture_executor, new_source.open):
+                new_source.release()
+                raise RuntimeError(f'Failed to reopen frame source ({old_source.describe()})')
+            self.source = new_source
+            action = 'reopen_source'
+        
+        elif problem == 'result_stall':
+            # Inference is stuck - fresh landmarkers on a fresh inference thread
+            self._inference_executor.shutdown(wait=False)
+            self._inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+            await loop.run_in_executor(self._inference_executor, self.detector.reload_landmarkers)
+            action = 'reset_landmarkers'
+        
+        else:
+            action = 'restart_loop'
+        
+        if self.is_monitoring:
+            self.restart_monitoring_task()
+        
+        print(f"Watchdog: {problem} -> {action}", flush=True)
+        return action
+    
+    async def restart_pipeline(self):
+        """Replace the worker processes (with the detector's current pose model)."""
+        old_pipeline = self.pipeline
+        await asyncio.get_running_loop().run_in_executor(None, old_pipeline.stop)
+        self.pipeline = MultiProcessPipeline(
+            face_model_path=old_pipeline.face_model_path,
+            pose_model_path=self.detector.pose_model_info['model_path'],
+            source=old_pipeline.source,
+            preview_interval=self.pipeline_preview_interval()
+        )
+        self.pipeline.start()
+    
+    async def send_pipeline_alert(self, alert, active, details):
+        """Notify clients that a watchdog alert was raised or cleared."""
+        await self.send({
+            'type': 'pipeline_alert',
+            'alert': alert,
+            'active': active,
+            **details
+        })
+    
+    def get_metrics(self):
+        """Collect pipeline performance metrics."""
+        metrics = {
+            'monitoring': self.is_monitoring,
+            'clients': len(self.clients),
+            'event_clients': len(self.event_clients),
+            'rss_mb': bytes_to_mb(get_rss_bytes()),
+            'cpu_seconds': round(get_cpu_seconds(), 2),
+            'buffers': self.buffers.get_stats(),
+            'tracer': self.tracer.get_stats()
+        }
+        if self.detector:
+            metrics['detector'] = self.detector.get_metrics(int(time.time() * 1000))
+            metrics['pose_model'] = self.detector.pose_model_info
+        if self.pipeline:
+            metrics['pipeline'] = self.pipeline.get_stats()
+        if self.watchdog.task is not None:
+            metrics['watchdog'] = self.watchdog.get_stats()
+        if self.source:
+            metrics['pacer'] = self.pacer.get_stats()
+        if self.analyzer:
+            metrics['telemetry'] = self.analyzer.telemetry.get_stats()
+        if self.detector_pool:
+            metrics['remote'] = {
+                'pool': self.detector_pool.get_stats(),
+                'sessions': {str(id(ws)): session.get_stats() for ws, session in self.sessions.items()}
+            }
+        return metrics
+    
+    def query_telemetry(self, analyzer, query):
+        """Columns of an analyzer's telemetry ring for a 'get_telemetry' request."""
+        telemetry = analyzer.telemetry
+        if query.get('start') is not None or query.get('end') is not None:
+            start = query.get('start')
+            end = query.get('end')
+            rows = telemetry.window(None if start is None else float(start), None if end is None else float(end))
+        else:
+            rows = telemetry.last(float(query.get('seconds', 60)))
+        return {
+            'now': analyzer.clock.now(),
+            'rows': len(rows),
+            'issue_bits': ISSUE_BITS,
+            'columns': telemetry.to_columns(rows, query.get('fields'))
+        }
+    
+    async def handle_save_current_posture(self, websocket, session=None):
+        """Start good posture calibration from the next frames of the monitoring loop
+        (or of the client's own frame stream for remote sessions)."""
+        owner = session or self
+        if not self.detector and session is None:
             await websocket.send(json.dumps({
                 'type': 'error',
                 'message': 'Detector not initialized'
             }))
             return
         
-        if not self.camera or not self.camera.isOpened():
+        if not self.is_monitoring and session is None:
             await websocket.send(json.dumps({
                 'type': 'error',
                 'message': 'Camera not active'
             }))
             return
         
+        if owner.calibrator is not None:
+            await websocket.send(json.dumps({
+                'type': 'error',
+                'message': 'Calibration already in progress'
+            }))
+            return
+        
+        # The monitoring loop feeds its results into the calibrator and
+        # reports progress/completion to this client
+        owner.calibrator = BaselineCalibrator()
+        owner.calibration_client = websocket
+        owner.detector.set_calibrating(True)
+        
+        await websocket.send(json.dumps({
+            'type': 'calibration_started',
+            'required': owner.calibrator.num_frames
+        }))
+    
+    async def update_calibration(self, posture_status, owner=None):
+        """Feed a frame result into the running calibration (called from monitoring loop).
+        
+        Args:
+            posture_status: Detector result for the frame
+            owner: Object holding calibrator/calibration_client/detector - the server
+                   itself, or a RemoteSession
+        """
+        owner = owner or self
+        calibrator = owner.calibrator
+        websocket = owner.calibration_client
+        
         try:
-            # Capture current frame
-            ret, frame = self.camera.read()
-            if not ret:
+            if calibrator.add(posture_status):
                 await websocket.send(json.dumps({
-                    'type': 'error',
-                    'message': 'Failed to capture frame'
+                    'type': 'calibration_progress',
+                    'collected': calibrator.collected,
+                    'required': calibrator.num_frames
                 }))
-                return
-            
-            # Get timestamp
-            timestamp_ms = int(time.time() * 1000)
             
-            # Save baseline
-            success = self.detector.save_good_posture(frame, timestamp_ms)
+            if calibrator.is_complete():
+                owner.calibrator = None
+                owner.calibration_client = None
+                
+                detector = owner.detector
+                baseline = calibrator.compute_baseline()
+                success = detector.set_baseline(**baseline)
+                
+                await websocket.send(json.dumps({
+                    'type': 'posture_saved',
+                    'success': success,
+                    'frames': calibrator.collected,
+                    'good_pitch': detector.good_head_pitch_angle,
+                    'good_roll': detector.good_head_roll,
+                    'good_shoulder_tilt': detector.good_shoulder_tilt,
+                    'good_distance': detector.good_head_distance
+                }))
             
+            elif calibrator.has_failed():
+                await self.cancel_calibration('No face detected during calibration', owner)
+        
+        except websockets.exceptions.ConnectionClosed:
+            # Requesting client went away - drop the calibration
+            owner.calibrator = None
+            owner.calibration_client = None
+    
+    async def cancel_calibration(self, reason, owner=None):
+        """Abort a running calibration and notify the requesting client."""
+        owner = owner or self
+        websocket = owner.calibration_client
+        owner.calibrator = None
+        owner.calibration_client = None
+        
+        if websocket is None:
+            return
+        try:
             await websocket.send(json.dumps({
                 'type': 'posture_saved',
-                'success': success,
-                'good_pitch': self.detector.good_head_pitch_angle,
-                'good_roll': self.detector.good_head_roll,
-                'good_shoulder_tilt': self.detector.good_shoulder_tilt,
-                'good_distance': self.detector.good_head_distance
+                'success': False,
+                'message': f'Failed to save posture: {reason}'
+            }))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+    
+    async def handle_set_pose_model(self, websocket, variant):
+        """Select a pose model variant, benchmarking on live frames for 'auto'."""
+        if variant not in ('auto',) + tuple(POSE_MODEL_VARIANTS):
+            await websocket.send(json.dumps({
+                'type': 'error',
+                'message': f'Unknown pose model variant: {variant}'
             }))
+            return
+        
+        loop = asyncio.get_running_loop()
+        # Swap landmarkers on the inference thread, never during an inference
+        info = await loop.run_in_executor(self._inference_executor, self.detector.set_pose_model, variant)
+        if self.detector.pose_benchmark_pending:
+            # 'auto' benchmarks on the next live frames with a face; the result is sent then
+            self.pose_model_requests.add(websocket)
+            return
+        if self.pipeline is not None and self.pipeline.pose_model_path != info['model_path']:
+            await self.switch_pipeline_pose_model()
+        
+        await websocket.send(json.dumps({
+            'type': 'pose_model_selected',
+            'success': info['variant'] == variant or (variant == 'auto' and info['model_path'] is not None),
+            'data': info
+        }))
+    
+    def start_pose_benchmark(self):
+        """Start a pending 'auto' pose model benchmark once its live frames are collected."""
+        if self.pose_benchmark_task is not None and not self.pose_benchmark_task.done():
+            return
+        frames = self.detector.take_pose_benchmark_frames()
+        if frames is not None:
+            self.pose_benchmark_task = asyncio.create_task(self.benchmark_pose_models(frames))
+    
+    async def benchmark_pose_models(self, frames):
+        """Pick the pose model from a benchmark on live frames and switch to it."""
+        loop = asyncio.get_running_loop()
+        try:
+            # Benchmark off the event loop so monitoring keeps running; the live
+            # inferences it competes with for CPU are reported as 'contention'
+            started = self.analyzer.clock.now() if self.analyzer else None
+            info = await loop.run_in_executor(None, select_pose_model, frames)
+            if started is not None:
+                info['contention'] = self.benchmark_contention(started, self.analyzer.clock.now())
+            info = await loop.run_in_executor(self._inference_executor, self.detector.apply_pose_model, info)
+            if self.pipeline is not None and self.pipeline.pose_model_path != info['model_path']:
+                await self.switch_pipeline_pose_model()
         except Exception as e:
+            print(f"Pose model benchmark failed: {e}", file=sys.stderr, flush=True)
+            info = self.detector.pose_model_info
+        
+        # Requesters get the result; the start-up benchmark nobody asked for goes to everyone
+        clients, self.pose_model_requests = self.pose_model_requests, set()
+        await self.send({
+            'type': 'pose_model_selected',
+            'success': info['model_path'] is not None,
+            'data': info
+        }, clients=clients & self.clients if clients else None)
+    
+    def benchmark_contention(self, start, end):
+        """
+        Live inference latency while a pose benchmark ran (analyzer clock
+        seconds start..end) against the same length of time just before it.
+        
+        Returns:
+            dict: frames analyzed during the benchmark and median inference_ms
+                  of inferred frames during and before it (None without samples,
+                  e.g. in the multi-process pipeline, which reports no latencies)
+        """
+        telemetry = self.analyzer.telemetry
+        
+        def median_ms(rows):
+            inferred = rows['inference_ms'][~rows['reused'] & ~rows['tracked']]
+            inferred = inferred[~np.isnan(inferred)]
+            return round(float(np.median(inferred)), 1) if len(inferred) else None
+        
+        during = telemetry.window(start, end)
+        return {
+            'seconds': round(end - start, 2),
+            'frames': len(during),
+            'inference_ms': median_ms(during),
+            'baseline_inference_ms': median_ms(telemetry.window(2 * start - end, start))
+        }
+    
+    async def switch_pipeline_pose_model(self):
+        """Restart the worker processes with the detector's new pose model."""
+        await self.cancel_monitoring_task()
+        await self.restart_pipeline()
+        if self.is_monitoring:
+            self.restart_monitoring_task()
+    
+    async def handle_remote_frame(self, websocket, message):
+        """Queue a binary frame message (timestamp + JPEG) from a remote client."""
+        if not REMOTE_INGEST_ENABLED:
             await websocket.send(json.dumps({
                 'type': 'error',
-                'message': f'Failed to save posture: {str(e)}'
+                'message': 'Remote frame ingestion is disabled'
+            }))
+            return
+        
+        try:
+            timestamp_ms, jpeg = decode_frame_message(message)
+        except ValueError as e:
+            await websocket.send(json.dumps({
+                'type': 'error',
+                'message': str(e)
+            }))
+            return
+        
+        if self.detector_pool is None:
+            await self.start_detector_pool()
+        
+        session = self.sessions.get(websocket)
+        if session is None:
+            session = RemoteSession(websocket)
+            self.sessions[websocket] = session
+        
+        await self.detector_pool.submit(session, timestamp_ms, jpeg)
+    
+    async def start_detector_pool(self):
+        """Load the shared detector pool (once) without blocking the event loop."""
+        async with self._pool_lock:
+            if self.detector_pool is not None:
+                return
+            # Use the pose model already selected for the local detector instead of re-benchmarking
+            variant = 'auto'
+            if self.detector and self.detector.pose_model_info['variant']:
+                variant = self.detector.pose_model_info['variant']
+            loop = asyncio.get_running_loop()
+            pool = await loop.run_in_executor(
+                None, lambda: DetectorPool(DETECTOR_POOL_SIZE, variant,
+                                           on_result=self.publish_remote_result,
+                                           on_error=self.send_remote_error))
+            pool.start()
+            self.detector_pool = pool
+    
+    async def publish_remote_result(self, session, posture_status):
+        """Analyze a remote session's frame result and send it back to that client only."""
+        analysis = session.analyzer.update(posture_status)
+        
+        if session.calibrator is not None:
+            await self.update_calibration(posture_status, session)
+        if session.calibrator is None:
+            session.detector.set_calibrating(False)
+        
+        try:
+            if session.websocket in self.event_clients:
+                for event in self.build_posture_events(analysis):
+                    await session.websocket.send(json.dumps(event))
+            else:
+                # No preview frame - the client already has its own camera image
+                await session.websocket.send(json.dumps(self.build_posture_result(
+                    posture_status, analysis, None, self.encode_overlay(session.detector))))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+    
+    async def send_remote_error(self, session, message):
+        """Report a failed frame to a remote client."""
+        try:
+            await session.websocket.send(json.dumps({
+                'type': 'error',
+                'message': message
             }))
+        except websockets.exceptions.ConnectionClosed:
+            pass
     
     async def start(self):
         async with websockets.serve(self.handler, self.host, self.port):
-            await asyncio.Future()
+            ipc_server = await self.start_ipc_server()
+            heartbeat_task = asyncio.create_task(self.heartbeat_loop())
+            try:
+                await asyncio.Future()
+            finally:
+                heartbeat_task.cancel()
+                if ipc_server is not None:
+                    ipc_server.close()
+                    await ipc_server.wait_closed()
+                    self.remove_ipc_socket()
+    
+    async def start_ipc_server(self):
+        """
+        Serve the same handler on the Unix socket at ipc_path, alongside TCP.
+        Compression is off: local messages are cheaper to copy than to deflate.
+        
+        Returns:
+            The websockets server, or None if disabled or unavailable
+        """
+        if not self.ipc_path:
+            return None
+        if sys.platform == 'win32' or not hasattr(socket, 'AF_UNIX'):
+            print("Unix socket transport is not available on this platform - TCP only", flush=True)
+            return None
+        
+        if os.path.exists(self.ipc_path):
+            if self.ipc_socket_in_use():
+                print(f"Unix socket {self.ipc_path} is in use by another service - TCP only", flush=True)
+                return None
+            # Stale socket file left by a crashed service
+            self.remove_ipc_socket()
+        
+        # Same user only: the socket file is created without group/other access
+        # (a chmod after bind would leave it open for a moment in the shared temp dir)
+        umask = os.umask(0o077)
+        try:
+            server = await websockets.unix_serve(self.handler, self.ipc_path, compression=None)
+        except OSError as e:
+            print(f"Failed to start Unix socket transport ({e}) - TCP only", flush=True)
+            return None
+        finally:
+            os.umask(umask)
+        print(f"WebSocket server also listening on unix:{self.ipc_path}", flush=True)
+        return server
+    
+    def ipc_socket_in_use(self):
+        """True if a server is accepting connections on ipc_path."""
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.ipc_path)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+    
+    def remove_ipc_socket(self):
+        """Delete the socket file at ipc_path (never a regular file)."""
+        try:
+            if stat.S_ISSOCK(os.stat(self.ipc_path).st_mode):
+                os.unlink(self.ipc_path)
+        except OSError:
+            pass
@@ -0,0 +1,94 @@
+"""
+Tests for the frame buffer pool.
+Checks that per-frame buffers are reused in rotation once allocated, and
+that frames a source could not decode into a pooled buffer are counted as
+allocations.
+"""
+
+import sys
+import os
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from frame_buffer_pool import FrameBufferPool
+from frame_source import FrameSource, SyntheticSource
+
+WIDTH, HEIGHT = 320, 240
+
+class AllocatingSource(FrameSource):
+    """Source that ignores the buffer it is given and returns a new array."""
+    def read(self, out=None):
+        self.frame_index += 1
+        return True, np.zeros((self.height, self.width, 3), dtype=np.uint8), self.frame_index
+
+def test_capture_reuse():
+    """Captured frames rotate through `depth` pooled buffers."""
+    pool = FrameBufferPool(depth=2)
+    source = SyntheticSource(width=WIDTH, height=HEIGHT, num_frames=20)
+    source.open()
+    
+    frames = []
+    while True:
+        ret, frame, _ = pool.read(source)
+        if not ret:
+            break
+        frames.append(frame)
+    
+    stats = pool.get_stats()
+    assert len(frames) == 20
+    assert stats['buffers'] == 2
+    assert stats['allocations'] == 2, "Only the pooled buffers themselves are allocated"
+    assert stats['reuses'] == 19, "Including the buffer handed to the read that ended the source"
+    
+    # Buffers alternate: a frame survives the next frame and is overwritten by the one after
+    assert not np.shares_memory(frames[0], frames[1])
+    assert all(frames[i] is frames[i + 2] for i in range(18))
+
+def test_source_allocations():
+    """Frames not decoded into the pooled buffer count as allocations."""
+    pool = FrameBufferPool(depth=2)
+    source = AllocatingSource(width=WIDTH, height=HEIGHT)
+    source.open()
+    for _ in range(10):
+        pool.read(source)
+    
+    stats = pool.get_stats()
+    assert stats['allocations'] == 2 + 10, "Pooled buffers plus one array per frame"
+    assert stats['allocation_rate_kb_s'] > 0
+    
+    # Sources without a fixed size get no buffer; their frames are counted too
+    source.width = source.height = None
+    assert pool.capture_buffer(source) is None
+    pool.check_capture(np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8), None)
+    assert pool.allocations == 13
+
+def test_conversion_reuse():
+    """cvt_color and resize write into pooled buffers keyed by name and shape."""
+    pool = FrameBufferPool(depth=2)
+    pool.preallocate('rgb', (HEIGHT, WIDTH, 3))
+    frame = np.random.default_rng(0).integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+    
+    outputs = {'rgb': [], 'small': []}
+    for _ in range(6):
+        outputs['rgb'].append(pool.cvt_color('rgb', frame, cv2.COLOR_BGR2RGB))
+        outputs['small'].append(pool.resize('small', frame, (WIDTH // 2, HEIGHT // 2)))
+    
+    assert np.array_equal(outputs['rgb'][-1], cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    assert np.array_equal(outputs['small'][-1], cv2.resize(frame, (WIDTH // 2, HEIGHT // 2)))
+    for name, arrays in outputs.items():
+        distinct = {id(array) for array in arrays}
+        assert len(distinct) == 2
+    
+    stats = pool.get_stats()
+    assert pool.preallocated_bytes == 2 * HEIGHT * WIDTH * 3
+    assert stats['allocations'] == 2, "Only the 'small' buffers are allocated at runtime"
+    assert stats['reuses'] == 6 + 4
+    
+    # A new shape is a new key; clear() drops everything
+    pool.resize('small', frame, (WIDTH // 4, HEIGHT // 4))
+    assert pool.get_stats()['buffers'] == 5
+    pool.clear()
+    assert pool.get_stats()['buffers'] == 0
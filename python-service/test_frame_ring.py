@@ -0,0 +1,78 @@
+"""
+Tests for the shared-memory frame ring.
+Checks that frames written into ring slots are read back by sequence number,
+from the same and from an attached mapping, and that overwritten slots are
+detected.
+"""
+
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from frame_ring import SharedFrameRing
+
+SHAPE = (48, 64, 3)
+
+def _write(ring, seq, timestamp_ms):
+    """Write a frame filled with its sequence number."""
+    slot = ring.begin_write(seq)
+    slot[:] = seq % 256
+    ring.commit(seq, timestamp_ms)
+
+def test_write_and_read():
+    """Committed frames are read back in place, also through an attached mapping."""
+    ring = SharedFrameRing(slots=4, shape=SHAPE)
+    attached = SharedFrameRing.attach(ring.name, 4, SHAPE)
+    try:
+        # Nothing written yet
+        frame, timestamp_ms = ring.get(0)
+        assert frame is None and timestamp_ms is None
+        
+        # A slot being written is not readable until committed
+        slot = ring.begin_write(0)
+        slot[:] = 7
+        assert ring.get(0) == (None, None), "Uncommitted slot should not be readable"
+        ring.commit(0, 1000)
+        
+        for reader in (ring, attached):
+            frame, timestamp_ms = reader.get(0)
+            assert frame.shape == SHAPE
+            assert np.all(frame == 7)
+            assert timestamp_ms == 1000
+            assert not frame.flags.writeable, "Readers should get read-only views"
+            assert reader.is_valid(0)
+        
+        # Reads are views of the shared slot, not copies
+        assert np.shares_memory(ring.get(0)[0], slot)
+    finally:
+        attached.close()
+        ring.close()
+
+def test_overwrite():
+    """Writing past the ring size overwrites the oldest slots, which readers detect."""
+    ring = SharedFrameRing(slots=4, shape=SHAPE)
+    try:
+        for seq in range(4):
+            _write(ring, seq, 1000 + seq * 33)
+        
+        # A reader holds frame 1 while the writer laps the ring
+        frame, _ = ring.get(1)
+        assert ring.is_valid(1)
+        for seq in range(4, 6):
+            _write(ring, seq, 1000 + seq * 33)
+        
+        assert not ring.is_valid(1), "Held view of an overwritten slot should be invalid"
+        assert np.all(frame == 5), "Held view now shows the newer frame"
+        assert ring.get(0) == (None, None)
+        assert ring.get(1) == (None, None)
+        
+        # The newest frames are still readable
+        for seq in range(2, 6):
+            frame, timestamp_ms = ring.get(seq)
+            assert frame is not None and np.all(frame == seq)
+            assert timestamp_ms == 1000 + seq * 33
+    finally:
+        ring.close()
@@ -0,0 +1,86 @@
+"""
+Tests for the binary landmark encoding.
+Checks that encoded landmarks decode to the same positions within the
+quantization step, including missing landmarks and absent face/pose.
+"""
+
+import sys
+import os
+import base64
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from landmark_tracker import TrackedLandmark
+from landmark_codec import (encode_landmarks, encode_landmarks_base64, decode_landmarks, landmark_indices,
+                            HEADER, COORDINATE_SCALE, VISIBILITY_SCALE, FACE_MESH_SIZE, POSE_SIZE)
+
+def _random_landmarks(rng, count):
+    """Landmark list with random positions (some slightly outside the image) and visibility."""
+    return [TrackedLandmark(x, y, v) for x, y, v in zip(rng.uniform(-0.1, 1.1, count),
+                                                         rng.uniform(-0.1, 1.1, count),
+                                                         rng.uniform(0, 1, count))]
+
+def _expected(landmarks, indices, with_visibility):
+    rows = []
+    for index in indices:
+        landmark = landmarks[index]
+        if landmark is None:
+            rows.append([np.nan] * (3 if with_visibility else 2))
+        else:
+            rows.append([landmark.x, landmark.y] + ([landmark.visibility] if with_visibility else []))
+    return np.array(rows, dtype=np.float64)
+
+def test_round_trip():
+    """Mesh and key landmark sets decode to the encoded positions."""
+    rng = np.random.default_rng(0)
+    face = _random_landmarks(rng, FACE_MESH_SIZE)
+    pose = _random_landmarks(rng, POSE_SIZE)
+    
+    for landmark_set in ('mesh', 'key'):
+        face_indices, pose_indices = landmark_indices(landmark_set)
+        data = encode_landmarks(face, pose, landmark_set)
+        assert len(data) == HEADER.size + 2 * (2 * len(face_indices) + 3 * len(pose_indices))
+        
+        decoded_face, decoded_pose = decode_landmarks(data)
+        face_error = np.abs(decoded_face - _expected(face, face_indices, False)).max()
+        pose_error = np.abs(decoded_pose[:, :2] - _expected(pose, pose_indices, True)[:, :2]).max()
+        visibility_error = np.abs(decoded_pose[:, 2] - _expected(pose, pose_indices, True)[:, 2]).max()
+        assert decoded_face.shape == (len(face_indices), 2)
+        assert decoded_pose.shape == (len(pose_indices), 3)
+        assert max(face_error, pose_error) <= 0.5 / COORDINATE_SCALE + 1e-6
+        assert visibility_error <= 0.5 / VISIBILITY_SCALE + 1e-6
+    
+    # JSON form is the same payload
+    assert base64.b64decode(encode_landmarks_base64(face, pose, 'key')) == encode_landmarks(face, pose, 'key')
+
+def test_missing_landmarks():
+    """Missing landmarks decode as NaN and absent face/pose as empty arrays."""
+    rng = np.random.default_rng(1)
+    face_indices, pose_indices = landmark_indices('key')
+    
+    # Sparse face list as produced by the tracker
+    face = [None] * FACE_MESH_SIZE
+    for index in face_indices[1:]:
+        face[index] = TrackedLandmark(*rng.uniform(0, 1, 2))
+    decoded_face, decoded_pose = decode_landmarks(encode_landmarks(face, None, 'key'))
+    assert np.all(np.isnan(decoded_face[0]))
+    assert not np.isnan(decoded_face[1:]).any()
+    assert decoded_pose.shape == (0, 3)
+    
+    decoded_face, decoded_pose = decode_landmarks(encode_landmarks(None, _random_landmarks(rng, POSE_SIZE), 'key'))
+    assert decoded_face.shape == (0, 2) and decoded_pose.shape == (len(pose_indices), 3)
+
+def test_invalid_data():
+    """Truncated or unknown data is rejected."""
+    data = encode_landmarks(_random_landmarks(np.random.default_rng(2), FACE_MESH_SIZE), None, 'key')
+    with pytest.raises(ValueError, match='too short'):
+        decode_landmarks(data[:3])
+    with pytest.raises(ValueError, match='does not match'):
+        decode_landmarks(data[:-2])
+    with pytest.raises(ValueError, match='version'):
+        decode_landmarks(bytes([99]) + data[1:])
+    with pytest.raises(ValueError):
+        landmark_indices('all')
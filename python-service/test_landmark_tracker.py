@@ -0,0 +1,124 @@
+"""
+Tests for optical-flow landmark tracking.
+Checks that tracked landmarks follow a moving image and that the tracker
+falls back to full inference on age, lost points and large drift, and that
+the detector has a face bbox for tracked frames.
+"""
+
+import sys
+import os
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from clock import ReplayClock
+from landmark_tracker import LandmarkTracker, TrackedLandmark
+from pose_detector import PostureDetector
+
+WIDTH, HEIGHT = 640, 480
+FACE_INDICES = [1, 4, 7]
+POSE_INDICES = [11, 12]
+
+def _texture(seed=0):
+    """Smooth random texture that optical flow can lock onto."""
+    noise = np.random.default_rng(seed).integers(0, 256, (HEIGHT + 200, WIDTH + 200), dtype=np.uint8)
+    texture = cv2.GaussianBlur(noise, (0, 0), 3)
+    return cv2.normalize(texture, None, 0, 255, cv2.NORM_MINMAX)
+
+def _frame(texture, dx=0, dy=0):
+    """BGR frame showing the texture shifted by (dx, dy) pixels."""
+    crop = texture[100 - dy:100 - dy + HEIGHT, 100 - dx:100 - dx + WIDTH]
+    return cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR)
+
+def _landmarks(count, points, visibility=1.0):
+    """Sparse landmark list with the given {index: (x, y)} pixel positions set."""
+    landmarks = [TrackedLandmark(0.5, 0.5, visibility) for _ in range(count)]
+    for idx, (x, y) in points.items():
+        landmarks[idx] = TrackedLandmark(x / WIDTH, y / HEIGHT, visibility)
+    return landmarks
+
+def _start(tracker, texture, timestamp_ms=0):
+    face = _landmarks(10, {1: (300, 200), 4: (340, 210), 7: (320, 260)})
+    pose = _landmarks(33, {11: (220, 400), 12: (420, 400)}, visibility=0.9)
+    tracker.start(_frame(texture), timestamp_ms, face, FACE_INDICES, pose, POSE_INDICES)
+
+def test_tracking():
+    """Tracked landmarks follow the image motion."""
+    texture = _texture()
+    tracker = LandmarkTracker(scale=0.5, max_age_seconds=1.0)
+    _start(tracker, texture)
+    
+    for i in range(1, 6):
+        tracked = tracker.track(_frame(texture, dx=2 * i, dy=i), i * 33)
+        assert tracked is not None, f"Frame {i} should be tracked"
+    face, pose, (dx, dy) = tracked
+    assert abs(dx - 10) < 1 and abs(dy - 5) < 1
+    
+    # Only the tracked indices are set, at the shifted positions
+    assert len(face) == 10 and len(pose) == 33
+    assert face[0] is None and pose[0] is None
+    assert abs(face[1].x * WIDTH - 310) < 1 and abs(face[1].y * HEIGHT - 205) < 1
+    assert abs(pose[12].x * WIDTH - 430) < 1
+    assert pose[11].visibility == 0.9, "Pose visibility carries over from the keyframe"
+    
+    assert tracker.get_stats()['tracked_frames'] == 5
+
+def test_fallback():
+    """The tracker asks for a full inference instead of returning bad landmarks."""
+    texture = _texture()
+    tracker = LandmarkTracker(scale=0.5, max_age_seconds=0.25, max_drift=40)
+    
+    # Nothing to track before the first inference or without a face
+    assert tracker.track(_frame(texture), 0) is None
+    tracker.start(_frame(texture), 0, None, FACE_INDICES)
+    assert tracker.track(_frame(texture), 33) is None
+    
+    # Too long since the last full inference
+    _start(tracker, texture)
+    assert tracker.track(_frame(texture, dx=1), 100) is not None
+    assert tracker.track(_frame(texture, dx=1), 250) is None
+    
+    # Scene replaced: points lost or inconsistent forward/backward
+    _start(tracker, texture)
+    assert tracker.track(_frame(_texture(seed=1)), 33) is None
+    
+    # Moved too far since the keyframe (in small steps that flow can follow)
+    _start(tracker, texture)
+    tracked = None
+    for i in range(1, 10):
+        tracked = tracker.track(_frame(texture, dx=6 * i), i * 20)
+        if tracked is None:
+            break
+    assert tracked is None and 6 * i > 40
+    
+    rejections = tracker.get_stats()['rejections']
+    assert rejections['age'] == 1
+    assert rejections['lost'] + rejections['fb_error'] == 1
+    assert rejections['drift'] == 1
+    
+    # After a reset the next frame needs inference again
+    _start(tracker, texture)
+    tracker.reset()
+    assert tracker.track(_frame(texture), 33) is None
+
+def test_detector_bbox_on_tracked_frames():
+    """A face bbox requested mid-track is shifted from the keyframe's."""
+    texture = _texture()
+    rng = np.random.default_rng(0)
+    face = [TrackedLandmark(x, y) for x, y in zip(rng.uniform(0.35, 0.65, 478), rng.uniform(0.3, 0.7, 478))]
+    
+    detector = PostureDetector(load_models=False, clock=ReplayClock())
+    detector.motion_gate = None
+    detector.tracker = LandmarkTracker(scale=0.5, max_age_seconds=1.0)
+    detector.detect_landmarks = lambda frame, timestamp_ms, mp_image=None: face
+    keyframe = detector.check_posture(_frame(texture), 0)
+    assert not keyframe.get('tracked')
+    
+    # An overlay starts drawing the bbox while landmarks are tracked
+    detector.metrics.set_consumer('overlay', ('face_bbox',))
+    result = detector.check_posture(_frame(texture, dx=4), 33)
+    assert result.get('tracked')
+    x1, y1, x2, y2 = keyframe['face_bbox']
+    assert result['face_bbox'] == (x1 + 4, y1, x2 + 4, y2)
@@ -0,0 +1,133 @@
+"""
+Tests for the metric registry.
+Checks that only metrics needed by enabled posture rules and consumers are
+computed, and that the pose landmarker is skipped when nothing reads it.
+"""
+
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from landmark_tracker import TrackedLandmark
+from metric_registry import MetricRegistry, CALIBRATION_METRICS
+from motion_gate import MotionGate
+from pose_detector import PostureDetector
+
+FRAME_SHAPE = (720, 1280, 3)
+ALL_RULES = {'head_pitch': True, 'distance': True, 'head_roll': True, 'shoulder_tilt': True, 'body_lean': True}
+
+def _landmarks(count, seed):
+    """Landmarks spread around the image center (a plausible face/upper body)."""
+    rng = np.random.default_rng(seed)
+    return [TrackedLandmark(x, y) for x, y in zip(rng.uniform(0.4, 0.6, count), rng.uniform(0.3, 0.7, count))]
+
+def _detector(rules):
+    detector = PostureDetector(load_models=False)
+    detector.motion_gate = None
+    detector.tracker = None
+    for rule, enabled in rules.items():
+        detector.metrics.set_rule(rule, enabled)
+    return detector
+
+def test_required_metrics():
+    """Rules and consumers decide the required metrics and landmark inputs."""
+    registry = MetricRegistry(rules={rule: False for rule in ALL_RULES})
+    assert registry.required_metrics() == frozenset()
+    assert not registry.needs_input('face') and not registry.needs_input('pose')
+    
+    # Dependencies are included (distance needs the yaw from head_pose)
+    registry.set_rule('distance', True)
+    assert registry.required_metrics() == {'distance', 'head_pose'}
+    assert registry.needs_input('face') and not registry.needs_input('pose')
+    
+    registry.set_rule('shoulder_tilt', True)
+    assert registry.needs_input('pose')
+    registry.set_rule('shoulder_tilt', False)
+    assert not registry.needs_input('pose')
+    
+    # Consumers add metrics until removed
+    registry.set_consumer('calibration', CALIBRATION_METRICS)
+    assert registry.required_metrics() == set(CALIBRATION_METRICS)
+    assert registry.needs_input('pose')
+    registry.set_consumer('calibration', None)
+    assert registry.required_metrics() == {'distance', 'head_pose'}
+    
+    with pytest.raises(ValueError, match='Unknown posture rule'):
+        registry.set_rule('slouch', True)
+    with pytest.raises(ValueError, match='Unknown metric'):
+        registry.set_consumer('overlay', ['nose'])
+
+def test_only_required_metrics_computed():
+    """The detector computes only required metrics; the others are None."""
+    face = _landmarks(478, seed=0)
+    pose = _landmarks(33, seed=1)
+    
+    detector = _detector(ALL_RULES)
+    result = detector.compute_posture(face, pose, FRAME_SHAPE)
+    assert all(value is not None for value in result['raw_metrics'].values()), "All rules enabled"
+    
+    detector = _detector({**{rule: False for rule in ALL_RULES}, 'head_pitch': True})
+    for _ in range(10):
+        result = detector.compute_posture(face, pose, FRAME_SHAPE)
+    raw = result['raw_metrics']
+    assert raw['pitch'] is not None
+    assert raw['roll'] is None and raw['distance'] is None
+    assert raw['shoulder_tilt'] is None and raw['body_lean_offset'] is None
+    
+    stats = detector.metrics.get_stats()
+    assert stats['frames'] == 10
+    assert stats['evaluated'] == {'head_pose': 10, 'eye_roll': 0, 'distance': 0, 'shoulder_tilt': 0,
+                                  'body_lean_offset': 0, 'face_bbox': 0}
+    assert stats['saved_metric_ms'] > 0
+    
+    # Calibration needs every baseline metric while it runs
+    detector.set_calibrating(True)
+    raw = detector.compute_posture(face, pose, FRAME_SHAPE)['raw_metrics']
+    assert all(value is not None for value in raw.values())
+
+def test_pose_landmarker_skipped():
+    """The pose landmarker only runs when a required metric reads pose landmarks."""
+    face = _landmarks(478, seed=0)
+    pose = _landmarks(33, seed=1)
+    detector = _detector({**ALL_RULES, 'shoulder_tilt': False, 'body_lean': False})
+    calls = {'face': 0, 'pose': 0}
+    
+    def detect_landmarks(frame, timestamp_ms, mp_image=None):
+        calls['face'] += 1
+        return face
+    
+    def detect_pose_landmarks(frame, timestamp_ms, mp_image=None):
+        calls['pose'] += 1
+        return pose
+    
+    detector.pose_landmarker = object()
+    detector.detect_landmarks = detect_landmarks
+    detector.detect_pose_landmarks = detect_pose_landmarks
+    
+    frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    for i in range(5):
+        detector.check_posture(frame, i * 33)
+    assert calls == {'face': 5, 'pose': 0}
+    assert detector.metrics.get_stats()['skipped_landmarkers'] == {'pose': 5}
+    
+    detector.metrics.set_rule('shoulder_tilt', True)
+    result = detector.check_posture(frame, 5 * 33)
+    assert calls['pose'] == 1
+    assert result['raw_metrics']['shoulder_tilt'] is not None
+
+def test_gate_bbox_counted():
+    """The face bbox the motion gate needs is counted where it is computed."""
+    face = _landmarks(478, seed=0)
+    detector = _detector({**{rule: False for rule in ALL_RULES}, 'head_pitch': True})
+    detector.motion_gate = MotionGate()
+    detector.detect_landmarks = lambda frame, timestamp_ms, mp_image=None: face
+    
+    result = detector.check_posture(np.zeros(FRAME_SHAPE, dtype=np.uint8), 0)
+    assert result['face_bbox'] is not None
+    stats = detector.metrics.get_stats()
+    assert stats['evaluated']['face_bbox'] == 1
+    assert stats['evaluated']['head_pose'] == 1
@@ -0,0 +1,110 @@
+"""
+Tests for motion gating.
+Checks that static frames reuse the last result, that motion and the
+maximum reuse age force a full inference, and that calibration only sees
+freshly inferred frames.
+"""
+
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from clock import ReplayClock
+from motion_gate import MotionGate
+from pose_detector import PostureDetector
+from baseline_calibrator import BaselineCalibrator
+
+FPS = 30
+
+def _frame(value=128, shape=(360, 640, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+def _stub_detector():
+    """Detector whose landmarkers are replaced by a fixed result (counts inferences)."""
+    detector = PostureDetector(load_models=False, clock=ReplayClock())
+    detector.motion_gate = MotionGate()
+    detector.tracker = None
+    
+    def analyze(frame, timestamp_ms):
+        return {'is_bad': False, 'posture_issues': [], 'pitch_angle': float(frame[0, 0, 0]),
+                'raw_metrics': {'pitch': float(frame[0, 0, 0]), 'distance': 50.0}}
+    
+    detector._analyze_frame = analyze
+    return detector
+
+def test_gate_decisions():
+    """Static frames are skipped; motion and the reuse age force inference."""
+    gate = MotionGate(threshold=3.0, max_reuse_seconds=1.0, use_roi=True)
+    frame = _frame()
+    
+    assert gate.should_infer(frame, 0), "First frame has no reference"
+    gate.mark_inferred(frame, 0)
+    
+    # Same frame: reuse until the maximum age
+    assert not gate.should_infer(frame, 33)
+    assert not gate.should_infer(frame, 999)
+    assert gate.should_infer(frame, 1000), "Reuse age reached - forced refresh"
+    gate.mark_inferred(frame, 1000)
+    
+    # Sensor noise stays below the threshold, a real change doesn't
+    noisy = np.clip(frame.astype(np.int16) + np.random.default_rng(0).integers(-2, 3, frame.shape),
+                    0, 255).astype(np.uint8)
+    assert not gate.should_infer(noisy, 1033)
+    moved = frame.copy()
+    moved[:, :320] = 30
+    assert gate.should_infer(moved, 1066)
+    
+    # With a region of interest, changes outside it are ignored
+    gate.mark_inferred(frame, 1100, roi=(320, 0, 640, 360))
+    assert not gate.should_infer(moved, 1133), "Change outside the ROI"
+    assert gate.should_infer(_frame(30), 1166), "Change inside the ROI"
+    
+    stats = gate.get_stats(1166)
+    assert stats['frames'] == 8
+    assert stats['skipped_frames'] == 4
+
+def test_detector_reuse():
+    """The detector reuses its last result on static frames and refreshes it."""
+    detector = _stub_detector()
+    frame = _frame()
+    results = [detector.check_posture(frame, int(i * 1000 / FPS)) for i in range(3 * FPS)]
+    
+    reused = [r.get('reused', False) for r in results]
+    assert not reused[0]
+    assert detector.inference_count == 3, "One inference per second (forced refresh)"
+    assert all(not reused[i] for i in (0, FPS, 2 * FPS)), "Refreshes at 1s and 2s"
+    assert results[FPS - 1]['reuse_age_ms'] == int((FPS - 1) * 1000 / FPS)
+    
+    # Motion forces an inference on the next frame
+    result = detector.check_posture(_frame(30), 3000)
+    assert not result.get('reused') and result['pitch_angle'] == 30.0
+    assert detector.check_posture(_frame(30), 3033)['reused']
+
+def test_calibration_bypasses_gate():
+    """Calibration infers every frame and ignores reused results."""
+    detector = _stub_detector()
+    frame = _frame()
+    detector.check_posture(frame, 0)
+    
+    # Reused results are not calibration samples
+    calibrator = BaselineCalibrator(num_frames=5, max_frames=10)
+    reused = detector.check_posture(frame, 33)
+    assert reused['reused']
+    assert not calibrator.add(reused)
+    assert calibrator.frames_seen == 0
+    
+    # While calibrating every frame is inferred
+    detector.set_calibrating(True)
+    assert 'calibration' in detector.metrics.consumers
+    before = detector.inference_count
+    for i in range(5):
+        calibrator.add(detector.check_posture(frame, 66 + i * 33))
+    assert detector.inference_count - before == 5
+    assert calibrator.is_complete()
+    
+    detector.set_calibrating(False)
+    assert 'calibration' not in detector.metrics.consumers
+    assert detector.check_posture(frame, 300)['reused']
@@ -0,0 +1,155 @@
+"""
+Tests for the injectable clock.
+Replays simulated posture results faster than real time and checks that
+durations, warnings and streaks follow the frame timestamps.
+"""
+
+import sys
+import os
+import time
+import json
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from clock import ReplayClock
+from posture_analyzer import PostureAnalyzer
+from telemetry_ring import TelemetryRing, ISSUE_BITS
+from config import INITIAL_WARNING_SECONDS, REPEAT_WARNING_INTERVAL, GOOD_TO_BAD_SECONDS, BAD_TO_GOOD_SECONDS
+
+def _replay(analyzer, clock, is_bad, seconds, fps=30, start_ms=0):
+    """Feed `seconds` of identical frames; return (analyses, end timestamp ms)."""
+    analyses = []
+    frame_interval_ms = 1000 / fps
+    timestamp_ms = start_ms
+    for i in range(int(seconds * fps)):
+        timestamp_ms = start_ms + i * frame_interval_ms
+        clock.on_frame(timestamp_ms)
+        analyses.append(analyzer.update({
+            'is_bad': is_bad,
+            'posture_issues': ['head_pitch'] if is_bad else []
+        }))
+    return analyses, timestamp_ms + frame_interval_ms
+
+def test_replay_warnings():
+    """Warnings fire at the configured simulated times."""
+    clock = ReplayClock()
+    analyzer = PostureAnalyzer(clock=clock)
+    
+    wall_start = time.time()
+    # 10 simulated minutes of bad posture
+    analyses, _ = _replay(analyzer, clock, True, 600)
+    wall_elapsed = time.time() - wall_start
+    
+    warned_at = [a['bad_duration'] for a in analyses if a['should_warn']]
+    expected = list(range(INITIAL_WARNING_SECONDS, 600, REPEAT_WARNING_INTERVAL))
+    assert warned_at == expected, f"Expected warnings at {expected}, got {warned_at}"
+    assert wall_elapsed < 60, "Replay should be much faster than real time"
+
+def test_replay_statistics():
+    """Streaks and totals use the replayed durations."""
+    clock = ReplayClock()
+    analyzer = PostureAnalyzer(clock=clock)
+    
+    _, end_ms = _replay(analyzer, clock, False, 120)
+    _, end_ms = _replay(analyzer, clock, True, 45, start_ms=end_ms)
+    _, end_ms = _replay(analyzer, clock, False, 30, start_ms=end_ms)
+    
+    stats = analyzer.get_statistics()
+    # Debounced state changes lag the detections by GOOD_TO_BAD / BAD_TO_GOOD seconds
+    good_streak = 120 + GOOD_TO_BAD_SECONDS
+    bad_streak = 45 - GOOD_TO_BAD_SECONDS + BAD_TO_GOOD_SECONDS
+    current_good = 30 - BAD_TO_GOOD_SECONDS
+    assert abs(stats['longest_good_streak'] - good_streak) <= 1, f"Good streak should be ~{good_streak}s"
+    assert abs(stats['longest_bad_streak'] - bad_streak) <= 1, f"Bad streak should be ~{bad_streak}s"
+    assert abs(stats['current_good_duration'] - current_good) <= 1, f"Current good duration should be ~{current_good}s"
+
+def test_replay_epoch_timestamps():
+    """Streaks start at the first frame, not at clock zero, with epoch-ms timestamps."""
+    clock = ReplayClock()
+    analyzer = PostureAnalyzer(clock=clock)
+    start_ms = 1760000000000  # Capture timestamps in ms since the Unix epoch
+    
+    _, end_ms = _replay(analyzer, clock, False, 60, start_ms=start_ms)
+    _, end_ms = _replay(analyzer, clock, True, 20, start_ms=end_ms)
+    _, end_ms = _replay(analyzer, clock, False, 10, start_ms=end_ms)
+    
+    stats = analyzer.get_statistics(distributions=False)
+    good_streak = 60 + GOOD_TO_BAD_SECONDS
+    assert abs(stats['longest_good_streak'] - good_streak) <= 1, f"Good streak should be ~{good_streak}s"
+    assert abs(stats['current_good_duration'] - (10 - BAD_TO_GOOD_SECONDS)) <= 1
+    
+    # Statistics reset mid-stream: the next frame starts the good streak again
+    analyzer.reset_statistics()
+    assert analyzer.get_statistics(distributions=False)['current_good_duration'] == 0
+    _replay(analyzer, clock, False, 5, start_ms=end_ms)
+    assert abs(analyzer.get_statistics(distributions=False)['current_good_duration'] - 5) <= 1
+
+def test_replay_telemetry():
+    """The telemetry ring keeps the newest frames and answers time-window queries."""
+    clock = ReplayClock()
+    analyzer = PostureAnalyzer(clock=clock)
+    analyzer.telemetry = TelemetryRing(capacity=30 * 60)  # One minute at 30 FPS
+    
+    _, end_ms = _replay(analyzer, clock, False, 50)
+    _, end_ms = _replay(analyzer, clock, True, 20, start_ms=end_ms)
+    telemetry = analyzer.telemetry
+    
+    # Ring is full and has wrapped: only the newest minute is kept, in time order
+    rows = telemetry.window()
+    assert len(rows) == telemetry.capacity
+    assert np.all(np.diff(rows['timestamp']) > 0), "Rows should be in time order"
+    assert abs(rows['timestamp'][0] - 10) < 0.05, "Oldest row should be ~10s"
+    
+    # Last 10 seconds: all bad with the head_pitch bit set
+    last = telemetry.last(10)
+    assert abs(len(last) - 300) <= 1
+    assert np.all(last['detected_bad'])
+    assert np.all(last['issues'] == ISSUE_BITS['head_pitch'])
+    
+    # A window that doesn't wrap around the buffer end is a view, not a copy
+    assert np.shares_memory(telemetry.last(5), telemetry._data)
+    
+    # Bad posture started at 50s and is reported after GOOD_TO_BAD_SECONDS
+    columns = telemetry.to_columns(telemetry.window(45, 55), ['timestamp', 'is_bad', 'pitch'])
+    first_bad = columns['timestamp'][columns['is_bad'].index(True)]
+    assert 50 + GOOD_TO_BAD_SECONDS <= first_bad < 50.1 + GOOD_TO_BAD_SECONDS
+    assert all(value is None for value in columns['pitch']), "Missing metrics should be None"
+
+def test_replay_distributions():
+    """Metric quantiles and issue time come from sketches that merge across runs."""
+    rng = np.random.default_rng(0)
+    
+    def run(pitches, start_s):
+        clock = ReplayClock(start_s)
+        analyzer = PostureAnalyzer(clock=clock)
+        for i, pitch in enumerate(pitches):
+            clock.on_frame((start_s + i / 30) * 1000)
+            analyzer.update({
+                'is_bad': pitch < -10,
+                'adjusted_pitch': pitch,
+                'posture_issues': ['head_pitch'] if pitch < -10 else []
+            })
+        return analyzer
+    
+    # Two "service runs" of 10 minutes each
+    first = rng.normal(-5, 4, 30 * 600)
+    second = rng.normal(-8, 4, 30 * 600)
+    analyzer = run(first, 0)
+    state = json.loads(json.dumps(analyzer.distributions.export_state()))
+    analyzer = run(second, 1000)
+    analyzer.distributions.merge_state(state)
+    
+    stats = analyzer.get_statistics()['distributions']
+    pitch = stats['metrics']['pitch']
+    combined = np.concatenate([first, second])
+    expected = {key: np.quantile(combined, q) for key, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))}
+    assert pitch['count'] == len(combined)
+    for key, value in expected.items():
+        assert abs(pitch[key] - value) < 0.2, f"{key} should be ~{value:.2f}"
+    
+    # Time in head_pitch matches the share of frames beyond the threshold
+    expected_seconds = np.sum(combined < -10) / 30
+    assert abs(stats['issue_seconds']['head_pitch'] - expected_seconds) < 2
+    assert abs(stats['observed_seconds'] - 1200) < 1
@@ -4,8 +4,13 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+import numpy as np
 from smoothing_filter import SmoothingFilter
 from state_debouncer import StateDebouncer
+from motion_gate import MotionGate
+from pose_detector import PostureDetector
+from posture_analyzer import PostureAnalyzer
+from clock import ReplayClock
 import config
 
 print("Testing Pose Stability Fix Implementation...")
@@ -14,44 +19,129 @@ print("=" * 50)
 # Test 1: SmoothingFilter
 print("\n1. Testing SmoothingFilter:")
 filter = SmoothingFilter(window_size=3)
-filter.add_measurement(pitch=-15, roll=5, shoulder_tilt=2, distance=50)
-filter.add_measurement(pitch=-12, roll=3, shoulder_tilt=1, distance=52)
-filter.add_measurement(pitch=-14, roll=4, shoulder_tilt=2, distance=51)
+filter.add_measurement(pitch=-15, roll=5, shoulder_tilt=2, body_lean_offset=0, distance=50)
+filter.add_measurement(pitch=-12, roll=3, shoulder_tilt=1, body_lean_offset=0, distance=52)
+filter.add_measurement(pitch=-14, roll=4, shoulder_tilt=2, body_lean_offset=0, distance=51)
 smoothed = filter.get_smoothed_values()
 print(f"   Raw values: -15, -12, -14")
 print(f"   Smoothed pitch: {smoothed['pitch']:.1f}")
 print(f"   ✓ SmoothingFilter working!")
 
-# Test 2: StateDebouncer
+# Test 2: StateDebouncer (time-based, shipped defaults)
 print("\n2. Testing StateDebouncer:")
-debouncer = StateDebouncer(good_to_bad_frames=2, bad_to_good_frames=3)
+good_to_bad = config.GOOD_TO_BAD_SECONDS
+bad_to_good = config.BAD_TO_GOOD_SECONDS
+clock = ReplayClock()
+debouncer = StateDebouncer(clock=clock)
+frame = 1 / 30
 
-# Should NOT trigger bad after 1 frame
+# Should NOT trigger bad on the first bad frame
 result1 = debouncer.update(True)
 print(f"   After 1 bad frame: is_bad = {result1} (expected: False)")
+assert result1 is False
 
-# Should trigger bad after 2 frames
+# Should NOT trigger bad just before GOOD_TO_BAD_SECONDS
+clock.advance(good_to_bad - frame)
 result2 = debouncer.update(True)
-print(f"   After 2 bad frames: is_bad = {result2} (expected: True)")
+print(f"   After {good_to_bad - frame:.2f}s bad: is_bad = {result2} (expected: False)")
+assert result2 is False
 
-# Should NOT exit bad after 1 good frame
-result3 = debouncer.update(False)
-print(f"   After 1 good frame: is_bad = {result3} (expected: True)")
+# Should trigger bad once bad posture persisted GOOD_TO_BAD_SECONDS
+clock.advance(frame)
+result3 = debouncer.update(True)
+print(f"   After {good_to_bad:.2f}s bad: is_bad = {result3} (expected: True)")
+assert result3 is True
 
-# Should NOT exit bad after 2 good frames
+# Should NOT exit bad after a single good frame
+clock.advance(frame)
 result4 = debouncer.update(False)
-print(f"   After 2 good frames: is_bad = {result4} (expected: True)")
+print(f"   After 1 good frame: is_bad = {result4} (expected: True)")
+assert result4 is True
 
-# Should exit bad after 3 good frames
-result5 = debouncer.update(False)
-print(f"   After 3 good frames: is_bad = {result5} (expected: False)")
+# Should exit bad once good posture persisted BAD_TO_GOOD_SECONDS
+good_frames = 1
+result5 = True
+while result5:
+    clock.advance(frame)
+    result5 = debouncer.update(False)
+    good_frames += 1
+print(f"   Good again after {good_frames} good frames (expected: {round(bad_to_good * 30) + 1})")
+assert good_frames == round(bad_to_good * 30) + 1
+
+# Same durations decide at other frame rates
+for fps in (5, 10, 29.97, 60):
+    clock = ReplayClock()
+    debouncer = StateDebouncer(clock=clock)
+    entered_at = exited_at = None
+    for i in range(int(4 * fps)):
+        t = i / fps
+        clock.set(t)
+        is_bad = debouncer.update(t < 1.0)
+        if is_bad and entered_at is None:
+            entered_at = t
+        if not is_bad and entered_at is not None and exited_at is None:
+            exited_at = t
+    print(f"   {fps} FPS: bad at {entered_at:.2f}s, good again at {exited_at:.2f}s")
+    assert abs(entered_at - good_to_bad) < 1 / fps + 1e-9
+    assert abs(exited_at - (1.0 + bad_to_good)) < 1 / fps + 1e-9
+
+# A gap longer than the reset gap restarts a pending transition
+clock = ReplayClock()
+debouncer = StateDebouncer(reset_gap_seconds=1.0, clock=clock)
+debouncer.update(True)
+clock.advance(2.0)
+result6 = debouncer.update(True)
+print(f"   Bad frames 2s apart: is_bad = {result6} (expected: False)")
+assert result6 is False
 print(f"   ✓ StateDebouncer working!")
 
+# Test 2b: Motion gate, sustain window and debouncer together
+print("\n2b. Testing a still user behind the motion gate:")
+clock = ReplayClock()
+detector = PostureDetector(load_models=False, clock=clock)
+detector.motion_gate = MotionGate()
+detector.tracker = None
+analyzer = PostureAnalyzer(clock=clock)
+
+
+def analyze_tilted(frame, timestamp_ms):
+    """Stand-in for the landmarkers: shoulders tilted well past the threshold."""
+    is_bad, issues = detector._is_posture_bad(0.0, 0.0, 30.0, 0.0, None, None)
+    return {'is_bad': is_bad, 'posture_issues': issues, 'shoulder_tilt': 30.0}
+
+
+detector._analyze_frame = analyze_tilted
+still_frame = np.full((480, 640, 3), 128, dtype=np.uint8)
+fps = 29.97
+reported = debounced = 0
+first_reported = first_debounced = None
+frames = 599
+for i in range(frames):
+    timestamp_ms = int(i * 1000 / fps)
+    result = detector.check_posture(still_frame, timestamp_ms)
+    status = analyzer.update(result)
+    if 'shoulder_tilt' in result['posture_issues']:
+        reported += 1
+        first_reported = first_reported if first_reported is not None else timestamp_ms / 1000
+    if analyzer.debouncer.current_state == 'bad':
+        debounced += 1
+        first_debounced = first_debounced if first_debounced is not None else timestamp_ms / 1000
+print(f"   Full inferences: {detector.inference_count} of {frames} frames")
+print(f"   shoulder_tilt reported on {reported}/{frames} frames, from {first_reported:.2f}s")
+print(f"   Debounced bad on {debounced}/{frames} frames, from {first_debounced:.2f}s")
+assert detector.inference_count < frames / 10
+sustain = config.SUSTAIN_SECONDS['shoulder_tilt']
+assert abs(first_reported - sustain) < 2 / fps
+assert abs(first_debounced - (sustain + config.GOOD_TO_BAD_SECONDS)) < 2 / fps
+assert reported > frames * 0.9
+print(f"   ✓ Sustain windows run through reused results!")
+
 # Test 3: Config
 print("\n3. Testing Config:")
 print(f"   SMOOTHING_WINDOW_SIZE: {config.SMOOTHING_WINDOW_SIZE}")
-print(f"   GOOD_TO_BAD_FRAMES: {config.GOOD_TO_BAD_FRAMES}")
-print(f"   BAD_TO_GOOD_FRAMES: {config.BAD_TO_GOOD_FRAMES}")
+print(f"   GOOD_TO_BAD_SECONDS: {config.GOOD_TO_BAD_SECONDS}")
+print(f"   BAD_TO_GOOD_SECONDS: {config.BAD_TO_GOOD_SECONDS}")
+print(f"   SUSTAIN_SECONDS: {config.SUSTAIN_SECONDS}")
 print(f"   INITIAL_WARNING_SECONDS: {config.INITIAL_WARNING_SECONDS}")
 print(f"   Pitch enter_bad threshold: {config.THRESHOLDS['pitch']['enter_bad']}")
 print(f"   Pitch exit_bad threshold: {config.THRESHOLDS['pitch']['exit_bad']}")
@@ -64,6 +154,7 @@ print("  - Smoothing reduces measurement noise")
 print("  - Debouncing prevents rapid state changes")
 print("  - Hysteresis provides stable thresholds")
 print("\nExpected behavior:")
-print("  - Need 2 bad frames to detect bad posture")
-print("  - Need 3 good frames to exit bad posture")
+print(f"  - Bad posture must persist {config.GOOD_TO_BAD_SECONDS}s to be detected")
+print(f"  - Good posture must persist {config.BAD_TO_GOOD_SECONDS}s to exit bad posture")
+print("  - Same decisions at 5-60 FPS")
 print("  - Timer should no longer reset from brief glitches")
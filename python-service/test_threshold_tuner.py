@@ -0,0 +1,92 @@
+"""
+Tests for the offline threshold tuner.
+Checks the vectorised episode evaluation against the live pipeline
+(PostureDetector hysteresis and sustain windows, PostureAnalyzer debouncing
+and warnings) replayed sample by sample on a ReplayClock.
+"""
+
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from clock import ReplayClock
+from pose_detector import PostureDetector
+from posture_analyzer import PostureAnalyzer
+import threshold_tuner
+
+STEP = 0.5
+
+def _live_pipeline(pitches, enter, exit_):
+    """Warnings of the live pipeline for a pitch stream."""
+    clock = ReplayClock()
+    detector = PostureDetector(clock=clock, load_models=False)
+    detector.thresholds['pitch'] = {'enter_bad': enter, 'exit_bad': exit_}
+    analyzer = PostureAnalyzer(clock=clock)
+    
+    warnings = []
+    for i, pitch in enumerate(pitches):
+        clock.set(i * STEP)
+        is_bad, issues = detector._is_posture_bad(None if np.isnan(pitch) else pitch,
+                                                  None, None, None, None, None)
+        analysis = analyzer.update({'is_bad': is_bad, 'posture_issues': issues})
+        warnings.append(analysis['should_warn'])
+    return np.array(warnings)
+
+def _session(seed, samples=4000):
+    """Random-walk pitch with dropouts, labelled bad where it is clearly low."""
+    rng = np.random.default_rng(seed)
+    pitches = np.cumsum(rng.normal(0, 1.2, samples)) % 30 - 20
+    pitches[rng.random(samples) < 0.01] = np.nan
+    truth = pitches < -12
+    good = ~truth
+    edges = np.diff(np.concatenate([[0], truth.astype(int), [0]]))
+    bad_periods = np.stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)], axis=1)
+    return pitches, good, bad_periods
+
+def test_matches_live_pipeline():
+    """Scores equal those computed from the live pipeline's output."""
+    pitches, good, bad_periods = _session(5)
+    enter = np.array([-10.0, -12.0, -5.0, -15.0, -8.5])
+    exit_ = np.array([-8.0, -12.0, -1.0, -14.0, -5.5])
+    scores = threshold_tuner.evaluate(pitches, good, bad_periods, enter, exit_, True, STEP)
+    good_hours = good.sum() * STEP / 3600
+    
+    for c in range(len(enter)):
+        warnings = _live_pipeline(pitches, enter[c], exit_[c])
+        false_alerts = (warnings & good).sum() / good_hours
+        first = [np.flatnonzero(warnings[s:e]) for s, e in bad_periods]
+        delay = np.mean([(f[0] if len(f) else e - s) * STEP for f, (s, e) in zip(first, bad_periods)])
+        assert abs(scores['false_alerts_per_hour'][c] - false_alerts) < 1e-9, "False alert rate differs"
+        assert abs(scores['mean_delay_seconds'][c] - delay) < 1e-9, "Detection delay differs"
+
+def test_cli_pareto():
+    """tune() reads JSON Lines recordings and returns a consistent Pareto front."""
+    pitches, _, _ = _session(7, samples=20000)
+    start_ms = 1_700_000_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        recording = os.path.join(directory, 'posture.jsonl')
+        with open(recording, 'w', encoding='utf-8') as output:
+            for i, pitch in enumerate(pitches):
+                output.write(json.dumps({
+                    'timestamp': start_ms + i * 100,
+                    'adjusted_pitch': None if np.isnan(pitch) else float(pitch)
+                }) + '\n')
+        labels = [
+            {'start': start_ms, 'end': start_ms + 1000_000, 'label': 'good'},
+            {'start': start_ms + 1000_000, 'end': start_ms + 1200_000, 'label': 'bad'},
+            {'start': start_ms + 1200_000, 'end': start_ms + 1500_000, 'label': 'bad', 'issue': 'distance'}
+        ]
+        result = threshold_tuner.tune([recording], labels, 'pitch')
+    
+    front = result['pareto']
+    assert result['bad_periods'] == 1, "Bad periods of other issues should be ignored"
+    assert len(front) >= 1
+    alerts = [row['false_alerts_per_hour'] for row in front]
+    delays = [row['mean_delay_seconds'] for row in front]
+    assert alerts == sorted(alerts), "Front should be sorted by alert rate"
+    assert all(a > b for a, b in zip(delays, delays[1:])), "Delay should fall along the front"